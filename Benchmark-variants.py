@@ -0,0 +1,313 @@
+import argparse
+import ast
+import csv
+import datetime
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from Benchmark import ROOT, load_module, insert_projects, random_project, percentile
+
+# Версии приложения в порядке развития; у каждой свой DatabaseManager/AuthenticationManager
+VARIANTS = [
+    'Alpha-version.py',
+    'Developer-version.py',
+    'Second-developer-version.py',
+    'Third-developer-version(BAD).py',
+    'Fourth-developer-version.py',
+    'Fifth-developer-version.py',
+    'Sixth-developer-version.py',
+    'Seventh-developer-version.py',
+    'Beta-version-0_1.py',
+    'Beta-version-0_2.py',
+    'Beta-version-0_3.py',
+    'Beta-version-0_4(BAD).py',
+    'Beta-version-0_5(BAD).py',
+    'Beta-version-0_6.py',
+    '(X)Beta-version-0_7.py',
+    'Beta-version-0_7_1.py',
+    'Beta-version-0_7_2.py',
+    'Beta-version-0_7_3.py',
+    'Beta-version-0_7_4.py',
+    'Beta-version-0_7_5.py',
+    'Beta-version-0_7_6.py',
+    'Beta-version-0_7_7.py',
+    'Beta-version-0_8.py',
+    'Beta-version-0_9.py',
+    '(X)Beta-version-1_0.py',
+    'Beta-version-1_1.py',
+    'Beta-version-1_2.py',
+    'Beta-version-1_3.py',
+    'Beta-version-1_4.py',
+    'Release-version.py',
+]
+SCENARIOS = ['register', 'login', 'list', 'toggle', 'delete', 'export']  # Сценарии в порядке выполнения
+PASSWORD = 'password'  # Пароль всех сгенерированных пользователей
+LIST_COLUMNS = ['id', 'name', 'type', 'start_date', 'end_date', 'completed', 'file_path']  # Столбцы окна проектов
+EXPORT_COLUMNS = ['name', 'type', 'start_date', 'end_date', 'completed', 'file_path']  # Столбцы экспорта в CSV
+VARIANT_TIMEOUT = 600  # Наибольшее время замера одной версии, с
+
+
+class SilentMessagebox:
+    # Замена messagebox версии: старые менеджеры сообщают о результате регистрации и входа окнами,
+    # которые без дисплея не открыть и которые останавливали бы замер
+    @staticmethod
+    def showinfo(title, message, **options):
+        return 'ok'
+
+    @staticmethod
+    def showerror(title, message, **options):
+        return 'ok'
+
+    @staticmethod
+    def showwarning(title, message, **options):
+        return 'ok'
+
+    @staticmethod
+    def askyesno(title, message, **options):
+        return True
+
+
+class VariantDriver:
+    def __init__(self, module, db_path):
+        module.messagebox = SilentMessagebox
+        self.manager = module.AuthenticationManager(db_path)  # Менеджер базы версии (схема создается им самим)
+        self.db_path = db_path  # Путь к базе данных
+        with sqlite3.connect(db_path) as conn:
+            self.columns = {table: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+                            for table in ('users', 'projects')}  # Столбцы таблиц в схеме этой версии
+        conn.close()
+        project_columns = self.columns['projects']
+        self.list_query = (f"SELECT {', '.join(c for c in LIST_COLUMNS if c in project_columns)} "
+                           f"FROM projects WHERE user_id=?")  # Запрос окна проектов
+        self.export_query = (f"SELECT {', '.join(c for c in EXPORT_COLUMNS if c in project_columns)} "
+                             f"FROM projects WHERE user_id=?")  # Запрос экспорта в CSV
+
+    def generate(self, users, projects_per_user, seed):
+        # Синтетические данные: users пользователей по projects_per_user проектов, со столбцами схемы версии
+        rnd = random.Random(seed)
+        hashed_password = self.manager.hash_password(PASSWORD)  # Один хеш на всех: с солью он все равно проверяется
+        user_columns = [c for c in ('username', 'password', 'role') if c in self.columns['users']]
+        project_columns = [c for c in ('name', 'type', 'start_date', 'end_date', 'deadline', 'completed',
+                                       'user_id', 'file_path') if c in self.columns['projects']]
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                f"INSERT INTO users ({', '.join(user_columns)}) VALUES ({', '.join('?' * len(user_columns))})",
+                ([f"user{i}", hashed_password, 'user'][:len(user_columns)] for i in range(users)))
+            user_ids = [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id")]
+
+            def rows():
+                i = 0
+                for user_id in user_ids:
+                    for k in range(projects_per_user):
+                        name, kind, start, end, deadline, completed, _, file_path = random_project(rnd, i, users)
+                        values = {'name': name, 'type': kind, 'start_date': start, 'end_date': end,
+                                  'deadline': deadline, 'completed': completed, 'user_id': user_id,
+                                  'file_path': file_path}
+                        yield [values[c] for c in project_columns]
+                        i += 1
+
+            insert_projects(conn, f"INSERT INTO projects ({', '.join(project_columns)}) "
+                                  f"VALUES ({', '.join('?' * len(project_columns))})", rows())
+            projects = conn.execute("SELECT id, user_id FROM projects").fetchall()
+        conn.close()
+        return user_ids, projects
+
+    def register(self, username):
+        # Регистрация через менеджер версии
+        self.manager.register_user(username, PASSWORD)
+        return True
+
+    def login(self, username):
+        # Вход через менеджер версии; у разных версий результат - id, строка или кортеж пользователя
+        return bool(self.manager.authenticate(username, PASSWORD))
+
+    def list(self, user_id):
+        # Список проектов пользователя, как его читает окно проектов
+        list_projects = getattr(self.manager, 'list_projects', None)
+        if list_projects is not None:
+            return len(list(list_projects(user_id)))
+        return len(self.manager.execute_query(self.list_query, (user_id,), fetch=True))
+
+    def toggle(self, user_id, project_id, completed):
+        # Отметка проекта завершенным или незавершенным
+        set_completed = getattr(self.manager, 'set_projects_completed', None)
+        if set_completed is not None:
+            return set_completed(user_id, [project_id], completed) == 1
+        self.manager.execute_query("UPDATE projects SET completed = ? WHERE id = ?", (int(completed), project_id))
+        return True
+
+    def delete(self, user_id, project_id):
+        # Удаление проекта
+        delete_projects = getattr(self.manager, 'delete_projects', None)
+        if delete_projects is not None:
+            return delete_projects(user_id, [project_id]) == 1
+        self.manager.execute_query("DELETE FROM projects WHERE id = ?", (project_id,))
+        return True
+
+    def export(self, module, user_id, file_path):
+        # Экспорт проектов пользователя в CSV: фоновой задачей версии или запросом окна и csv.writer
+        export_job = getattr(module, 'CsvExportJob', None)
+        if export_job is not None:
+            job = export_job(self.manager, user_id, file_path)
+            job.run()
+            return job.error is None
+        projects = self.manager.execute_query(self.export_query, (user_id,), fetch=True)
+        with open(file_path, 'w', newline='') as file:
+            csv.writer(file).writerows(projects)
+        return True
+
+    def close(self):
+        # Закрытие соединений (у старых версий соединение открывается на каждый запрос)
+        close = getattr(self.manager, 'close', None)
+        if close is not None:
+            close()
+
+
+def defines_manager(file_name):
+    # Есть ли в версии AuthenticationManager: без него (Alpha) модуль при импорте сразу открывает окно
+    with open(os.path.join(ROOT, file_name), encoding='utf-8') as file:
+        tree = ast.parse(file.read())
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == 'AuthenticationManager':
+            return True
+        if isinstance(node, ast.ImportFrom) and any(alias.name == 'AuthenticationManager' for alias in node.names):
+            return True
+    return False
+
+
+def peak_rss():
+    # Пиковый объем резидентной памяти процесса в мегабайтах (None, если платформа его не сообщает)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def measure(operation, targets):
+    # Выполнение операции для каждой цели с замером задержки: ops/s, p50/p99, число неудач
+    timings = []
+    errors = 0
+    start = time.perf_counter()
+    for target in targets:
+        begin = time.perf_counter()
+        if not operation(*target):
+            errors += 1
+        timings.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - start
+    return {
+        'ops': len(timings),
+        'ops_per_s': round(len(timings) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'errors': errors,
+    }
+
+
+def run_variant(file_name, workdir, users, projects_per_user, ops, auth_ops, seed):
+    # Замер одной версии (в отдельном процессе, чтобы пиковая память относилась только к ней)
+    module = load_module(file_name)
+    driver = VariantDriver(module, os.path.join(workdir, 'variant.db'))
+    try:
+        start = time.perf_counter()
+        user_ids, projects = driver.generate(users, projects_per_user, seed)
+        setup = time.perf_counter() - start
+        rnd = random.Random(seed)
+        targets = {
+            'register': [(f"new{i}",) for i in range(auth_ops)],
+            'login': [(f"user{rnd.randrange(users)}",) for i in range(auth_ops)],
+            'list': [(rnd.choice(user_ids),) for i in range(ops)],
+            'toggle': [(user_id, project_id, rnd.random() < 0.5)
+                       for project_id, user_id in rnd.sample(projects, min(ops, len(projects)))],
+            'delete': [(user_id, project_id) for project_id, user_id in rnd.sample(projects, min(ops, len(projects)))],
+            'export': [(module, rnd.choice(user_ids), os.path.join(workdir, f"export{i}.csv"))
+                       for i in range(max(1, ops // 10))],
+        }
+        scenarios = {name: measure(getattr(driver, name), targets[name]) for name in SCENARIOS}
+    finally:
+        driver.close()
+    return {'setup_s': round(setup, 2), 'scenarios': scenarios, 'peak_rss_mb': peak_rss()}
+
+
+def run_in_subprocess(file_name, args):
+    # Запуск замера версии в новом интерпретаторе; ошибка загрузки или замера попадает в результат
+    if not defines_manager(file_name):
+        return {'status': 'skipped', 'error': "нет AuthenticationManager: окно создается при импорте модуля"}
+    with tempfile.TemporaryDirectory() as workdir:
+        result_path = os.path.join(workdir, 'result.json')
+        command = [sys.executable, os.path.join(ROOT, 'Benchmark-variants.py'), '--run-variant', file_name,
+                   '--result', result_path, '--users', str(args.users), '--projects', str(args.projects),
+                   '--ops', str(args.ops), '--auth-ops', str(args.auth_ops), '--seed', str(args.seed)]
+        try:
+            process = subprocess.run(command, cwd=workdir, capture_output=True, text=True, timeout=VARIANT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            return {'status': 'error', 'error': f"замер не уложился в {VARIANT_TIMEOUT} с"}
+        if process.returncode or not os.path.exists(result_path):
+            lines = process.stderr.strip().splitlines() or ["замер завершился без результата"]
+            return {'status': 'error', 'error': lines[-1]}
+        with open(result_path, encoding='utf-8') as file:
+            return dict(json.load(file), status='ok')
+
+
+def print_table(results):
+    # Сводная таблица: ops/s и p99 по сценариям, пиковая память
+    header = f"{'версия':<34}" + ''.join(f"{name:>18}" for name in SCENARIOS) + f"{'RSS, МБ':>10}"
+    print(header)
+    print(f"{'':<34}" + ''.join(f"{'ops/s  p99 мс':>18}" for name in SCENARIOS))
+    for variant, result in results.items():
+        if result['status'] != 'ok':
+            print(f"{variant:<34}  {result['status']}: {result['error']}")
+            continue
+        cells = ''.join(f"{s['ops_per_s']:>10.0f} {s['p99_ms']:>7.1f}" + ('!' if s['errors'] else ' ')
+                        for s in (result['scenarios'][name] for name in SCENARIOS))
+        print(f"{variant:<34}{cells}{result['peak_rss_mb'] or 0:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение производительности версий TaskBoard")
+    parser.add_argument('variants', nargs='*', default=VARIANTS, help="Какие версии замерить (имена файлов)")
+    parser.add_argument('--users', type=int, default=100, help="Количество сгенерированных пользователей")
+    parser.add_argument('--projects', type=int, default=100, help="Проектов на пользователя")
+    parser.add_argument('--ops', type=int, default=200, help="Операций в сценариях list, toggle и delete")
+    parser.add_argument('--auth-ops', type=int, default=20,
+                        help="Операций в сценариях register и login (хеширование пароля может занимать 100 мс)")
+    parser.add_argument('--seed', type=int, default=42, help="Начальное значение генератора данных")
+    parser.add_argument('--output', default='benchmark-variants.json', help="Файл результатов JSON")
+    parser.add_argument('--run-variant', help=argparse.SUPPRESS)  # Внутренний режим: замер одной версии
+    parser.add_argument('--result', help=argparse.SUPPRESS)  # Файл результата внутреннего режима
+    args = parser.parse_args()
+
+    if args.run_variant:
+        result = run_variant(args.run_variant, os.getcwd(), args.users, args.projects, args.ops, args.auth_ops,
+                             args.seed)
+        with open(args.result, 'w', encoding='utf-8') as file:
+            json.dump(result, file)
+        return
+
+    results = {}
+    for variant in args.variants:
+        print(f"[variants] {variant}...", file=sys.stderr, flush=True)
+        results[variant] = run_in_subprocess(variant, args)
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'sqlite': sqlite3.sqlite_version,
+        'parameters': {'users': args.users, 'projects_per_user': args.projects, 'ops': args.ops,
+                       'auth_ops': args.auth_ops, 'seed': args.seed},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print_table(results)
+    print(f"Результаты: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1176 @@
+import argparse
+import asyncio
+import concurrent.futures
+import csv
+import datetime
+import hashlib
+import http.server
+import importlib.util
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import taskboard
+
+ROOT = os.path.dirname(os.path.abspath(__file__))  # Каталог репозитория
+RELEASE_FILE = 'Release-version.py'  # Файл проверяемой версии приложения
+STARTUP_IMPORT_BUDGET = 100  # Бюджет импорта приложения сверх пустого интерпретатора, мс (как у командной строки)
+STARTUP_WINDOW_BUDGET = 500  # Бюджет времени от запуска процесса до первого окна входа, мс
+
+
+def load_module(file_name):
+    # Загрузка версии приложения по имени файла (имена с дефисами нельзя импортировать напрямую)
+    path = os.path.join(ROOT, file_name)
+    name = 'taskboard_' + os.path.splitext(file_name)[0].replace('-', '_').replace('(', '').replace(')', '').replace('.', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module  # Нужно для передачи функций модуля в пул процессов
+    spec.loader.exec_module(module)
+    return module
+
+
+def random_project(rnd, i, users):
+    # Случайный проект со сроком в пределах года от сегодняшнего дня
+    today = datetime.date.today()
+    start = today - datetime.timedelta(days=rnd.randint(0, 365))
+    end = today + datetime.timedelta(days=rnd.randint(-180, 180))
+    return (f"Проект {i}", rnd.choice(["Курсовая", "Лабораторная", "Диплом"]),
+            start.strftime("%d.%m.%Y"), end.strftime("%d.%m.%Y"), end.isoformat(),
+            rnd.randint(0, 1), rnd.randint(1, users), "")
+
+
+def insert_projects(conn, query, rows):
+    # Массовая вставка проектов: поисковый индекс пополняется одной вставкой, а не триггером на каждую строку
+    search = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'projects_fts_insert'").fetchone()
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM projects").fetchone()[0]
+    if search:
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, '1')", (taskboard.PROJECTS_FTS_DEFERRED,))
+    conn.executemany(query, rows)
+    if search:
+        conn.execute("INSERT INTO projects_fts (rowid, name, type, owner) "
+                     "SELECT id, name, type, 'u' || user_id FROM projects WHERE id > ?", (last_id,))
+        conn.execute("DELETE FROM settings WHERE key = ?", (taskboard.PROJECTS_FTS_DEFERRED,))
+
+
+def populate(db_path, users, projects):
+    # Генерация синтетических данных: users пользователей и projects проектов
+    rnd = random.Random(42)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+            ((f"user{i}", "x" * 64, 'user') for i in range(users))
+        )
+        insert_projects(
+            conn,
+            "INSERT INTO projects (name, type, start_date, end_date, deadline, completed, user_id, file_path) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (random_project(rnd, i, users) for i in range(projects))
+        )
+    conn.close()
+
+
+def rate(func, count):
+    # Количество вызовов func в секунду
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return count / (time.perf_counter() - start)
+
+
+def bench_pool(module, workdir, projects):
+    # Сравнение: новое соединение на каждый запрос против пула соединений
+    db_path = os.path.join(workdir, 'pool.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    populate(db_path, 100, projects)
+    select = "SELECT id, name, type, start_date, end_date, completed, file_path FROM projects WHERE id=?"
+    update = "UPDATE projects SET completed = ? WHERE id = ?"
+
+    def per_statement(i):
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(select, (i % projects + 1,)).fetchall()
+            conn.execute(update, (i % 2, i % projects + 1))
+            conn.commit()
+        conn.close()
+
+    def pooled(i):
+        db_manager.execute_query(select, (i % projects + 1,), fetch=True)
+        db_manager.execute_query(update, (i % 2, i % projects + 1))
+
+    count = 2000
+    before = rate(per_statement, count) * 2
+    after = rate(pooled, count) * 2
+    db_manager.close()
+    print(f"[pool] {projects} проектов: до {before:.0f} запросов/с, после {after:.0f} запросов/с "
+          f"(x{after / before:.1f})")
+
+
+def bench_profiles(module, workdir, projects):
+    # Пропускная способность записи и чтения для каждого профиля производительности
+    for profile in taskboard.DB_PROFILES:
+        db_path = os.path.join(workdir, f'profile_{profile}.db')
+        db_manager = taskboard.AuthenticationManager(db_path, profile)
+        populate(db_path, 100, projects)
+
+        def write(i):
+            db_manager.execute_query("UPDATE projects SET completed = ? WHERE id = ?", (i % 2, i % projects + 1))
+
+        def read(i):
+            db_manager.execute_query(
+                "SELECT id, name, type, start_date, end_date, completed, file_path FROM projects WHERE user_id=?",
+                (i % 100 + 1,), fetch=True)
+
+        writes = rate(write, 500)
+        reads = rate(read, 200)
+        db_manager.close()
+        print(f"[profiles] {profile}: запись {writes:.0f} транзакций/с, чтение {reads:.0f} списков/с")
+
+
+# Горячие запросы приложения: (название, SQL, параметры)
+HOT_QUERIES = [
+    ("login", "SELECT id, username, role, password FROM users WHERE username=?", ("user1",)),
+    ("display_projects", "SELECT id, name, type, start_date, end_date, completed, file_path FROM projects "
+                         "WHERE user_id=?", (1,)),
+    ("projects_page", "SELECT id, name, type, start_date, end_date, completed, file_path FROM projects "
+                      "WHERE user_id=? AND id > ? ORDER BY id LIMIT ?", (1, 0, 100)),
+    ("export_projects", "SELECT name, type, start_date, end_date, completed, file_path FROM projects "
+                        "WHERE user_id=?", (1,)),
+    ("due_projects", "SELECT id, name, deadline FROM projects WHERE user_id = :user_id AND completed = 0 "
+                     "AND deadline > '' AND deadline < :limit ORDER BY deadline",
+     {'user_id': 1, 'limit': '2100-01-01'}),
+    ("delete_user_projects", "DELETE FROM projects WHERE user_id=?", (1,)),
+    ("delete_user", "DELETE FROM users WHERE id=?", (1,)),
+    ("users_page", "SELECT id, username, role FROM users "
+                   "WHERE username >= :name COLLATE NOCASE AND (username > :name COLLATE NOCASE OR id > :id) "
+                   "AND username < :prefix || char(1114111) COLLATE NOCASE "
+                   "ORDER BY username COLLATE NOCASE, id LIMIT :limit",
+     {'name': 'user5', 'id': 0, 'prefix': 'user', 'limit': 100}),
+]
+
+
+def check_query_plans(conn):
+    # Проверка, что ни один горячий запрос не выполняется полным сканированием таблицы
+    for name, query, params in HOT_QUERIES:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+        if any(step.startswith("SCAN") for step in plan):
+            raise AssertionError(f"Запрос {name} выполняется сканированием: {plan}")
+
+
+def bench_indexes(module, workdir, projects):
+    # Задержка горячих запросов на 10x меньшей, заданной и 10x большей базе
+    for size in (projects // 10, projects, projects * 10):
+        db_path = os.path.join(workdir, f'indexes_{size}.db')
+        taskboard.AuthenticationManager(db_path).close()
+        populate(db_path, max(100, size // 100), size)
+        conn = sqlite3.connect(db_path)
+        check_query_plans(conn)
+        results = []
+        for name, query, params in HOT_QUERIES:
+            count = 200
+            start = time.perf_counter()
+            for i in range(count):
+                conn.execute(query, params).fetchall()
+                conn.rollback()
+            results.append(f"{name} {(time.perf_counter() - start) / count * 1000:.3f} мс")
+        conn.close()
+        print(f"[indexes] {size} проектов: " + ", ".join(results))
+
+
+def create_legacy_database(db_path):
+    # База в формате Alpha-version.py: без столбцов role и file_path
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, password TEXT)")
+        conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, type TEXT, "
+                     "start_date TEXT, end_date TEXT, completed INTEGER DEFAULT 0, user_id INTEGER, "
+                     "FOREIGN KEY (user_id) REFERENCES users (id))")
+    conn.close()
+
+
+def bench_migrations(module, workdir, projects):
+    # Время миграции старой базы и стоимость запуска на актуальной базе
+    db_path = os.path.join(workdir, 'legacy.db')
+    create_legacy_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO users (username, password) VALUES (?, ?)",
+                         ((f"user{i}", "x" * 64) for i in range(100)))
+        conn.executemany("INSERT INTO projects (name, type, start_date, end_date, user_id) VALUES (?, ?, ?, ?, ?)",
+                         ((f"Проект {i}", "Курсовая", "01.09.2024", f"{i % 28 + 1:02d}.12.2024", i % 100 + 1)
+                          for i in range(projects)))
+        # Проекты пользователей, удаленных старой версией без каскада
+        conn.executemany("INSERT INTO projects (name, type, start_date, end_date, user_id) VALUES (?, ?, ?, ?, ?)",
+                         ((f"Сирота {i}", "Курсовая", "01.09.2024", "01.12.2024", 1000 + i) for i in range(10)))
+    conn.close()
+    messages = []
+    start = time.perf_counter()
+    taskboard.AuthenticationManager(db_path, progress=messages.append).close()
+    migrated = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(100):
+        taskboard.AuthenticationManager(db_path).close()
+    startup = (time.perf_counter() - start) / 100
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0] == projects, "потеряны проекты"
+        assert not conn.execute("PRAGMA foreign_key_check").fetchall(), "остались проекты без пользователей"
+        assert [row[6] for row in conn.execute("PRAGMA foreign_key_list(projects)") if row[2] == 'users'] == ['CASCADE']
+    conn.close()
+    print(f"[migrations] миграция базы Alpha-version с {projects} проектами: {migrated * 1000:.0f} мс "
+          f"({len(messages)} сообщений о ходе); запуск на актуальной базе: {startup * 1000:.2f} мс")
+
+
+def bench_deadlines(module, workdir, projects):
+    # Поиск проектов с подходящим сроком: разбор end_date в Python против запроса по deadline
+    db_path = os.path.join(workdir, 'deadlines.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    populate(db_path, max(100, projects // 100), projects)
+    today = datetime.date.today()
+    limit = today + datetime.timedelta(days=taskboard.DAYS_BEFORE)
+
+    def python_loop(i):
+        rows = db_manager.execute_query(
+            "SELECT id, name, end_date, completed FROM projects WHERE user_id=?", (i % 100 + 1,), fetch=True)
+        return [row for row in rows if not row[3] and (taskboard.parse_date(row[2]) or '9999') < limit.isoformat()]
+
+    def sql_range(i):
+        return db_manager.get_due_projects(i % 100 + 1)
+
+    before = rate(python_loop, 500)
+    after = rate(sql_range, 500)
+    start = time.perf_counter()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE projects SET deadline = NULL")
+        taskboard.backfill_deadlines(conn, 0, projects)
+    backfill = time.perf_counter() - start
+    conn.close()
+    db_manager.close()
+    print(f"[deadlines] {projects} проектов: разбор в Python {before:.0f} пользователей/с, "
+          f"запрос по индексу {after:.0f} пользователей/с; заполнение deadline {backfill:.2f} с")
+
+
+def populate_user(db_path, user_id, projects):
+    # Проекты одного пользователя со сроками в далеком будущем (без предупреждений о сроках)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT OR IGNORE INTO users (id, username, password, role) VALUES (?, ?, ?, 'user')",
+                     (user_id, f"user{user_id}", "x" * 64))
+        insert_projects(
+            conn,
+            "INSERT INTO projects (name, type, start_date, end_date, deadline, completed, user_id, file_path) "
+            "VALUES (?, 'Курсовая', '01.09.2024', '31.12.2099', '2099-12-31', ?, ?, ?)",
+            ((f"Проект {i}", i % 2, user_id, f"/tmp/file{i}.txt" if i % 3 == 0 else "") for i in range(projects))
+        )
+    conn.close()
+
+
+def current_rss():
+    # Текущий объем резидентной памяти процесса в мегабайтах
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def count_widgets(widget):
+    # Количество виджетов в дереве
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def settle(window):
+    # Ожидание строк списка проектов: счетчик и страницы загружаются в рабочем потоке
+    window.update()
+    while window.project_list.pager is None or window.project_list.loading:
+        time.sleep(0.001)
+        window.update()
+
+
+def bench_virtual_list(module, workdir, projects):
+    # Открытие окна проектов и прокрутка при разном числе проектов (без дисплея: xvfb-run python Benchmark.py)
+    if not os.environ.get('DISPLAY'):
+        print("[virtual_list] пропущено: нет дисплея, запустите под xvfb-run")
+        return
+    root = module.tk.Tk()
+    root.withdraw()
+    for size in (100, projects // 10, projects):
+        db_path = os.path.join(workdir, f'virtual_{size}.db')
+        db_manager = taskboard.AuthenticationManager(db_path)
+        populate_user(db_path, 1, size)
+        rss = current_rss()
+        start = time.perf_counter()
+        window = module.DisplayProjectsWindow(db_manager, 1, root)
+        settle(window)
+        opened = time.perf_counter() - start
+        widgets = count_widgets(window)
+        start = time.perf_counter()
+        for i in range(100):
+            window.project_list.yview('moveto', i / 100)
+            settle(window)
+        scrolled = (time.perf_counter() - start) / 100
+        print(f"[virtual_list] {size} проектов: открытие {opened * 1000:.0f} мс, виджетов {widgets}, "
+              f"прокрутка {scrolled * 1000:.1f} мс/кадр, память +{current_rss() - rss:.1f} МБ")
+        window.destroy()
+        db_manager.close()
+    root.destroy()
+
+
+def bench_toggle(module, workdir, projects):
+    # Задержка переключения проекта: полный повторный запрос против обновления одной строки
+    root = None
+    if os.environ.get('DISPLAY'):
+        root = module.tk.Tk()
+        root.withdraw()
+    for size in (100, projects // 10, projects):
+        db_path = os.path.join(workdir, f'toggle_{size}.db')
+        db_manager = taskboard.AuthenticationManager(db_path)
+        populate_user(db_path, 1, size)
+        ids = [row[0] for row in db_manager.execute_query(
+            "SELECT id FROM projects WHERE user_id=? ORDER BY id LIMIT 20", (1,), fetch=True)]
+        pager = taskboard.ProjectPager(db_manager, 1)
+        pager.get(0)
+
+        def full_requery(i):
+            db_manager.execute_query("UPDATE projects SET completed = ? WHERE id = ?", (i % 2, ids[i % 20]))
+            db_manager.execute_query(f"SELECT {taskboard.PROJECT_COLUMNS} FROM projects WHERE user_id=?", (1,), fetch=True)
+
+        def keyed_update(i):
+            db_manager.execute_query("UPDATE projects SET completed = ? WHERE id = ?", (i % 2, ids[i % 20]))
+            pager.update(ids[i % 20], i % 2)
+
+        before = 1000 / rate(full_requery, 50)
+        after = 1000 / rate(keyed_update, 200)
+        result = f"[toggle] {size} проектов: полный повторный запрос {before:.2f} мс, обновление строки {after:.3f} мс"
+        if root:
+            window = module.DisplayProjectsWindow(db_manager, 1, root)
+            settle(window)
+            state = module.tk.BooleanVar()
+
+            def gui_toggle(i):
+                state.set(i % 2)
+                window.toggle_project(ids[i % 20], state)
+                window.update()
+
+            result += f", в окне {1000 / rate(gui_toggle, 100):.2f} мс"
+            window.destroy()
+        print(result)
+        db_manager.close()
+    if root:
+        root.destroy()
+
+
+def bench_export(module, workdir, projects):
+    # Потоковый экспорт в CSV: строк в секунду и прирост памяти против выгрузки через fetchall
+    # (потоковый экспорт замеряется первым, пока память процесса не раздута выгрузкой)
+    size = projects * 10
+    db_path = os.path.join(workdir, 'export.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    populate_user(db_path, 1, size)
+    file_path = os.path.join(workdir, 'export.csv')
+
+    rss = current_rss()
+    peak = rss
+    start = time.perf_counter()
+    job = taskboard.CsvExportJob(db_manager, 1, file_path)
+    job.start()
+    while job.is_alive():
+        peak = max(peak, current_rss())
+        job.join(0.05)
+    after = job.processed / (time.perf_counter() - start)
+    after_memory = peak - rss
+
+    rss = current_rss()
+    start = time.perf_counter()
+    rows = db_manager.execute_query(f"SELECT {taskboard.EXPORT_COLUMNS} FROM projects WHERE user_id=?", (1,), fetch=True)
+    with open(file_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(taskboard.EXPORT_HEADER)
+        writer.writerows(rows)
+    before = size / (time.perf_counter() - start)
+    before_memory = current_rss() - rss
+    del rows
+
+    db_manager.close()
+    print(f"[export] {size} строк: fetchall {before:.0f} строк/с (+{before_memory:.0f} МБ), "
+          f"потоковый экспорт {after:.0f} строк/с (+{after_memory:.0f} МБ, в т.ч. mmap и кэш страниц SQLite обоих соединений)")
+
+
+def hold_write_lock(db_path, seconds):
+    # Удержание монопольной блокировки записи в отдельном потоке; возвращает поток после захвата блокировки
+    locked = threading.Event()
+
+    def run():
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("BEGIN EXCLUSIVE")
+        locked.set()
+        time.sleep(seconds)
+        conn.execute("COMMIT")
+        conn.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    locked.wait()
+    return thread
+
+
+def max_loop_gap(until):
+    # Имитация главного цикла: тики по 10 мс до выполнения until(); возвращает наибольшую паузу между тиками
+    gap = 0
+    last = time.perf_counter()
+    while not until():
+        time.sleep(0.01)
+        now = time.perf_counter()
+        gap = max(gap, now - last)
+        last = now
+    return gap
+
+
+def bench_worker(module, workdir, projects):
+    # Отзывчивость интерфейса при записи под монопольной блокировкой на 500 мс
+    db_path = os.path.join(workdir, 'worker.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    populate_user(db_path, 1, 100)
+    update = "UPDATE projects SET completed = 1 WHERE id = 1"
+
+    lock = hold_write_lock(db_path, 0.5)
+    start = time.perf_counter()
+    db_manager.execute_query(update)
+    sync_blocked = time.perf_counter() - start
+    lock.join()
+
+    lock = hold_write_lock(db_path, 0.5)
+    start = time.perf_counter()
+    future = db_manager.submit(db_manager.execute_query, update)
+    async_blocked = time.perf_counter() - start
+    gap = max_loop_gap(future.done)
+    async_done = time.perf_counter() - start
+    lock.join()
+    result = (f"[worker] блокировка записи 500 мс: синхронный вызов держит цикл {sync_blocked * 1000:.0f} мс; "
+              f"через рабочий поток {async_blocked * 1000:.2f} мс на постановку, "
+              f"макс. пауза цикла {gap * 1000:.0f} мс, запись завершена через {async_done * 1000:.0f} мс")
+
+    if os.environ.get('DISPLAY'):
+        root = module.tk.Tk()
+        root.withdraw()
+        window = module.DisplayProjectsWindow(db_manager, 1, root)
+        settle(window)
+        state = module.tk.BooleanVar(value=False)
+        lock = hold_write_lock(db_path, 0.5)
+        ticks = []
+
+        def tick():
+            ticks.append(time.perf_counter())
+            if lock.is_alive() or getattr(window, 'busy_count', 0):
+                root.after(10, tick)
+            else:
+                root.quit()
+
+        root.after(10, tick)
+        window.toggle_project(1, state)
+        root.mainloop()
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        result += f"; в окне макс. пауза цикла Tk {max(gaps or [0]) * 1000:.0f} мс"
+        root.destroy()
+    db_manager.close()
+    print(result)
+
+
+def bench_group_commit(module, workdir, projects):
+    # Серия из 50 переключений: транзакция на каждое действие против группировки отложенных записей
+    actions = 50
+    for profile in ('safe', 'balanced'):
+        db_path = os.path.join(workdir, f'group_{profile}.db')
+        db_manager = taskboard.AuthenticationManager(db_path, profile)
+        populate_user(db_path, 1, actions)
+        update = "UPDATE projects SET completed = ? WHERE id = ?"
+
+        start = time.perf_counter()
+        for i in range(actions):
+            db_manager.execute_query(update, (1, i + 1))
+        direct = time.perf_counter() - start
+
+        futures = []
+        for i in range(actions):
+            futures.append(db_manager.write(update, (0, i + 1)))
+            time.sleep(0.005)  # Пользователь щелкает флажки подряд
+        db_manager.flush()
+        concurrent.futures.wait(futures)
+        commits = db_manager.write_commits
+        db_manager.close()
+        print(f"[group_commit] {profile}: транзакция на действие - {actions / direct:.0f} фиксаций/с, "
+              f"1 фиксация на действие; группировка - {commits} фиксаций на {actions} действий "
+              f"({commits / actions:.2f} на действие)")
+    print("[group_commit] в профиле safe (synchronous=FULL) каждая фиксация выполняет fsync")
+
+
+def bench_auth(module, workdir, projects):
+    # Входов в секунду при разной стоимости хеширования паролей
+    db_path = os.path.join(workdir, 'auth.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    calibrated = db_manager.get_password_iterations()
+    print(f"[auth] откалиброванная стоимость: {calibrated} итераций PBKDF2 "
+          f"(цель {taskboard.PASSWORD_TARGET_TIME * 1000:.0f} мс)")
+    legacy_hash = hashlib.sha256(b"secret").hexdigest()
+    legacy = rate(lambda i: db_manager.verify_password('secret', legacy_hash), 1000)
+    print(f"[auth] SHA-256 без соли (старый формат): {legacy:.0f} входов/с")
+    for factor in (0.25, 0.5, 1, 2):
+        iterations = int(calibrated * factor)
+        db_manager.password_iterations = iterations
+        db_manager.execute_query("DELETE FROM users WHERE username='bench'")
+        db_manager.create_user('bench', 'secret')
+        logins = rate(lambda i: db_manager.find_user('bench', 'secret'), 10)
+        print(f"[auth] {iterations} итераций: {logins:.1f} входов/с на одно ядро")
+    # Неизвестный логин проверяется так же долго, как неверный пароль известного
+    db_manager.password_iterations = calibrated
+    db_manager.execute_query("DELETE FROM users WHERE username='bench'")
+    db_manager.create_user('bench', 'secret')
+    db_manager.find_user('nobody', 'secret')  # Хеш-заглушка создается при первом неизвестном логине
+    wrong_password = min(1 / rate(lambda i: db_manager.find_user('bench', 'wrong'), 10) for attempt in range(3))
+    unknown_user = min(1 / rate(lambda i: db_manager.find_user('nobody', 'wrong'), 10) for attempt in range(3))
+    assert 0.75 < unknown_user / wrong_password < 1.33, (unknown_user, wrong_password)
+    print(f"[auth] отказ: неверный пароль {wrong_password * 1000:.1f} мс, неизвестный логин {unknown_user * 1000:.1f} мс")
+    db_manager.close()
+
+
+def bench_import(module, workdir, projects):
+    # Импорт 10N строк из CSV в формате экспорта: в одном процессе и с разбором в пуле процессов
+    size = projects * 10
+    db_path = os.path.join(workdir, 'import.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    populate_user(db_path, 1, size)
+    populate_user(db_path, 2, 0)
+    file_path = os.path.join(workdir, 'import.csv')
+    job = taskboard.CsvExportJob(db_manager, 1, file_path)
+    job.run()
+    with open(file_path, 'a', newline='') as file:
+        csv.writer(file).writerow(["Битая строка", "Курсовая", "32.13.2024", "", "0", ""])
+    for processes in (1, max(2, os.cpu_count() or 1)):
+        db_manager.execute_query("DELETE FROM projects WHERE user_id=2")
+        start = time.perf_counter()
+        job = taskboard.CsvImportJob(db_manager, 2, file_path, processes=processes)
+        job.run()
+        elapsed = time.perf_counter() - start
+        assert job.error is None, job.error
+        assert job.imported == size and job.rejected == 1, (job.imported, job.rejected)
+        print(f"[import] {size} строк, процессов {processes}: {elapsed:.2f} с, {size / elapsed:.0f} строк/с")
+    db_manager.close()
+
+
+def bench_delete(module, workdir, projects):
+    # Удаление пользователей с N проектами: два запроса с отдельными фиксациями против каскада в одной транзакции
+    db_path = os.path.join(workdir, 'delete.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    for user_id in range(1, 6):
+        populate_user(db_path, user_id, projects)
+    populate_user(db_path, 6, 1000)  # Проекты, которые не должны быть затронуты
+
+    # Прежняя реализация: без внешних ключей, каждый запрос фиксируется отдельно
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    conn.execute("DELETE FROM users WHERE id=?", (1,))
+    conn.commit()
+    conn.execute("DELETE FROM projects WHERE user_id=?", (1,))
+    conn.commit()
+    before = time.perf_counter() - start
+    conn.close()
+
+    start = time.perf_counter()
+    db_manager.delete_user(2)
+    after = time.perf_counter() - start
+    start = time.perf_counter()
+    db_manager.delete_users([3, 4, 5])
+    bulk = time.perf_counter() - start
+
+    counts = dict(db_manager.execute_query("SELECT user_id, COUNT(*) FROM projects GROUP BY user_id", fetch=True))
+    assert counts == {6: 1000}, counts
+    assert not db_manager.execute_query("PRAGMA foreign_key_check", fetch=True)
+    db_manager.close()
+    print(f"[delete] пользователь с {projects} проектами: до {before * 1000:.0f} мс (2 фиксации), "
+          f"после {after * 1000:.0f} мс (1 транзакция); 3 пользователя сразу: {bulk * 1000:.0f} мс")
+
+
+def wait_for(window, condition, timeout=10):
+    # Обработка событий Tk, пока не выполнится условие (ответ рабочего потока приходит через after)
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise AssertionError("Истекло время ожидания")
+        window.update()
+        time.sleep(0.001)
+
+
+def bench_users(module, workdir, projects):
+    # Список пользователей при N аккаунтах: полная выборка против страниц по ключу и поиска по индексу
+    db_path = os.path.join(workdir, 'users.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO users (username, password, role) VALUES (?, ?, 'user')",
+                         ((f"{'User' if i % 2 else 'user'}{i}", "x" * 64) for i in range(projects)))
+    conn.close()
+    start = time.perf_counter()
+    db_manager.execute_query("SELECT id, username, role FROM users", fetch=True)
+    full = time.perf_counter() - start
+
+    def first_page(i):
+        taskboard.UserPager(db_manager).next_page()
+
+    def search(i):
+        taskboard.UserPager(db_manager, f"user{i % 1000}").next_page()
+
+    pager = taskboard.UserPager(db_manager)
+    pages = 0
+    start = time.perf_counter()
+    while pager.next_page():
+        pages += 1
+    scan = (time.perf_counter() - start) / pages
+    assert pages == -(-projects // taskboard.USERS_PAGE_SIZE), pages
+    print(f"[users] {projects} аккаунтов: полная выборка {full * 1000:.0f} мс; первая страница "
+          f"{1000 / rate(first_page, 200):.2f} мс, поиск {1000 / rate(search, 200):.2f} мс, "
+          f"страница по ключу {scan * 1000:.2f} мс")
+
+    if not os.environ.get('DISPLAY'):
+        print("[users] окно управления пользователями пропущено: нет дисплея, запустите под xvfb-run")
+        db_manager.close()
+        return
+    root = module.tk.Tk()
+    root.withdraw()
+    start = time.perf_counter()
+    window = module.ManageUsersWindow(db_manager, root)
+    user_list = window.user_list
+    wait_for(window, lambda: user_list.user_ids)
+    opened = time.perf_counter() - start
+    user_list.search_var.set("user12")
+    start = time.perf_counter()
+    wait_for(window, lambda: user_list.user_ids and user_list.pager.prefix == "user12" and not user_list.loading)
+    searched = time.perf_counter() - start - module.USERS_SEARCH_DELAY / 1000
+    rows = len(user_list.user_ids)
+    removed = user_list.user_ids[1]
+    db_manager.delete_users([removed])
+    user_list.remove_users([removed])
+    assert len(user_list.user_ids) == rows - 1 and removed not in user_list.user_ids
+    assert user_list.listbox.size() == rows - 1
+    print(f"[users] окно: первая страница через {opened * 1000:.0f} мс, поиск {searched * 1000:.0f} мс "
+          f"после паузы ввода, удаление убирает одну строку")
+    window.destroy()
+    root.destroy()
+    db_manager.close()
+
+
+SEARCH_WORDS = ["анализ", "система", "модель", "отчет", "данных", "сети", "базы", "разработка", "учета",
+                "управления", "интерфейс", "алгоритм", "оптимизация", "проектирование", "исследование",
+                "приложение", "сервер", "клиент", "платформа", "мониторинг"]  # Словарь названий проектов для поиска
+
+
+def bench_search(module, workdir, projects):
+    # Поиск проекта пользователя среди 10N проектов: FTS5 против сканирования LIKE '%term%'
+    size = projects * 10
+    db_path = os.path.join(workdir, 'search.db')
+    taskboard.AuthenticationManager(db_path).close()
+    rnd = random.Random(7)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO users (username, password, role) VALUES (?, ?, 'user')",
+                         ((f"user{i}", "x" * 64) for i in range(1, 101)))
+        # Половина проектов - у первого пользователя, остальные распределены между 99 пользователями
+        insert_projects(
+            conn,
+            "INSERT INTO projects (name, type, start_date, end_date, deadline, completed, user_id, file_path) "
+            "VALUES (?, ?, '01.09.2024', '31.12.2099', '2099-12-31', 0, ?, '')",
+            ((f"{rnd.choice(SEARCH_WORDS).capitalize()} {rnd.choice(SEARCH_WORDS)} {i}",
+              rnd.choice(["Курсовая", "Лабораторная", "Диплом"]), 1 if i % 2 else rnd.randint(2, 100))
+             for i in range(size)))
+    conn.close()
+    db_manager = taskboard.AuthenticationManager(db_path)
+    if not db_manager.project_search:
+        print("[search] пропущено: SQLite собран без FTS5")
+        db_manager.close()
+        return
+    start = time.perf_counter()
+    db_manager.rebuild_project_search()
+    rebuilt = time.perf_counter() - start
+    print(f"[search] {size} проектов: перестроение индекса {rebuilt:.1f} с")
+    for user_id in (1, 2):
+        for text in ("ал", "оптимиз", "алгоритм сервер", "12345", "мониторинг сети 54321"):
+            db_manager.project_search = True
+            found = db_manager.search_projects(user_id, text)
+            fts = 1000 / rate(lambda i: db_manager.search_projects(user_id, text), 20)
+            db_manager.project_search = False
+            like = 1000 / rate(lambda i: db_manager.search_projects(user_id, text), 3)
+            print(f"[search] пользователь {user_id}, запрос \"{text}\": FTS {fts:.2f} мс ({len(found)} строк), "
+                  f"LIKE {like:.2f} мс")
+    db_manager.close()
+
+
+def bench_attachments(module, workdir, projects):
+    # Хранилище вложений: скорость хеширования с копированием, дедупликация и шаги сборки мусора
+    db_path = os.path.join(workdir, 'attachments.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    populate_user(db_path, 1, 0)
+    store = db_manager.attachments
+    source_path = os.path.join(workdir, 'attachment.bin')
+    size = projects * 1024  # N КБ
+    with open(source_path, 'wb') as file:
+        for i in range(0, size, 2 ** 20):
+            file.write(os.urandom(min(2 ** 20, size - i)))
+    job = taskboard.AttachmentJob(store, source_path)
+    start = time.perf_counter()
+    job.run()
+    stored = time.perf_counter() - start
+    assert job.error is None and job.processed == size, (job.error, job.processed)
+    digest, blob_size = job.result
+    for i in range(100):
+        duplicate = store.store(source_path)
+        db_manager.add_project(1, f"Проект {i}", "Курсовая", "", "", "", duplicate + (source_path,))
+    blobs = [name for directory in os.listdir(store.root) for name in os.listdir(os.path.join(store.root, directory))]
+    assert blobs == [digest], blobs
+    print(f"[attachments] файл {size / 2 ** 20:.0f} МБ: хеширование с копированием {size / 2 ** 20 / stored:.0f} МБ/с; "
+          f"100 проектов с одним файлом занимают {len(blobs)} файл в хранилище")
+
+    # Мусор: файлы, на которые больше не ссылаются проекты
+    garbage = 10000
+    with sqlite3.connect(db_path) as conn:
+        for i in range(garbage):
+            fake = f"{i:064x}"
+            os.makedirs(os.path.dirname(store.path(fake)), exist_ok=True)
+            with open(store.path(fake), 'wb') as file:
+                file.write(b"x")
+            conn.execute("INSERT INTO attachments (hash, size) VALUES (?, 1)", (fake,))
+    conn.close()
+    steps = []
+    start = time.perf_counter()
+    for step in store.collect_garbage():
+        steps.append(time.perf_counter() - start)
+        start = time.perf_counter()
+    left = db_manager.execute_query("SELECT hash FROM attachments", fetch=True)
+    assert left == [(digest,)] and os.path.exists(store.path(digest)), left
+    print(f"[attachments] сборка мусора {garbage} файлов: {len(steps)} шагов, самый долгий {max(steps) * 1000:.0f} мс, "
+          f"всего {sum(steps):.1f} с")
+    db_manager.close()
+
+
+class FakeBotApi(http.server.ThreadingHTTPServer):
+    # Локальная замена Bot API: принимает sendMessage (иногда отвечает 429 и 500) и отдает обновления через getUpdates
+    daemon_threads = True
+
+    def __init__(self, token, fail_every=0):
+        super().__init__(('127.0.0.1', 0), FakeBotHandler)
+        self.token = token  # Ожидаемый токен бота
+        self.fail_every = fail_every  # Каждый n-й запрос sendMessage получает ошибку (0 - без ошибок)
+        self.requests = 0  # Всего запросов sendMessage
+        self.messages = []  # Принятые сообщения: (время, chat_id, текст)
+        self.updates = []  # Обновления для getUpdates
+        self.handed = {}  # Время выдачи боту сообщения: message_id -> время
+        self.replied = {}  # Время ответа бота на сообщение: message_id -> время
+        self.lock = threading.Condition()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def push_commands(self, commands):
+        # Поступление сообщений с командами от пользователей: [(chat_id, текст), ...]
+        with self.lock:
+            for chat_id, text in commands:
+                number = len(self.updates) + 1
+                self.updates.append({'update_id': number, 'message': {
+                    'message_id': number, 'chat': {'id': chat_id, 'type': 'private'}, 'text': text}})
+            self.lock.notify_all()
+
+    def get_updates(self, offset, timeout, limit=100):
+        # Долгий опрос: обновления начиная с offset или пустой список по истечении timeout
+        deadline = time.perf_counter() + timeout
+        with self.lock:
+            while len(self.updates) < max(offset, 1) and time.perf_counter() < deadline:
+                self.lock.wait(deadline - time.perf_counter())
+            updates = self.updates[max(offset, 1) - 1:max(offset, 1) - 1 + limit]
+            now = time.perf_counter()
+            for update in updates:
+                self.handed.setdefault(update['message']['message_id'], now)
+        return updates
+
+
+class FakeBotHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Постоянные соединения, как у настоящего Bot API
+    disable_nagle_algorithm = True  # Заголовки и тело ответа пишутся отдельно: без этого задержка ACK 40 мс
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if self.path == f"/bot{server.token}/getUpdates":
+            self.reply(200, {'ok': True, 'result': server.get_updates(payload.get('offset', 0), payload.get('timeout', 0))})
+            return
+        with server.lock:
+            server.requests += 1
+            number = server.requests
+        if self.path != f"/bot{server.token}/sendMessage":
+            status, reply = 401, {'ok': False, 'error_code': 401, 'description': "Unauthorized"}
+        elif server.fail_every and number % server.fail_every == 0:
+            status, reply = 429, {'ok': False, 'error_code': 429, 'parameters': {'retry_after': 0.05}}
+        elif server.fail_every and number % server.fail_every == server.fail_every // 2:
+            status, reply = 500, {'ok': False, 'error_code': 500, 'description': "Internal Server Error"}
+        else:
+            with server.lock:
+                now = time.perf_counter()
+                server.messages.append((now, payload['chat_id'], payload['text']))
+                if 'reply_to_message_id' in payload:
+                    server.replied[payload['reply_to_message_id']] = now
+                    server.lock.notify_all()
+            status, reply = 200, {'ok': True, 'result': {'message_id': number}}
+        self.reply(status, reply)
+
+    def reply(self, status, reply):
+        body = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_telegram(module, workdir, projects):
+    # Рассылка сводок по срокам 10 000 пользователям через локальный Bot API: пропускная способность,
+    # повторы при 429/500, отсутствие повторной отправки и соблюдение ограничения скорости
+    users = 10000
+    db_path = os.path.join(workdir, 'telegram.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    today = datetime.date.today()
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO users (id, username, password, role) VALUES (?, ?, ?, 'user')",
+                         ((i, f"user{i}", "x" * 64) for i in range(1, users + 1)))
+        conn.executemany("INSERT INTO telegram_chats (user_id, chat_id) VALUES (?, ?)",
+                         ((i, 100000 + i) for i in range(1, users + 1)))
+        insert_projects(
+            conn,
+            "INSERT INTO projects (name, type, start_date, end_date, deadline, completed, user_id, file_path) "
+            "VALUES (?, 'Курсовая', '', '', ?, ?, ?, '')",
+            ((f"Проект {i}", (today + datetime.timedelta(days=i // users % 5 - 1)).isoformat(), i // users % 4 == 3,
+              i % users + 1)
+             for i in range(max(projects, users * 2))))
+    conn.close()
+    expected = {chat_id for chat_id, rows in db_manager.iterate_due_digests()}
+    start = time.perf_counter()
+    chats = {chat_id: len(rows) for chat_id, rows in db_manager.iterate_due_digests()}
+    grouped = time.perf_counter() - start
+
+    server = FakeBotApi('123:TEST', fail_every=200)
+    dispatcher = taskboard.TelegramDispatcher(db_manager, '123:TEST', server.url, rate=100000, senders=8)
+    start = time.perf_counter()
+    stats = dispatcher.send_digests()
+    elapsed = time.perf_counter() - start
+    delivered = [chat_id for _, chat_id, _ in server.messages]
+    assert sorted(delivered) == sorted(expected), (len(delivered), len(expected))
+    assert stats['sent'] == len(expected) and not stats.get('failed'), stats
+    assert all(len(text) <= taskboard.TELEGRAM_MESSAGE_LIMIT for _, _, text in server.messages)
+    print(f"[telegram] {len(chats)} чатов, {sum(chats.values())} проектов: группировка одним запросом {grouped:.2f} с; "
+          f"рассылка {len(delivered) / elapsed:.0f} сообщений/с, повторов {stats.get('retries', 0)}")
+
+    # Повторный запуск в тот же день ничего не отправляет; изменившиеся сводки уходят заново
+    stats = taskboard.TelegramDispatcher(db_manager, '123:TEST', server.url, rate=100000).send_digests()
+    assert stats.get('sent', 0) == 0 and stats['skipped'] == len(expected), stats
+    changed = 150
+    db_manager.execute_query("UPDATE projects SET name = name || ' (изменен)' WHERE user_id <= ?", (changed,))
+    server.messages.clear()
+    rate, capacity = 30, 30
+    start = time.perf_counter()
+    stats = taskboard.TelegramDispatcher(db_manager, '123:TEST', server.url, rate=rate).send_digests()
+    elapsed = time.perf_counter() - start
+    resent = len(server.messages)
+    assert stats['sent'] == resent == len([chat_id for chat_id in expected if chat_id <= 100000 + changed]), stats
+    times = [moment for moment, _, _ in server.messages]
+    busiest = max(sum(1 for other in times if moment <= other < moment + 1) for moment in times)
+    assert busiest <= rate + capacity + 1 and elapsed >= (resent - capacity) / rate * 0.9, (busiest, elapsed)
+    print(f"[telegram] повторный запуск: 0 отправок; {resent} измененных сводок при ограничении {rate}/с "
+          f"за {elapsed:.1f} с, не больше {busiest} сообщений в секунду")
+    server.shutdown()
+    server.server_close()
+    db_manager.close()
+
+
+def percentile(values, fraction):
+    # Значение, не превышаемое долей fraction отсортированных значений
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def bench_bot(module, workdir, projects):
+    # Нагрузочная проверка асинхронного бота: тысячи одновременных команд от локальной замены Bot API,
+    # задержка ответа p50/p99 при разном числе потоков базы
+    bot_module = load_module('Telegram-bot.py')
+    users, per_user, commands = 1000, 20, 5000
+    db_path = os.path.join(workdir, 'bot.db')
+    taskboard.DatabaseManager(db_path).close()
+    today = datetime.date.today()
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO users (id, username, password, role) VALUES (?, ?, ?, 'user')",
+                         ((i, f"user{i}", "x" * 64) for i in range(1, users + 1)))
+        conn.executemany("INSERT INTO telegram_chats (user_id, chat_id) VALUES (?, ?)",
+                         ((i, 100000 + i) for i in range(1, users + 1)))
+        insert_projects(
+            conn,
+            "INSERT INTO projects (name, type, start_date, end_date, deadline, completed, user_id, file_path) "
+            "VALUES (?, 'Курсовая', '', '', ?, 0, ?, '')",
+            ((f"Проект {i}", (today + datetime.timedelta(days=i % 30 - 5)).isoformat(), i % users + 1)
+             for i in range(users * per_user)))
+    conn.close()
+
+    for workers in (1, 4):
+        db_manager = taskboard.DatabaseManager(db_path, 'balanced')
+        server = FakeBotApi('123:TEST')
+        rnd = random.Random(workers)
+        done = set()
+        batch = []
+        for i in range(commands):
+            user_id = rnd.randint(1, users)
+            kind = rnd.random()
+            if kind < 0.4:
+                text = "/projects"
+            elif kind < 0.8:
+                text = "/due"
+            else:
+                project_id = user_id + users * rnd.randrange(per_user)  # Проект этого пользователя
+                done.add(project_id)
+                text = f"/done {project_id}"
+            batch.append((100000 + user_id, text))
+
+        async def serve():
+            api = bot_module.BotApi('123:TEST', server.url)
+            bot = bot_module.TaskBoardBot(db_manager, api, db_workers=workers)
+            task = asyncio.ensure_future(bot.run(poll_timeout=1))
+            await asyncio.sleep(0.1)
+            start = time.perf_counter()
+            server.push_commands(batch)
+            while len(server.replied) < commands and time.perf_counter() - start < 120:
+                await asyncio.sleep(0.05)
+            elapsed = time.perf_counter() - start
+            bot.stop()
+            await task
+            bot.close()
+            return elapsed
+
+        elapsed = asyncio.run(serve())
+        assert len(server.replied) == commands, len(server.replied)
+        latencies = [(server.replied[number] - server.handed[number]) * 1000 for number in server.replied]
+        completed = {row[0] for row in db_manager.execute_query("SELECT id FROM projects WHERE completed = 1", fetch=True)}
+        assert completed == done, (len(completed), len(done))
+        print(f"[bot] {commands} команд, потоков базы {workers}: {commands / elapsed:.0f} команд/с, "
+              f"задержка ответа p50 {percentile(latencies, 0.5):.0f} мс, p99 {percentile(latencies, 0.99):.0f} мс; "
+              f"завершено проектов {len(completed)}")
+        server.shutdown()
+        server.server_close()
+        db_manager.execute_query("UPDATE projects SET completed = 0")
+        db_manager.close()
+
+
+def bench_cli(module, workdir, projects):
+    # Командная строка: работает без tkinter, запуск укладывается в 100 мс сверх пустого интерпретатора
+    import subprocess
+    db_path = os.path.join(workdir, 'cli.db')
+    taskboard.AuthenticationManager(db_path).close()
+    populate_user(db_path, 1, projects)
+
+    def run(*args):
+        return subprocess.run([sys.executable, '-m', 'taskboard', '--db', db_path] + list(args),
+                              cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+    def best(command, repeat=5):
+        timings = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=ROOT, capture_output=True, check=True)
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    subprocess.run([sys.executable, '-c', "import sys, taskboard; taskboard.main(['--db', sys.argv[1], 'users', 'list']); "
+                    "assert 'tkinter' not in sys.modules, 'tkinter импортирован'", db_path],
+                   cwd=ROOT, capture_output=True, check=True)
+    bare = best([sys.executable, '-c', 'pass'])
+    startup = best([sys.executable, '-m', 'taskboard', '--db', db_path, 'users', 'list']) - bare
+    assert startup < 100, f"Запуск командной строки занимает {startup:.0f} мс сверх интерпретатора"
+
+    opened = run('list', '-u', 'user1', '--open').splitlines()
+    ids = [line.split('\t')[0] for line in opened[:100]]
+    run('done', '-u', 'user1', *ids)
+    start = time.perf_counter()
+    listed = run('list', '-u', 'user1').splitlines()
+    listing = time.perf_counter() - start
+    assert len(listed) == projects and len(run('list', '-u', 'user1', '--open').splitlines()) == len(opened) - 100
+    run('delete', '-u', 'user1', *ids)
+    assert len(run('list', '-u', 'user1').splitlines()) == projects - 100
+    print(f"[cli] запуск {startup:.0f} мс сверх пустого интерпретатора ({bare:.0f} мс), без tkinter; "
+          f"вывод {projects} проектов {listing:.2f} с")
+
+
+def bench_startup(module, workdir, projects):
+    # Запуск приложения: импорт без отложенных модулей и время до первого окна в пределах бюджета
+    import subprocess
+    app_file = os.path.join(ROOT, RELEASE_FILE)
+    load = ("import importlib.util, sys; spec = importlib.util.spec_from_file_location('app', sys.argv[1]); "
+            "app = importlib.util.module_from_spec(spec); spec.loader.exec_module(app); "
+            "loaded = [name for name in app.LAZY_MODULES if name in sys.modules]; "
+            "assert not loaded, f'При импорте загружены отложенные модули: {loaded}'")
+
+    def best(command, repeat=5):
+        timings = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=ROOT, capture_output=True, check=True)
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    bare = best([sys.executable, '-c', 'pass'])
+    imported = best([sys.executable, '-c', load, app_file]) - bare
+    assert imported < STARTUP_IMPORT_BUDGET, (
+        f"Импорт приложения занимает {imported:.0f} мс сверх интерпретатора (бюджет {STARTUP_IMPORT_BUDGET} мс)")
+    if not os.environ.get('DISPLAY'):
+        print(f"[startup] импорт {imported:.0f} мс сверх пустого интерпретатора ({bare:.0f} мс), "
+              f"без отложенных модулей; первое окно пропущено: нет дисплея, запустите под xvfb-run")
+        return
+
+    app_dir = os.path.join(workdir, 'startup')  # Отдельный каталог: приложение создает users.db в текущем
+    os.makedirs(app_dir, exist_ok=True)
+    windows = []
+    for i in range(5):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, app_file, '--startup-report'], cwd=app_dir,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        first_window = None
+        report = []
+        for line in process.stderr:
+            report.append(line)
+            if first_window is None and line.rstrip().endswith('| первое окно'):
+                first_window = (time.perf_counter() - start) * 1000  # От запуска процесса, а не от импорта
+        process.wait(timeout=60)
+        assert process.returncode == 0 and first_window is not None, ''.join(report)
+        assert report[-1].rstrip().endswith('до входа: нет'), report[-1]
+        windows.append(first_window)
+    first_window = min(windows)
+    assert first_window < STARTUP_WINDOW_BUDGET, (
+        f"Первое окно через {first_window:.0f} мс после запуска (бюджет {STARTUP_WINDOW_BUDGET} мс)")
+    print(f"[startup] импорт {imported:.0f} мс сверх пустого интерпретатора ({bare:.0f} мс); "
+          f"первое окно через {first_window:.0f} мс после запуска процесса (первый запуск с созданием базы "
+          f"{windows[0]:.0f} мс)")
+    print(''.join(report), end='')
+
+
+def bench_query_stats(module, workdir, projects):
+    # Статистика запросов: накладные расходы выключенного и включенного сбора, план медленного запроса,
+    # учет всех путей выполнения выражений с местом вызова в Benchmark.py
+    db_path = os.path.join(workdir, 'query_stats.db')
+    db_manager = taskboard.AuthenticationManager(db_path)
+    populate(db_path, 100, projects)
+    query = "SELECT id, name FROM projects WHERE user_id = ? LIMIT 10"
+
+    def raw(i):
+        # Путь execute_query без проверки статистики
+        with db_manager.pool.get_connection() as conn:
+            c = conn.cursor()
+            c.execute(query, (i % 100 + 1,))
+            return c.fetchall()
+
+    def measured(i):
+        db_manager.execute_query(query, (i % 100 + 1,), fetch=True)
+
+    def best(func, count=20000):
+        return min(1e6 / rate(func, count) for attempt in range(3))  # мкс на вызов
+
+    raw_cost = best(raw)
+    disabled_cost = best(measured)
+    stats = db_manager.enable_query_stats(slow_threshold=10)
+    enabled_cost = best(measured)
+    assert disabled_cost - raw_cost < 2, f"Выключенная статистика стоит {disabled_cost - raw_cost:.1f} мкс на запрос"
+
+    for i in range(100):
+        db_manager.execute_query(f"SELECT COUNT(*) FROM projects WHERE user_id = {i}", fetch=True)
+    stats.slow_threshold = 0
+    logged = []
+    stats.log = logged.append
+    db_manager.execute_query("SELECT COUNT(*) FROM projects WHERE name LIKE ?", ('%7%',), fetch=True)
+    statements = {statement['query']: statement for statement in stats.snapshot()}
+    merged = statements["SELECT COUNT(*) FROM projects WHERE user_id = ?"]
+    assert merged['calls'] == 100 and merged['rows'] == 100, merged
+    hot = statements[taskboard.normalize_sql(query)]
+    assert hot['calls'] == 60000 and all('Benchmark.py' in site for site in hot['call_sites']), hot
+    slow = statements["SELECT COUNT(*) FROM projects WHERE name LIKE ?"]
+    assert slow['slow'] == 1 and any('SCAN' in line for line in slow['plan']) and len(logged) == 1, slow
+
+    # Остальные пути выполнения выражений: отложенная запись, рабочий поток, executemany, порционное чтение, импорт
+    stats.slow_threshold = 10
+    db_manager.add_project(1, "Новый проект", "Курсовая", "01.09.2024", "31.12.2099", "2099-12-31")
+    project_ids = [row[0] for row in db_manager.list_projects(2)]
+    db_manager.write("UPDATE projects SET completed = ? WHERE id = ?", (1, project_ids[0]))
+    db_manager.flush().result()
+    db_manager.set_projects_completed(2, project_ids[:5], 0)
+    db_manager.delete_projects(2, project_ids[5:10])
+    db_manager.submit(db_manager.delete_users, [3]).result()
+    export_path = os.path.join(workdir, 'query_stats.csv')
+    taskboard.CsvExportJob(db_manager, 2, export_path).run()
+    job = taskboard.CsvImportJob(db_manager, 4, export_path, processes=1)
+    job.run()
+    assert job.error is None, job.error
+    statements = {statement['query']: statement for statement in stats.snapshot()}
+    for fragment in ("INSERT INTO projects (name, type, start_date, end_date, deadline, file_path, attachment",
+                     "SELECT id, name, type, start_date, end_date, completed, file_path FROM projects",
+                     "UPDATE projects SET completed = ? WHERE id = ?",
+                     "UPDATE projects SET completed = ? WHERE id = ? AND user_id = ?",
+                     "DELETE FROM projects WHERE id = ? AND user_id = ?",
+                     "DELETE FROM users WHERE id=?",
+                     "ORDER BY id",
+                     "deadline, completed, file_path, user_id) VALUES"):
+        assert any(fragment in key for key in statements), fragment
+    outside = {site for statement in statements.values() for site in statement['call_sites']
+               if not site.startswith('Benchmark.py:')}
+    assert not outside, outside
+    dump_path = os.path.join(workdir, 'query_stats.json')
+    stats.dump(dump_path)
+    with open(dump_path, encoding='utf-8') as file:
+        assert len(json.load(file)['statements']) == len(statements)
+    db_manager.disable_query_stats()
+    db_manager.close()
+    print(f"[query_stats] execute_query: {raw_cost:.1f} мкс без проверки, {disabled_cost:.1f} мкс со сбором "
+          f"выключенным, {enabled_cost:.1f} мкс включенным; план медленного запроса: {' / '.join(slow['plan'])}")
+
+
+BENCHMARKS = {
+    'pool': bench_pool,
+    'profiles': bench_profiles,
+    'indexes': bench_indexes,
+    'migrations': bench_migrations,
+    'deadlines': bench_deadlines,
+    'virtual_list': bench_virtual_list,
+    'toggle': bench_toggle,
+    'export': bench_export,
+    'worker': bench_worker,
+    'group_commit': bench_group_commit,
+    'auth': bench_auth,
+    'import': bench_import,
+    'delete': bench_delete,
+    'users': bench_users,
+    'search': bench_search,
+    'attachments': bench_attachments,
+    'telegram': bench_telegram,
+    'bot': bench_bot,
+    'cli': bench_cli,
+    'startup': bench_startup,
+    'query_stats': bench_query_stats,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности TaskBoard")
+    parser.add_argument('names', nargs='*', default=list(BENCHMARKS), help="Какие замеры запустить")
+    parser.add_argument('--projects', type=int, default=100000, help="Количество проектов в базе")
+    args = parser.parse_args()
+
+    module = load_module(RELEASE_FILE)
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in args.names:
+            BENCHMARKS[name](module, workdir, args.projects)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,113 +1,129 @@
-import tkinter as tk
-from tkinter import messagebox, filedialog, Frame
-import sqlite3
-import hashlib
 import datetime
-import csv
-
-
-class DatabaseManager:
-    def __init__(self, db_path):
-        self.db_path = db_path  # Путь к базе данных
-        self.create_tables()  # Создание таблиц
-        self.alter_table()  # Изменение таблиц
-
-    def create_tables(self):
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            # Создание таблицы пользователей, если она не существует
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE,
-                    password TEXT,
-                    role TEXT DEFAULT 'user'
-                )''')
-            # Создание таблицы проектов, если она не существует
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS projects (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT,
-                    type TEXT,
-                    start_date TEXT,
-                    end_date TEXT,
-                    completed INTEGER DEFAULT 0,
-                    user_id INTEGER,
-                    file_path TEXT,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )''')
-            conn.commit()  # Сохранение изменений
-
-    def alter_table(self):
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            # Попытка добавления столбца role в таблицу users
-            try:
-                c.execute("ALTER TABLE users ADD COLUMN role TEXT DEFAULT 'user'")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-
-            # Попытка добавления столбца file_path в таблицу projects
-            try:
-                c.execute("ALTER TABLE projects ADD COLUMN file_path TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-
-    def execute_query(self, query, params=(), fetch=False):
-        # Выполнение SQL-запроса
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute(query, params)
-            if fetch:
-                return c.fetchall()  # Возвращение результатов запроса
-            conn.commit()  # Сохранение изменений
-
-
-class AuthenticationManager(DatabaseManager):
-    def hash_password(self, password):
-        # Хеширование пароля с использованием SHA-256
-        return hashlib.sha256(password.encode()).hexdigest()
-
-    def register_user(self, username, password, role='user'):
-        hashed_password = self.hash_password(password)  # Хеширование пароля
-        try:
-            self.execute_query(
-                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                (username, hashed_password, role)
-            )
-            messagebox.showinfo("Успех", "Пользователь успешно зарегистрирован.")
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Ошибка", "Пользователь с таким именем уже существует.")
+import os
+import sys
+import time
+# filedialog, simpledialog, ttk, csv и hashlib загружаются при первом обращении: окно входа они не используют
+import tkinter as tk
+from tkinter import messagebox, Frame
 
-    def authenticate(self, username, password):
-        hashed_password = self.hash_password(password)  # Хеширование пароля
-        user = self.execute_query(
-            "SELECT id, username, role FROM users WHERE username=? AND password=?",
-            (username, hashed_password),
-            fetch=True
-        )
-        if user:
-            return user[0]  # Возвращение данных пользователя
-        messagebox.showerror("Ошибка", "Неправильный логин или пароль")
-        return None
+from taskboard import (
+    AuthenticationManager, AttachmentJob, CsvExportJob, CsvImportJob, ProjectPager, ProjectSearchPager, UserPager,
+    TaskBoardError, TelegramDispatcher, DAYS_BEFORE, DEFAULT_DB_PROFILE, SLOW_QUERY_THRESHOLD, TELEGRAM_API_URL,
+    USER_ROLES, parse_date,
+)
+
+STARTUP_START = time.perf_counter()  # Модули загружены (время импортов показывает python -X importtime)
+STARTUP_REPORT = '--startup-report' in sys.argv[1:]  # Печатать фазы запуска (режим --startup-report)
+STARTUP_MARKS = []  # Завершенные фазы запуска: (фаза, время от загрузки модулей, с)
+
+
+def mark_startup(phase):
+    # Отметка завершения фазы запуска; в режиме --startup-report строка сразу печатается в stderr, как в -X importtime
+    now = time.perf_counter() - STARTUP_START
+    if STARTUP_REPORT:
+        if not STARTUP_MARKS:
+            print("startup: self [ms] | cumulative | phase", file=sys.stderr)
+        previous = STARTUP_MARKS[-1][1] if STARTUP_MARKS else 0
+        print(f"startup: {(now - previous) * 1000:9.1f} | {now * 1000:10.1f} | {phase}", file=sys.stderr, flush=True)
+    STARTUP_MARKS.append((phase, now))
 
-    def delete_user(self, user_id):
-        # Удаление пользователя и связанных проектов
-        self.execute_query("DELETE FROM users WHERE id=?", (user_id,))
-        self.execute_query("DELETE FROM projects WHERE user_id=?", (user_id,))
+
+FUTURE_POLL_INTERVAL = 15  # Период проверки готовности фоновой операции, мс
+LAZY_MODULES = ('csv', 'hashlib', 'tkinter.filedialog', 'tkinter.simpledialog', 'tkinter.ttk')  # Не нужны до входа
+
+
+def run_in_background(window, db_manager, callback, func, *args):
+    # Операция с базой в рабочем потоке; результат передается в callback в потоке Tk через after()
+    return watch_future(window, db_manager.submit(func, *args), callback)
+
+
+def watch_future(window, future, callback, on_error=None):
+    # Ожидание Future без блокировки Tk: окно показывает занятость, callback и on_error вызываются в потоке Tk
+    window.busy_count = getattr(window, 'busy_count', 0) + 1
+    window.config(cursor='watch')  # Признак занятости вместо зависшего окна
+
+    def check():
+        if not window.winfo_exists():
+            return
+        if not future.done():
+            window.after(FUTURE_POLL_INTERVAL, check)
+            return
+        window.busy_count -= 1
+        if not window.busy_count:
+            window.config(cursor='')
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            root = window.nametowidget('.')
+            if error is not getattr(root, 'reported_error', None):
+                # Ошибка группы отложенных записей приходит во все ее Future: сообщение показывается один раз
+                root.reported_error = error
+                messagebox.showerror("Ошибка", f"Ошибка базы данных: {error}")
+        elif callback:
+            callback(future.result())
+
+    window.after(FUTURE_POLL_INTERVAL, check)
+    return future
+
+
+class ClockService:
+    def __init__(self, root):
+        self.root = root  # Корневое окно, через которое планируются обновления
+        self.labels = []  # Подписанные метки времени
+        self.job = None  # Идентификатор запланированного обновления
+
+    @classmethod
+    def of(cls, widget):
+        # Общие часы для корневого окна, которому принадлежит виджет
+        root = widget.nametowidget('.')
+        service = getattr(root, 'clock_service', None)
+        if service is None:
+            service = root.clock_service = cls(root)
+        return service
+
+    def subscribe(self, label):
+        # Подписка метки: отписка при уничтожении, пробуждение при показе окна
+        self.labels.append(label)
+        label.bind("<Destroy>", lambda e: self.unsubscribe(label), add='+')
+        label.winfo_toplevel().bind("<Map>", lambda e: self.wake(), add='+')
+        label.config(text=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self.wake()
+
+    def unsubscribe(self, label):
+        # Отписка метки; без подписчиков часы останавливаются
+        if label in self.labels:
+            self.labels.remove(label)
+        if not self.labels and self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+
+    def wake(self):
+        # Планирование следующего обновления на начало следующей секунды
+        if self.job is None and self.labels:
+            delay = 1000 - datetime.datetime.now().microsecond // 1000
+            self.job = self.root.after(delay, self.tick)
+
+    def tick(self):
+        # Обновление только видимых меток; если видимых нет, часы засыпают до показа окна
+        if self.job is not None:
+            self.root.after_cancel(self.job)  # При внеочередном вызове запланированное обновление не дублируется
+            self.job = None
+        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        visible = [label for label in self.labels if label.winfo_viewable()]
+        for label in visible:
+            label.config(text=now)
+        if visible:
+            self.wake()
 
 
 class Application(tk.Tk):
-    def __init__(self, db_manager):
+    def __init__(self, db_manager=None):
         super().__init__()
-        self.db_manager = db_manager  # Менеджер базы данных
-        self.title("TaskBoard - Вход и регистрация")
-        self.geometry("600x400")
-        self.center_window(600, 400)  # Центрирование окна
-        self.create_widgets()  # Создание виджетов
-        self.update_time()  # Обновление времени
+        self.db_manager = db_manager  # Менеджер базы данных (None, пока база открывается в фоне)
+        self.screens = {}  # Созданные экраны: имя -> экран (виджеты переиспользуются при повторном показе)
+        self.current = None  # Показанный экран
+        self.show_screen('login')  # Первый экран - вход
 
     def center_window(self, width, height):
         # Центрирование окна на экране
@@ -117,6 +133,48 @@ class Application(tk.Tk):
         y = (screen_height - height) // 2
         self.geometry(f"{width}x{height}+{x}+{y}")
 
+    def show_screen(self, name, *args):
+        # Переключение экрана в единственном корневом окне: экран создается один раз, затем только обновляет данные
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = self.screens[name] = SCREENS[name](self, self.db_manager)
+        if self.current is not None and self.current is not screen:
+            self.current.pack_forget()
+        screen.show(*args)
+        screen.pack(fill=tk.BOTH, expand=True)
+        self.current = screen
+        self.title(screen.title)
+        self.center_window(*screen.size)
+        ClockService.of(self).wake()  # Часы могли уснуть, пока ни одна метка не была видна
+        return screen
+
+    def set_db_manager(self, db_manager):
+        # База открыта и схема проверена: экран входа разблокирует кнопки, которым нужна база
+        self.db_manager = db_manager
+        self.screens['login'].update_ready()
+
+    def close_child_windows(self):
+        # Закрытие открытых дочерних окон (при выходе из аккаунта они не должны оставаться на экране)
+        for child in self.winfo_children():
+            if isinstance(child, tk.Toplevel):
+                child.destroy()
+
+
+class LoginScreen(tk.Frame):
+    title = "TaskBoard - Вход и регистрация"  # Заголовок окна
+    size = (600, 400)  # Размер окна
+
+    def __init__(self, app, db_manager):
+        super().__init__(app)
+        self.app = app  # Корневое окно с переключением экранов
+        self.create_widgets()  # Создание виджетов
+        ClockService.of(self).subscribe(self.current_time_label)  # Подписка на общие часы
+
+    @property
+    def db_manager(self):
+        # Менеджер базы данных приложения: экран входа показывается раньше, чем база открыта
+        return self.app.db_manager
+
     def create_widgets(self):
         frame = tk.Frame(self)
         frame.pack(expand=True)
@@ -132,44 +190,55 @@ class Application(tk.Tk):
         self.entry_password = tk.Entry(frame, show="*", font=("Helvetica", 14))
         self.entry_password.grid(row=2, column=1, sticky=(tk.W, tk.E), padx=10, pady=10)
 
-        tk.Button(frame, text="Вход", command=self.login, font=("Helvetica", 14)).grid(row=3, column=0, columnspan=2, pady=10)
-        tk.Button(frame, text="Регистрация", command=self.open_register_window, font=("Helvetica", 14)).grid(row=4, column=0, columnspan=2, pady=10)
-        tk.Button(frame, text="Список пользователей", command=self.show_users, font=("Helvetica", 14)).grid(row=5, column=0, columnspan=2, pady=10)
+        self.db_buttons = [
+            tk.Button(frame, text="Вход", command=self.login, font=("Helvetica", 14)),
+            tk.Button(frame, text="Регистрация", command=self.open_register_window, font=("Helvetica", 14)),
+            tk.Button(frame, text="Список пользователей", command=self.show_users, font=("Helvetica", 14)),
+        ]  # Кнопки, которым нужна база: недоступны, пока она открывается
+        for row, button in enumerate(self.db_buttons, 3):
+            button.grid(row=row, column=0, columnspan=2, pady=10)
         tk.Button(frame, text="Выход", command=self.quit_application, font=("Helvetica", 14)).grid(row=6, column=0, columnspan=2, pady=10)
 
         frame.grid_columnconfigure(0, weight=1)
         frame.grid_columnconfigure(1, weight=1)
 
-    def update_time(self):
-        # Обновление текущего времени на метке
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.current_time_label.config(text=now)
-        self.after(1000, self.update_time)
+    def show(self):
+        # Подготовка к показу: пароль предыдущего входа не сохраняется
+        self.entry_password.delete(0, tk.END)
+        self.entry_username.focus_set()
+        self.update_ready()
+
+    def update_ready(self):
+        # Доступность кнопок входа, регистрации и списка пользователей по готовности базы
+        state = tk.NORMAL if self.db_manager is not None else tk.DISABLED
+        for button in self.db_buttons:
+            button.config(state=state)
 
     def login(self):
         # Обработка входа пользователя
         username = self.entry_username.get()
         password = self.entry_password.get()
-        user = self.db_manager.authenticate(username, password)
-        if user:
-            user_id, username, role = user
-            self.destroy()
-            MainWindow(self.db_manager, user_id, username, role)
+        run_in_background(self, self.db_manager, self.finish_login, self.db_manager.find_user, username, password)
+
+    def finish_login(self, user):
+        # Завершение входа после проверки пароля в рабочем потоке
+        if not user:
+            messagebox.showerror("Ошибка", "Неправильный логин или пароль")
+            return
+        user_id, username, role = user
+        self.app.show_screen('main', user_id, username, role)
 
     def open_register_window(self):
         # Открытие окна регистрации
         RegisterWindow(self.db_manager)
 
     def show_users(self):
-        # Показ списка зарегистрированных пользователей
-        users = self.db_manager.execute_query("SELECT username FROM users", fetch=True)
-        users_window = tk.Toplevel(self)
+        # Показ списка зарегистрированных пользователей с поиском и постраничной подгрузкой
+        users_window = tk.Toplevel(self.app)
         users_window.title("Список пользователей")
-        users_window.geometry("300x200")
-        self.center_window_in_window(users_window, 300, 200)
-        for user in users:
-            user_label = tk.Label(users_window, text=f"Пользователь: {user[0]}", font=("Helvetica", 12))
-            user_label.pack(anchor='w', padx=10, pady=5)
+        users_window.geometry("300x400")
+        self.center_window_in_window(users_window, 300, 400)
+        UserList(users_window, self.db_manager).pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
     def center_window_in_window(self, window, width, height):
         # Центрирование дочернего окна
@@ -181,7 +250,7 @@ class Application(tk.Tk):
 
     def quit_application(self):
         # Завершение работы приложения
-        self.destroy()
+        self.app.destroy()
 
 
 class RegisterWindow(tk.Toplevel):
@@ -235,41 +304,42 @@ class RegisterWindow(tk.Toplevel):
             messagebox.showerror("Ошибка", "Пароли не совпадают")
             return
 
-        if role not in ['admin', 'user']:
+        if role not in USER_ROLES:
             messagebox.showerror("Ошибка", "Роль должна быть 'admin' или 'user'")
             return
 
-        self.db_manager.register_user(username, password, role)
-        self.destroy()
+        # Хеширование пароля занимает ~100 мс, поэтому регистрация выполняется в рабочем потоке
+        run_in_background(self, self.db_manager, self.finish_register,
+                          self.db_manager.create_user, username, password, role)
+
+    def finish_register(self, created):
+        # Сообщение о результате регистрации
+        if created:
+            messagebox.showinfo("Успех", "Пользователь успешно зарегистрирован.")
+            self.destroy()
+        else:
+            messagebox.showerror("Ошибка", "Пользователь с таким именем уже существует.")
 
 
-class MainWindow(tk.Tk):
-    def __init__(self, db_manager, user_id, username, role):
-        super().__init__()
+class MainScreen(tk.Frame):
+    title = "TaskBoard - Личный кабинет"  # Заголовок окна
+    size = (800, 660)  # Размер окна
+
+    def __init__(self, app, db_manager):
+        super().__init__(app)
+        self.app = app  # Корневое окно с переключением экранов
         self.db_manager = db_manager  # Менеджер базы данных
-        self.user_id = user_id  # Идентификатор пользователя
-        self.username = username  # Имя пользователя
-        self.role = role  # Роль пользователя
-        self.title("TaskBoard - Личный кабинет")
-        self.geometry("800x600")
-        self.center_window(800, 600)  # Центрирование окна
+        self.user_id = None  # Идентификатор пользователя
+        self.username = None  # Имя пользователя
+        self.role = None  # Роль пользователя
         self.create_widgets()  # Создание виджетов
-        self.update_time()  # Обновление времени
-
-    def center_window(self, width, height):
-        # Центрирование окна на экране
-        screen_width = self.winfo_screenwidth()
-        screen_height = self.winfo_screenheight()
-        x = (screen_width - width) // 2
-        y = (screen_height - height) // 2
-        self.geometry(f"{width}x{height}+{x}+{y}")
+        ClockService.of(self).subscribe(self.current_time_label)  # Подписка на общие часы
 
     def create_widgets(self):
         frame = tk.Frame(self)
         frame.pack(expand=True)
 
-        greeting = f"Добро пожаловать, {self.username}!"
-        self.greeting_label = tk.Label(frame, text=greeting, font=("Helvetica", 16))
+        self.greeting_label = tk.Label(frame, text="", font=("Helvetica", 16))
         self.greeting_label.grid(row=0, column=0, columnspan=2, pady=10)
 
         self.current_time_label = tk.Label(frame, text="", font=("Helvetica", 14))
@@ -278,60 +348,155 @@ class MainWindow(tk.Tk):
         tk.Button(frame, text="Проекты", command=self.open_projects_window, font=("Helvetica", 14)).grid(row=2, column=0, columnspan=2, pady=10)
         tk.Button(frame, text="Удалить свой аккаунт", command=self.delete_own_account, font=("Helvetica", 14)).grid(row=3, column=0, columnspan=2, pady=10)
         tk.Button(frame, text="Экспортировать проекты в CSV", command=self.export_projects_to_csv, font=("Helvetica", 14)).grid(row=4, column=0, columnspan=2, pady=10)
+        tk.Button(frame, text="Импортировать проекты из CSV", command=self.import_projects_from_csv, font=("Helvetica", 14)).grid(row=5, column=0, columnspan=2, pady=10)
+
+        tk.Button(frame, text="Уведомления в Telegram", command=self.link_telegram, font=("Helvetica", 14)).grid(row=6, column=0, columnspan=2, pady=10)
+
+        self.manage_users_button = tk.Button(frame, text="Управление пользователями", command=self.manage_users, font=("Helvetica", 14))
+        self.manage_users_button.grid(row=7, column=0, columnspan=2, pady=10)
 
-        if self.role == 'admin':
-            tk.Button(frame, text="Управление пользователями", command=self.manage_users, font=("Helvetica", 14)).grid(row=5, column=0, columnspan=2, pady=10)
+        self.query_stats_button = tk.Button(frame, text="Статистика запросов", command=self.show_query_stats, font=("Helvetica", 14))
+        self.query_stats_button.grid(row=8, column=0, columnspan=2, pady=10)
 
-        tk.Button(frame, text="Выход", command=self.logout, font=("Helvetica", 14)).grid(row=6, column=0, columnspan=2, pady=10)
+        tk.Button(frame, text="Выход", command=self.logout, font=("Helvetica", 14)).grid(row=9, column=0, columnspan=2, pady=10)
 
         frame.grid_columnconfigure(0, weight=1)
         frame.grid_columnconfigure(1, weight=1)
 
-    def update_time(self):
-        # Обновление текущего времени на метке
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.current_time_label.config(text=now)
-        self.after(1000, self.update_time)
+    def show(self, user_id, username, role):
+        # Данные вошедшего пользователя в уже созданных виджетах; управление пользователями - только для администраторов
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.greeting_label.config(text=f"Добро пожаловать, {username}!")
+        if role == 'admin':
+            self.manage_users_button.grid()
+            self.query_stats_button.grid()
+        else:
+            self.manage_users_button.grid_remove()
+            self.query_stats_button.grid_remove()
 
     def open_projects_window(self):
         # Открытие окна проектов
-        self.withdraw()
-        ProjectsWindow(self.db_manager, self.user_id, self)
+        self.app.withdraw()
+        ProjectsWindow(self.db_manager, self.user_id, self.app)
 
     def delete_own_account(self):
-        # Удаление собственного аккаунта
+        # Удаление собственного аккаунта в рабочем потоке (каскадное удаление проектов занимает время)
         if messagebox.askyesno("Подтверждение", "Вы уверены, что хотите удалить свой аккаунт?"):
-            self.db_manager.delete_user(self.user_id)
-            messagebox.showinfo("Успех", "Ваш аккаунт успешно удален.")
-            self.logout()
+            run_in_background(self, self.db_manager, lambda result: self.finish_delete_own_account(),
+                              self.db_manager.delete_user, self.user_id)
+
+    def finish_delete_own_account(self):
+        # Сообщение и выход после удаления аккаунта
+        messagebox.showinfo("Успех", "Ваш аккаунт успешно удален.")
+        self.logout()
+
+    def link_telegram(self):
+        # Привязка чата Telegram для ежедневной сводки по срокам (chat id сообщает бот по команде /start);
+        # текущая привязка читается в рабочем потоке
+        run_in_background(self, self.db_manager, self.ask_telegram_chat, self.db_manager.get_telegram_chat, self.user_id)
+
+    def ask_telegram_chat(self, current):
+        # Запрос chat id у пользователя и сохранение привязки в рабочем потоке
+        from tkinter import simpledialog
+        text = simpledialog.askstring(
+            "Уведомления в Telegram", "Chat ID из ответа бота на /start (пусто - отключить уведомления):",
+            initialvalue="" if current is None else str(current), parent=self.app)
+        if text is None:
+            return
+        text = text.strip()
+        if text and not text.lstrip('-').isdigit():
+            messagebox.showerror("Ошибка", "Chat ID должен быть числом")
+            return
+        run_in_background(self, self.db_manager, None, self.db_manager.link_telegram_chat,
+                          self.user_id, int(text) if text else None)
 
     def export_projects_to_csv(self):
-        # Экспорт проектов в CSV файл
-        projects = self.db_manager.execute_query(
-            "SELECT name, type, start_date, end_date, completed, file_path FROM projects WHERE user_id=?",
-            (self.user_id,), fetch=True
-        )
-
-        if not projects:
+        # Экспорт проектов в выбранный CSV файл в фоновом потоке
+        from tkinter import filedialog
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv", initialfile="projects.csv", filetypes=[("CSV", "*.csv")])
+        if not file_path:
+            return
+        job = CsvExportJob(self.db_manager, self.user_id, file_path)
+        if not job.total:
             messagebox.showinfo("Информация", "Нет проектов для экспорта")
             return
+        JobProgressWindow(job)
 
-        with open('projects.csv', 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Название", "Тип", "Дата начала", "Дата окончания", "Завершен", "Путь к файлу"])
-            writer.writerows(projects)
-
-        messagebox.showinfo("Успех", "Проекты успешно экспортированы в projects.csv")
+    def import_projects_from_csv(self):
+        # Импорт проектов из CSV файла (в формате экспорта) в фоновом потоке
+        from tkinter import filedialog
+        file_path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv")])
+        if not file_path:
+            return
+        try:
+            job = CsvImportJob(self.db_manager, self.user_id, file_path)
+        except TaskBoardError as error:
+            messagebox.showerror("Ошибка", str(error))
+            return
+        JobProgressWindow(job)
 
     def logout(self):
-        # Выход из аккаунта и возврат на экран входа
-        self.destroy()
-        app = Application(self.db_manager)
-        app.mainloop()
+        # Выход из аккаунта и возврат на экран входа в том же окне
+        self.app.close_child_windows()
+        self.app.show_screen('login')
 
     def manage_users(self):
         # Открытие окна управления пользователями (для администраторов)
-        ManageUsersWindow(self.db_manager, self)
+        ManageUsersWindow(self.db_manager, self.app)
+
+    def show_query_stats(self):
+        # Открытие окна статистики SQL-запросов (для администраторов)
+        QueryStatsWindow(self.db_manager)
+
+
+SCREENS = {'login': LoginScreen, 'main': MainScreen}  # Экраны корневого окна по именам
+
+
+class JobProgressWindow(tk.Toplevel):
+    def __init__(self, job, on_finish=None):
+        super().__init__()
+        self.job = job  # Выполняемая фоновая операция (экспорт, импорт, добавление файла)
+        self.on_finish = on_finish  # Обработчик успешного завершения операции
+        self.title(job.title)
+        self.geometry("400x150")
+        self.create_widgets()  # Создание виджетов
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.job.start()
+        self.poll()
+
+    def create_widgets(self):
+        from tkinter import ttk
+        self.progress_label = tk.Label(self, text="", font=("Helvetica", 12))
+        self.progress_label.pack(pady=10)
+        self.progress_bar = ttk.Progressbar(self, length=350, maximum=max(self.job.total, 1))
+        self.progress_bar.pack(padx=10)
+        self.cancel_button = tk.Button(self, text="Отмена", command=self.cancel, font=("Helvetica", 12))
+        self.cancel_button.pack(pady=10)
+
+    def poll(self):
+        # Опрос хода выполнения; Tk обновляется только из главного потока
+        self.progress_bar['value'] = self.job.processed
+        self.progress_label.config(text=self.job.progress_text())
+        if self.job.is_alive():
+            self.after(100, self.poll)
+            return
+        self.destroy()
+        success, message = self.job.result_message()
+        if not success:
+            messagebox.showerror("Ошибка", message)
+            return
+        if message:
+            messagebox.showinfo("Информация", message)
+        if self.on_finish and not self.job.cancelled.is_set():
+            self.on_finish(self.job)
+
+    def cancel(self):
+        # Отмена; окно закроется после остановки рабочего потока
+        self.job.cancel()
+        self.cancel_button.config(state=tk.DISABLED)
 
 
 class ManageUsersWindow(tk.Toplevel):
@@ -353,18 +518,209 @@ class ManageUsersWindow(tk.Toplevel):
         self.geometry(f"{width}x{height}+{x}+{y}")
 
     def create_widgets(self):
-        # Создание виджетов для управления пользователями
-        users = self.db_manager.execute_query("SELECT id, username, role FROM users", fetch=True)
-        for i, user in enumerate(users):
-            user_id, username, role = user
-            tk.Label(self, text=f"{username} ({role})", font=("Helvetica", 14)).grid(row=i, column=0, padx=10, pady=10)
-            tk.Button(self, text="Удалить", command=lambda u=user_id: self.delete_user(u), font=("Helvetica", 14)).grid(row=i, column=1, padx=10, pady=10)
-
-    def delete_user(self, user_id):
-        # Удаление пользователя и обновление списка пользователей
-        self.db_manager.delete_user(user_id)
-        self.destroy()
-        self.__init__(self.db_manager, self.parent)
+        # Создание виджетов для управления пользователями: список с поиском и множественным выбором
+        self.user_list = UserList(self, self.db_manager, selectmode=tk.EXTENDED)
+        self.user_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        tk.Button(self, text="Удалить выбранных", command=self.delete_selected_users, font=("Helvetica", 14)).pack(pady=10)
+
+    def delete_selected_users(self):
+        # Удаление выбранных пользователей одной транзакцией в рабочем потоке
+        user_ids = self.user_list.selected_user_ids()
+        if not user_ids:
+            messagebox.showinfo("Информация", "Выберите пользователей для удаления", parent=self)
+            return
+        if not messagebox.askyesno("Подтверждение", f"Удалить выбранных пользователей ({len(user_ids)}) "
+                                   "вместе с их проектами?", parent=self):
+            return
+        run_in_background(self, self.db_manager, lambda result: self.user_list.remove_users(user_ids),
+                          self.db_manager.delete_users, user_ids)
+
+
+QUERY_STATS_COLUMNS = (
+    ('query', "Запрос", 420), ('calls', "Вызовов", 70), ('total_ms', "Всего, мс", 80), ('mean_ms', "Среднее, мс", 90),
+    ('max_ms', "Макс., мс", 80), ('rows', "Строк", 70), ('slow', "Медленных", 80),
+)  # Столбцы таблицы статистики: (ключ, заголовок, ширина)
+
+
+class QueryStatsWindow(tk.Toplevel):
+    def __init__(self, db_manager):
+        super().__init__()
+        self.db_manager = db_manager  # Менеджер базы данных
+        self.stats = db_manager.query_stats  # Собранная статистика (остается доступной после выключения сбора)
+        self.statements = []  # Строки статистики в порядке таблицы
+        self.title("Статистика запросов")
+        self.geometry("1000x600")
+        self.create_widgets()  # Создание виджетов
+        self.refresh()
+
+    def create_widgets(self):
+        # Переключатель сбора, порог медленного запроса, таблица запросов и подробности выбранного запроса
+        from tkinter import ttk
+        controls = tk.Frame(self)
+        controls.pack(fill=tk.X, padx=10, pady=10)
+        self.enabled_var = tk.BooleanVar(value=self.db_manager.query_stats is not None)
+        tk.Checkbutton(controls, text="Собирать статистику", variable=self.enabled_var, command=self.toggle_stats,
+                       font=("Helvetica", 12)).pack(side=tk.LEFT)
+        tk.Label(controls, text="Порог медленного запроса, мс:", font=("Helvetica", 12)).pack(side=tk.LEFT, padx=(20, 5))
+        threshold = self.stats.slow_threshold if self.stats else SLOW_QUERY_THRESHOLD
+        self.threshold_var = tk.StringVar(value=f"{threshold * 1000:g}")
+        tk.Entry(controls, textvariable=self.threshold_var, width=8, font=("Helvetica", 12)).pack(side=tk.LEFT)
+        tk.Button(controls, text="Сохранить в JSON", command=self.dump, font=("Helvetica", 12)).pack(side=tk.RIGHT)
+        tk.Button(controls, text="Сбросить", command=self.reset, font=("Helvetica", 12)).pack(side=tk.RIGHT, padx=5)
+        tk.Button(controls, text="Обновить", command=self.refresh, font=("Helvetica", 12)).pack(side=tk.RIGHT)
+
+        self.tree = ttk.Treeview(self, columns=[key for key, title, width in QUERY_STATS_COLUMNS], show='headings')
+        for key, title, width in QUERY_STATS_COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor=tk.W if key == 'query' else tk.E, stretch=key == 'query')
+        self.tree.bind('<<TreeviewSelect>>', self.show_details)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.details = tk.Text(self, height=10, font=("Courier", 10), state=tk.DISABLED)
+        self.details.pack(fill=tk.X, padx=10, pady=10)
+
+    def toggle_stats(self):
+        # Включение и выключение сбора; при выключении execute_query снова работает без замеров
+        if not self.enabled_var.get():
+            self.db_manager.disable_query_stats()
+            return
+        threshold = self.read_threshold()
+        if threshold is None:
+            self.enabled_var.set(False)
+            return
+        self.stats = self.db_manager.enable_query_stats(threshold, print)
+
+    def read_threshold(self):
+        # Порог медленного запроса из поля ввода, в секундах; None - ошибка ввода
+        try:
+            threshold = float(self.threshold_var.get().replace(',', '.'))
+        except ValueError:
+            threshold = -1
+        if threshold < 0:
+            messagebox.showerror("Ошибка", "Порог должен быть неотрицательным числом миллисекунд", parent=self)
+            return None
+        return threshold / 1000
+
+    def refresh(self):
+        # Перечитывание накопленной статистики
+        self.statements = self.stats.snapshot() if self.stats else []
+        self.tree.delete(*self.tree.get_children())
+        for index, statement in enumerate(self.statements):
+            self.tree.insert('', tk.END, iid=str(index),
+                             values=[statement[key] for key, title, width in QUERY_STATS_COLUMNS])
+        self.set_details("" if self.statements else "Статистика пуста: включите сбор и поработайте с приложением")
+
+    def show_details(self, event=None):
+        # Места вызова и план выбранного запроса
+        selection = self.tree.selection()
+        if not selection:
+            return
+        statement = self.statements[int(selection[0])]
+        lines = [statement['query'], "", "Места вызова:"]
+        lines += [f"  {site}: {count}" for site, count in statement['call_sites'].items()]
+        if statement['plan'] is not None:
+            lines += ["", "План медленного запроса:"] + [f"  {line}" for line in statement['plan']]
+        self.set_details("\n".join(lines))
+
+    def set_details(self, text):
+        # Текст панели подробностей (только для чтения)
+        self.details.config(state=tk.NORMAL)
+        self.details.delete('1.0', tk.END)
+        self.details.insert('1.0', text)
+        self.details.config(state=tk.DISABLED)
+
+    def reset(self):
+        # Очистка статистики
+        if self.stats:
+            self.stats.reset()
+        self.refresh()
+
+    def dump(self):
+        # Выгрузка статистики в JSON
+        if not self.stats:
+            messagebox.showinfo("Информация", "Статистика еще не собиралась", parent=self)
+            return
+        from tkinter import filedialog
+        file_path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".json", initialfile="query-stats.json", filetypes=[("JSON", "*.json")])
+        if not file_path:
+            return
+        try:
+            self.stats.dump(file_path)
+        except OSError as error:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить статистику: {error}", parent=self)
+
+
+USERS_SEARCH_DELAY = 200  # Пауза после ввода перед поиском пользователей, мс
+USERS_PRELOAD_FRACTION = 0.9  # Доля прокрутки, после которой подгружается следующая страница
+
+
+class UserList(tk.Frame):
+    def __init__(self, parent, db_manager, selectmode=tk.BROWSE):
+        super().__init__(parent)
+        self.db_manager = db_manager  # Менеджер базы данных
+        self.pager = None  # Источник страниц для текущего поискового запроса
+        self.loading = None  # Источник, страница которого сейчас загружается
+        self.search_job = None  # Отложенный поиск (after)
+        self.user_ids = []  # id пользователей в порядке строк списка
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', self.schedule_search)
+        tk.Entry(self, textvariable=self.search_var, font=("Helvetica", 14)).pack(fill=tk.X, pady=(0, 5))
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL)
+        self.listbox = tk.Listbox(self, selectmode=selectmode, yscrollcommand=self.on_scroll, font=("Helvetica", 14))
+        self.scrollbar.config(command=self.listbox.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.search()
+
+    def schedule_search(self, *args):
+        # Поиск по мере ввода: запрос выполняется после паузы в наборе
+        if self.search_job:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(USERS_SEARCH_DELAY, self.search)
+
+    def search(self):
+        # Новый поиск: список очищается и загружается первая страница
+        self.search_job = None
+        self.pager = UserPager(self.db_manager, self.search_var.get().strip())
+        self.loading = None
+        self.user_ids = []
+        self.listbox.delete(0, tk.END)
+        self.load_more()
+
+    def load_more(self):
+        # Загрузка следующей страницы в рабочем потоке
+        pager = self.pager
+        if self.loading is pager or pager.exhausted:
+            return
+        self.loading = pager
+        run_in_background(self, self.db_manager, lambda rows: self.show_page(pager, rows), pager.next_page)
+
+    def show_page(self, pager, rows):
+        # Добавление страницы в конец списка (ответы на устаревший поиск отбрасываются)
+        if pager is not self.pager:
+            return
+        self.loading = None
+        for user_id, username, role in rows:
+            self.user_ids.append(user_id)
+            self.listbox.insert(tk.END, f"{username} ({role})")
+
+    def on_scroll(self, first, last):
+        # Подгрузка следующей страницы при прокрутке к концу списка
+        self.scrollbar.set(first, last)
+        if self.pager and float(last) >= USERS_PRELOAD_FRACTION:
+            self.load_more()
+
+    def selected_user_ids(self):
+        # id выбранных пользователей
+        return [self.user_ids[index] for index in self.listbox.curselection()]
+
+    def remove_users(self, user_ids):
+        # Удаление строк пользователей из списка без повторной загрузки
+        removed = set(user_ids)
+        for index in reversed(range(len(self.user_ids))):
+            if self.user_ids[index] in removed:
+                del self.user_ids[index]
+                self.listbox.delete(index)
 
 
 class ProjectsWindow(tk.Toplevel):
@@ -374,10 +730,12 @@ class ProjectsWindow(tk.Toplevel):
         self.user_id = user_id  # Идентификатор пользователя
         self.parent = parent  # Родительское окно
         self.title("TaskBoard - Проекты")
+        self.attachment = None  # Скопированный в хранилище файл: (хеш, размер, исходный путь)
+        self.attachment_job = None  # Последнее копирование файла в хранилище
         self.geometry("800x600")
         self.center_window(800, 600)  # Центрирование окна
         self.create_widgets()  # Создание виджетов
-        self.update_time()  # Обновление времени
+        ClockService.of(self).subscribe(self.current_time_label)  # Подписка на общие часы
 
     def center_window(self, width, height):
         # Центрирование окна на экране
@@ -411,7 +769,7 @@ class ProjectsWindow(tk.Toplevel):
         self.entry_end_date.grid(row=4, column=1, columnspan=2, sticky=(tk.W, tk.E), padx=10, pady=10)
 
         tk.Label(frame, text="Прикрепленный файл:", font=("Helvetica", 14)).grid(row=5, column=0, sticky=tk.E, padx=10, pady=10)
-        self.entry_file_path = tk.Entry(frame, font=("Helvetica", 14))
+        self.entry_file_path = tk.Entry(frame, font=("Helvetica", 14), state='readonly')
         self.entry_file_path.grid(row=5, column=1, sticky=(tk.W, tk.E), padx=10, pady=10)
         tk.Button(frame, text="Выбрать файл", command=self.select_file, font=("Helvetica", 14)).grid(row=5, column=2, sticky=(tk.W, tk.E), padx=10, pady=10)
 
@@ -422,18 +780,31 @@ class ProjectsWindow(tk.Toplevel):
         frame.grid_columnconfigure(1, weight=1)
         frame.grid_columnconfigure(2, weight=1)
 
-    def update_time(self):
-        # Обновление текущего времени на метке
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.current_time_label.config(text=now)
-        self.after(1000, self.update_time)
-
     def select_file(self):
-        # Открытие диалогового окна для выбора файла
+        # Выбор файла и его копирование в хранилище вложений в фоновом потоке
+        from tkinter import filedialog
         file_path = filedialog.askopenfilename()
-        if file_path:
-            self.entry_file_path.delete(0, tk.END)
-            self.entry_file_path.insert(0, file_path)
+        if not file_path:
+            return
+        self.attachment = None
+        self.set_file_path("")
+        self.attachment_job = AttachmentJob(self.db_manager.attachments, file_path)
+        JobProgressWindow(self.attachment_job, self.finish_select_file)
+
+    def finish_select_file(self, job):
+        # Запоминание скопированного файла для добавляемого проекта
+        if job is not self.attachment_job:
+            return
+        digest, size = job.result
+        self.attachment = (digest, size, job.source_path)
+        self.set_file_path(job.source_path)
+
+    def set_file_path(self, file_path):
+        # Показ выбранного файла в поле только для чтения
+        self.entry_file_path.config(state=tk.NORMAL)
+        self.entry_file_path.delete(0, tk.END)
+        self.entry_file_path.insert(0, file_path)
+        self.entry_file_path.config(state='readonly')
 
     def add_project(self):
         # Добавление нового проекта в базу данных
@@ -441,12 +812,17 @@ class ProjectsWindow(tk.Toplevel):
         project_type = self.entry_project_type.get()
         start_date = self.entry_start_date.get()
         end_date = self.entry_end_date.get()
-        file_path = self.entry_file_path.get()
-        self.db_manager.execute_query(
-            "INSERT INTO projects (name, type, start_date, end_date, file_path, user_id) VALUES (?, ?, ?, ?, ?, ?)",
-            (project_name, project_type, start_date, end_date, file_path, self.user_id)
+        deadline = parse_date(end_date)  # Дата окончания разбирается один раз при записи
+        if end_date and deadline is None:
+            messagebox.showerror("Ошибка", "Дата окончания должна быть в формате ДД.ММ.ГГГГ")
+            return
+        if self.attachment_job and self.attachment_job.is_alive():
+            messagebox.showinfo("Информация", "Дождитесь окончания добавления файла")
+            return
+        run_in_background(
+            self, self.db_manager, lambda result: self.display_projects_window(), self.db_manager.add_project,
+            self.user_id, project_name, project_type, start_date, end_date, deadline or '', self.attachment
         )
-        self.display_projects_window()
 
     def display_projects_window(self):
         # Показать окно со всеми проектами
@@ -459,17 +835,201 @@ class ProjectsWindow(tk.Toplevel):
         self.parent.deiconify()
 
 
+PROJECT_ROW_HEIGHT = 64  # Высота строки проекта в пикселях
+PROJECTS_OVERSCAN = 3  # Дополнительные строки над и под видимой областью
+PROJECT_SEARCH_DELAY = 200  # Пауза после ввода перед поиском проектов, мс
+
+
+class ProjectRow(Frame):
+    def __init__(self, parent, on_toggle, on_delete):
+        super().__init__(parent, padx=10, pady=2, relief=tk.RAISED, bd=2)
+        self.project = None  # Отображаемая строка проекта
+        self.state = tk.BooleanVar(value=False)  # Состояние флажка завершенности
+        self.label = tk.Label(self, text="", font=("Helvetica", 12), anchor='w')
+        self.label.grid(row=0, column=0, sticky='w')
+        self.file_label = tk.Label(self, text="", font=("Helvetica", 12), anchor='w')
+        self.file_label.grid(row=1, column=0, sticky='w')
+        tk.Checkbutton(self, variable=self.state,
+                       command=lambda: on_toggle(self.project[0], self.state)).grid(row=0, column=1, rowspan=2)
+        tk.Button(self, text="Удалить", command=lambda: on_delete(self.project[0]),
+                  font=("Helvetica", 12)).grid(row=0, column=2, rowspan=2, padx=5)
+        self.grid_columnconfigure(0, weight=1)
+
+    def show(self, project):
+        # Заполнение переиспользуемой строки данными проекта
+        if project == self.project:
+            return
+        if self.project and project[:5] == self.project[:5] and project[6] == self.project[6]:
+            self.set_completed(project)
+            return
+        self.project = project
+        project_id, name, project_type, start_date, end_date, completed, file_path = project
+        self.label.config(text=f"{name} - {project_type} - {start_date} to {end_date}",
+                          font=("Helvetica", 12, "overstrike" if completed else "normal"))
+        self.file_label.config(text=f"Файл: {file_path}" if file_path else "")
+        self.state.set(bool(completed))
+
+    def set_completed(self, project):
+        # Изменение только стиля метки при переключении завершенности
+        self.project = project
+        self.label.config(font=("Helvetica", 12, "overstrike" if project[5] else "normal"))
+        self.state.set(bool(project[5]))
+
+
+class VirtualProjectList(tk.Frame):
+    def __init__(self, parent, on_toggle, on_delete):
+        super().__init__(parent)
+        self.on_toggle = on_toggle  # Обработчик флажка завершенности
+        self.on_delete = on_delete  # Обработчик кнопки удаления
+        self.pager = None  # Источник строк
+        self.loading = None  # Загружаемая в рабочем потоке страница: (источник, номер)
+        self.offset = 0  # Смещение видимой области в пикселях
+        self.rows = []  # Пул переиспользуемых строк
+        self.viewport = tk.Frame(self)
+        self.viewport.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar = tk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.viewport.bind("<Configure>", lambda e: self.render())
+        toplevel = self.winfo_toplevel()
+        toplevel.bind("<MouseWheel>", lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+        toplevel.bind("<Button-4>", lambda e: self.yview('scroll', -1, 'units'))
+        toplevel.bind("<Button-5>", lambda e: self.yview('scroll', 1, 'units'))
+
+    def set_pager(self, pager):
+        # Подключение нового источника строк с сохранением позиции прокрутки
+        self.pager = pager
+        self.render()
+
+    def update_project(self, project_id, completed):
+        # Обновление одной строки после переключения завершенности
+        project = self.pager.update(project_id, completed)
+        for row in self.rows:
+            if row.project and row.project[0] == project_id:
+                row.set_completed(project or row.project[:5] + (completed,) + row.project[6:])
+
+    def remove_project(self, project_id):
+        # Удаление одной строки: остальные строки берутся из кэша страниц
+        self.pager.remove(project_id)
+        for row in self.rows:
+            if row.project and row.project[0] == project_id:
+                row.project = None
+        self.render()
+
+    def load_page(self, number):
+        # Загрузка страницы в рабочем потоке; после загрузки видимая область перерисовывается
+        pager = self.pager
+        if self.loading == (pager, number):
+            return
+        self.loading = (pager, number)
+        changes = pager.changes
+        query, params = pager.page_query(number)
+        watch_future(self, pager.db_manager.submit(pager.db_manager.execute_query, query, params, True),
+                     lambda page: self.show_page(pager, number, changes, page),
+                     lambda error: setattr(self, 'loading', None))  # После ошибки страницу можно запросить снова
+
+    def show_page(self, pager, number, changes, page):
+        # Страница загружена: кэш пополняется, если источник не сменился и не менялся во время загрузки
+        if self.loading == (pager, number):
+            self.loading = None
+        if pager is not self.pager:
+            return
+        if pager.changes == changes:
+            pager.store_page(number, page)
+        self.render()
+
+    def yview(self, *args):
+        # Обработка прокрутки полосой и колесом мыши
+        if not self.pager:
+            return
+        height = self.viewport.winfo_height()
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * self.pager.count * PROJECT_ROW_HEIGHT)
+        elif args[0] == 'scroll':
+            step = height if args[2] == 'pages' else PROJECT_ROW_HEIGHT
+            self.offset += int(args[1]) * step
+        self.render()
+
+    def render(self):
+        # Размещение строк только для видимой области и небольшого запаса вокруг нее
+        if not self.pager:
+            return
+        height = max(self.viewport.winfo_height(), 1)
+        total = self.pager.count * PROJECT_ROW_HEIGHT
+        self.offset = max(0, min(self.offset, total - height))
+        pool_size = height // PROJECT_ROW_HEIGHT + 2 + 2 * PROJECTS_OVERSCAN
+        while len(self.rows) < pool_size:
+            self.rows.append(ProjectRow(self.viewport, self.on_toggle, self.on_delete))
+        first = max(0, self.offset // PROJECT_ROW_HEIGHT - PROJECTS_OVERSCAN)
+        last = min(self.pager.count, (self.offset + height) // PROJECT_ROW_HEIGHT + 1 + PROJECTS_OVERSCAN)
+        used = set()
+        for index in range(first, last):
+            number = self.pager.missing_page(index)
+            if number is not None:
+                self.load_page(number)  # Строки ниже появятся после загрузки страницы
+                break
+            project = self.pager.get(index)
+            if project is None:
+                break
+            slot = index % len(self.rows)
+            used.add(slot)
+            self.rows[slot].show(project)
+            self.rows[slot].place(x=0, y=index * PROJECT_ROW_HEIGHT - self.offset,
+                                  relwidth=1, height=PROJECT_ROW_HEIGHT - 4)
+        for slot, row in enumerate(self.rows):
+            if slot not in used:
+                row.place_forget()
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + height) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+
+class DeadlineReport(tk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent, padx=10, pady=5, relief=tk.GROOVE, bd=2)
+        self.summary_label = tk.Label(self, text="", font=("Helvetica", 12, "bold"), fg="red", anchor='w')
+        self.summary_label.grid(row=0, column=0, columnspan=2, sticky='w')
+        self.listbox = tk.Listbox(self, height=4, font=("Helvetica", 12), activestyle='none')
+        self.listbox.grid(row=1, column=0, sticky='nsew')
+        scrollbar = tk.Scrollbar(self, orient='vertical', command=self.listbox.yview)
+        scrollbar.grid(row=1, column=1, sticky='ns')
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+        self.grid_columnconfigure(0, weight=1)
+
+    def show(self, due_projects):
+        # Заполнение сводки: количество по категориям и список проектов; без проектов панель скрывается
+        counts = {'overdue': 0, 'today': 0, 'soon': 0}
+        self.listbox.delete(0, tk.END)
+        for project_id, project_name, deadline, status in due_projects:
+            counts[status] += 1
+            if status == 'overdue':
+                self.listbox.insert(tk.END, "Проект " + project_name + " просрочен!")
+            elif status == 'today':
+                self.listbox.insert(tk.END, "Сегодня день сдачи проекта " + project_name)
+            else:
+                self.listbox.insert(tk.END, "До сдачи проекта " + project_name + " осталось менее " + str(DAYS_BEFORE) + " суток")
+        self.summary_label.config(text=f"Просрочено: {counts['overdue']}   Сдать сегодня: {counts['today']}   "
+                                       f"Менее {DAYS_BEFORE} суток: {counts['soon']}")
+        if due_projects:
+            self.grid()
+        else:
+            self.grid_remove()
+
+
 class DisplayProjectsWindow(tk.Toplevel):
     def __init__(self, db_manager, user_id, parent):
         super().__init__()
         self.db_manager = db_manager  # Менеджер базы данных
         self.user_id = user_id  # Идентификатор пользователя
         self.parent = parent  # Родительское окно
+        self.pending_deletes = set()  # Проекты, удаление которых еще не зафиксировано
         self.title("TaskBoard - Все проекты")
         self.geometry("800x600")
         self.center_window(800, 600)  # Центрирование окна
         self.create_widgets()  # Создание виджетов
-        self.update_time()  # Обновление времени
+        ClockService.of(self).subscribe(self.current_time_label)  # Подписка на общие часы
 
     def center_window(self, width, height):
         # Центрирование окна на экране
@@ -486,93 +1046,171 @@ class DisplayProjectsWindow(tk.Toplevel):
         self.current_time_label = tk.Label(frame, text="", font=("Helvetica", 14))
         self.current_time_label.grid(row=0, column=0, columnspan=3, pady=10)
 
-        self.project_canvas = tk.Canvas(frame)
-        self.project_canvas.grid(row=1, column=0, columnspan=3, sticky='nsew')
-        self.scrollbar = tk.Scrollbar(frame, orient='vertical', command=self.project_canvas.yview)
-        self.scrollbar.grid(row=1, column=3, sticky='ns')
-        self.project_canvas.configure(yscrollcommand=self.scrollbar.set)
-        self.project_frame = tk.Frame(self.project_canvas)
-        self.project_canvas.create_window((0, 0), window=self.project_frame, anchor='nw')
-        self.project_frame.bind("<Configure>", lambda e: self.project_canvas.configure(scrollregion=self.project_canvas.bbox("all")))
+        # Сводка по срокам (немодальная, заполняется после отрисовки окна)
+        self.deadline_report = DeadlineReport(frame)
+        self.deadline_report.grid(row=1, column=0, columnspan=3, sticky='ew', padx=10)
+        self.deadline_report.grid_remove()
+        self.report_job = None  # Запланированное обновление сводки
+
+        # Поиск по названию и типу проекта по мере ввода
+        tk.Label(frame, text="Поиск:", font=("Helvetica", 14)).grid(row=2, column=0, sticky='e', padx=10)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', self.schedule_search)
+        tk.Entry(frame, textvariable=self.search_var, font=("Helvetica", 14)).grid(row=2, column=1, columnspan=2, sticky='ew', padx=10)
+        self.search_job = None  # Отложенный поиск (after)
+
+        # Виртуальный список: виджеты создаются только для видимых строк
+        self.project_list = VirtualProjectList(frame, self.toggle_project, self.delete_project)
+        self.project_list.grid(row=3, column=0, columnspan=3, sticky='nsew')
         self.display_projects()
 
         frame.grid_columnconfigure(0, weight=1)
         frame.grid_columnconfigure(1, weight=1)
         frame.grid_columnconfigure(2, weight=1)
-        frame.grid_rowconfigure(1, weight=1)
+        frame.grid_rowconfigure(3, weight=1)
 
-        tk.Button(frame, text="Закрыть", command=self.close_window, font=("Helvetica", 14)).grid(row=2, column=0, columnspan=3, pady=10)
-
-    def update_time(self):
-        # Обновление текущего времени на метке
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.current_time_label.config(text=now)
-        self.after(1000, self.update_time)
+        tk.Button(frame, text="Обновить", command=self.display_projects, font=("Helvetica", 14)).grid(row=4, column=0, pady=10)
+        tk.Button(frame, text="Закрыть", command=self.close_window, font=("Helvetica", 14)).grid(row=4, column=2, pady=10)
 
     def display_projects(self):
-        # Отображение проектов в окне
-        for widget in self.project_frame.winfo_children():
-            widget.destroy()
-        projects = self.db_manager.execute_query(
-            "SELECT id, name, type, start_date, end_date, completed, file_path FROM projects WHERE user_id=?",
-            (self.user_id,), fetch=True)
-        for project in projects:
-            project_frame = Frame(self.project_frame, padx=10, pady=5, relief=tk.RAISED, bd=2)
-            project_frame.pack(fill='x', expand=True, pady=5)
-            text = f"{project[1]} - {project[2]} - {project[3]} to {project[4]}"
-            label = tk.Label(project_frame, text=text, font=("Helvetica", 12, "overstrike" if project[5] else "normal"))
-            label.pack(anchor='w')
-
-            if project[6]:
-                file_label = tk.Label(project_frame, text=f"Файл: {project[6]}", font=("Helvetica", 12))
-                file_label.pack(anchor='w')
-
-            chk_state = tk.BooleanVar(value=project[5])
-            chk = tk.Checkbutton(project_frame, variable=chk_state, command=lambda p=project[0], s=chk_state: self.toggle_project(p, s))
-            chk.pack(anchor='w')
-
-            btn_delete = tk.Button(project_frame, text="Удалить", command=lambda p=project[0]: self.delete_project(p), font=("Helvetica", 12))
-            btn_delete.pack(anchor='w')
-
-            project_name = project[1]
-            try:
-                project_time = project[4].split('.')
-                day = int(project_time[0])
-                month = int(project_time[1])
-                year = int(project_time[2])
-                now = datetime.datetime.now()
-                DAYS_BEFORE = 2
-                if not project[5]:
-                    if now.year == year and now.month == month:
-                        if now.day > day - DAYS_BEFORE:
-                            messagebox.showerror("Важно", "До сдачи проекта " + project_name + " осталось менее " + str(DAYS_BEFORE) + " суток")
-                        elif now.day == day:
-                            messagebox.showerror("Важно", "Сегодня день сдачи проекта " + project_name)
-                        elif now.day > day:
-                            messagebox.showerror("Важно", "Проект " + project_name + " просрочен!")
-                    elif now.year > year or (now.year == year and now.month > month):
-                        messagebox.showerror("Важно", "Проект " + project_name + " просрочен!")
-            except (ValueError, IndexError):
-                pass
+        # Отображение проектов в окне: строки подгружаются страницами по мере прокрутки
+        text = self.search_var.get().strip()
+        if text:
+            run_in_background(self, self.db_manager, lambda pager: self.show_search_results(text, pager),
+                              ProjectSearchPager, self.db_manager, self.user_id, text)
+        else:
+            run_in_background(self, self.db_manager, lambda pager: self.show_search_results(text, pager),
+                              ProjectPager, self.db_manager, self.user_id)
+
+        self.schedule_deadline_report()
+
+    def schedule_search(self, *args):
+        # Поиск по мере ввода: запрос выполняется после паузы в наборе
+        if self.search_job:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(PROJECT_SEARCH_DELAY, self.search_projects)
+
+    def search_projects(self):
+        # Показ результатов поиска (или всех проектов при пустом запросе) с начала списка
+        self.search_job = None
+        self.project_list.offset = 0
+        self.display_projects()
+
+    def show_search_results(self, text, pager):
+        # Показ результатов поиска в рабочем потоке, если запрос еще актуален
+        if text == self.search_var.get().strip():
+            self.project_list.set_pager(pager)
+
+    def schedule_deadline_report(self):
+        # Пересчет сводки по срокам вне отрисовки: один запрос после обработки текущих событий
+        if self.report_job is None:
+            self.report_job = self.after_idle(self.update_deadline_report)
+
+    def update_deadline_report(self):
+        # Обновление сводки по срокам одним запросом по индексу в рабочем потоке
+        self.report_job = None
+        run_in_background(self, self.db_manager, self.deadline_report.show,
+                          self.db_manager.get_due_projects, self.user_id)
 
     def toggle_project(self, project_id, state):
-        # Переключение состояния завершенности проекта
-        self.db_manager.execute_query("UPDATE projects SET completed = ? WHERE id = ?", (state.get(), project_id))
-        self.display_projects()
+        # Переключение состояния завершенности проекта; при ошибке записи строка возвращается в прежнее состояние
+        completed = int(state.get())
+        self.project_list.update_project(project_id, completed)  # Строка обновляется сразу, запись - в фоне
+        watch_future(self, self.db_manager.write("UPDATE projects SET completed = ? WHERE id = ?",
+                                                 (completed, project_id)),
+                     lambda result: self.schedule_deadline_report(),
+                     lambda error: self.project_list.update_project(project_id, 1 - completed))
 
     def delete_project(self, project_id):
-        # Удаление проекта из базы данных
-        self.db_manager.execute_query("DELETE FROM projects WHERE id = ?", (project_id,))
-        self.display_projects()
+        # Удаление проекта из базы данных; строка убирается из списка после записи. Повторное нажатие до
+        # фиксации удаления игнорируется, иначе счетчик строк уменьшился бы дважды
+        if project_id in self.pending_deletes:
+            return
+        self.pending_deletes.add(project_id)
+        watch_future(self, self.db_manager.write("DELETE FROM projects WHERE id = ?", (project_id,)),
+                     lambda result: self.finish_delete_project(project_id),
+                     lambda error: self.pending_deletes.discard(project_id))
+
+    def finish_delete_project(self, project_id):
+        # Удаление строки из списка после удаления проекта в рабочем потоке
+        self.pending_deletes.discard(project_id)
+        self.project_list.remove_project(project_id)
+        self.schedule_deadline_report()
 
     def close_window(self):
         # Закрытие текущего окна и возврат к родительскому окну
+        if self.report_job is not None:
+            self.after_cancel(self.report_job)
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.db_manager.flush()  # Фиксация отложенных изменений
         self.destroy()
         self.parent.deiconify()
 
 
+def open_database(db_path, profile):
+    # Открытие базы и приведение схемы к актуальной версии (миграции)
+    db_manager = AuthenticationManager(db_path, profile, print)  # Создание экземпляра менеджера аутентификации
+    print(f"Профиль базы данных: {db_manager.describe_profile()}")
+    slow_query_ms = os.environ.get('TASKBOARD_SLOW_QUERY_MS')  # Сбор статистики запросов с самого запуска
+    if slow_query_ms:
+        db_manager.enable_query_stats(float(slow_query_ms) / 1000, print)
+    return db_manager
+
+
+def print_startup_summary():
+    # Итог режима --startup-report: сколько модулей загружено и не загрузились ли раньше времени отложенные
+    loaded = [name for name in LAZY_MODULES if name in sys.modules]
+    print(f"startup: модулей загружено: {len(sys.modules)}; отложенные модули загружены до входа: "
+          f"{', '.join(loaded) or 'нет'}", file=sys.stderr, flush=True)
+
+
+def run_application(db_path, profile):
+    # Окно входа рисуется сразу; база открывается и проверяется в фоновом потоке, после чего включаются кнопки входа
+    app = Application()  # Создание экземпляра приложения (без базы)
+    mark_startup("окно входа создано")
+    app.update()  # Первая отрисовка, не дожидаясь проверки схемы
+    mark_startup("первое окно")
+    import concurrent.futures
+    executor = concurrent.futures.ThreadPoolExecutor(1, 'taskboard-open')
+    future = executor.submit(open_database, db_path, profile)
+    executor.shutdown(wait=False)
+
+    def ready(db_manager):
+        app.set_db_manager(db_manager)
+        mark_startup("база открыта, схема проверена")
+        db_manager.collect_attachment_garbage()  # Удаление неиспользуемых вложений в фоне
+        if STARTUP_REPORT:
+            print_startup_summary()
+            app.destroy()
+
+    watch_future(app, future, ready)
+    app.mainloop()  # Запуск главного цикла приложения
+    if future.exception() is None:  # Окно могли закрыть до открытия базы: миграция дожидается завершения
+        future.result().close()  # Закрытие соединений с базой данных
+
+
 if __name__ == "__main__":
     db_path = 'users.db'  # Путь к файлу базы данных
-    db_manager = AuthenticationManager(db_path)  # Создание экземпляра менеджера аутентификации
-    app = Application(db_manager)  # Создание экземпляра приложения
-    app.mainloop()  # Запуск главного цикла приложения
\ No newline at end of file
+    profile = os.environ.get('TASKBOARD_DB_PROFILE', DEFAULT_DB_PROFILE)  # Профиль производительности
+    if '--rebuild-search' in sys.argv[1:]:
+        # Перестроение полнотекстового индекса проектов для существующей базы, без запуска интерфейса
+        db_manager = open_database(db_path, profile)
+        start = time.perf_counter()
+        if db_manager.rebuild_project_search():
+            print(f"Поисковый индекс перестроен за {time.perf_counter() - start:.1f} с")
+        else:
+            print("SQLite собран без FTS5: поиск по проектам выполняется через LIKE")
+        db_manager.close()
+    elif '--send-digests' in sys.argv[1:]:
+        # Рассылка сводок по срокам в Telegram (запускается планировщиком раз в день)
+        token = os.environ.get('TASKBOARD_TELEGRAM_TOKEN')
+        if not token:
+            print("Не задан токен бота: переменная окружения TASKBOARD_TELEGRAM_TOKEN")
+        else:
+            db_manager = open_database(db_path, profile)
+            dispatcher = TelegramDispatcher(db_manager, token, os.environ.get('TASKBOARD_TELEGRAM_API', TELEGRAM_API_URL))
+            print(f"Рассылка сводок: {dispatcher.send_digests()}")
+            db_manager.close()
+    else:
+        run_application(db_path, profile)
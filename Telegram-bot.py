@@ -1,27 +1,225 @@
-from telegram import Update, Bot
-from telegram.ext import Updater, CommandHandler, CallbackContext
+import asyncio
+import concurrent.futures
+import datetime
+import json
+import os
+import urllib.parse
 
-TELEGRAM_TOKEN = '6997037540:AAE1EjkRY7VZ4h4DTJdyy6kjaUxX-0XS4-8'
+import taskboard  # Схема базы и запросы приложения, без графического интерфейса
 
-def start(update: Update, context: CallbackContext) -> None:
-    chat_id = update.message.chat_id
-    update.message.reply_text(f'Your chat ID is: {chat_id}')
+TELEGRAM_TOKEN = os.environ.get('TASKBOARD_TELEGRAM_TOKEN', '6997037540:AAE1EjkRY7VZ4h4DTJdyy6kjaUxX-0XS4-8')
+API_URL = os.environ.get('TASKBOARD_TELEGRAM_API', 'https://api.telegram.org')  # Адрес Bot API
+API_CONNECTIONS = 16  # Одновременных соединений с Bot API (одно из них занято долгим опросом)
+API_TIMEOUT = 10  # Тайм-аут запроса к Bot API, с
+API_RETRIES = 3  # Повторов отправки ответа при 429
+POLL_TIMEOUT = 30  # Долгий опрос getUpdates, с
+DB_WORKERS = 4  # Потоков для запросов к базе (у каждого свое соединение из пула)
+MAX_CONCURRENT_UPDATES = 256  # Обновлений в обработке одновременно; дальше опрос ждет
+PROJECTS_LIMIT = 20  # Проектов в ответе на /projects
 
-def main():
-    # Создаем объект бота
-    updater = Updater(TELEGRAM_TOKEN)
 
-    # Получаем диспетчера для регистрации обработчиков
-    dispatcher = updater.dispatcher
+class ApiError(Exception):
+    # Ответ Bot API с ok = false
+    def __init__(self, status, reply):
+        super().__init__(f"{status}: {reply.get('description', '')}")
+        self.status = status  # Код ответа HTTP
+        self.retry_after = reply.get('parameters', {}).get('retry_after')  # Пауза, которую просит Telegram при 429
 
-    # Регистрируем обработчик команды /start
-    dispatcher.add_handler(CommandHandler("start", start))
 
-    # Запуск бота
-    updater.start_polling()
+class BotApi:
+    def __init__(self, token, api_url=API_URL, connections=API_CONNECTIONS):
+        self.token = token  # Токен бота
+        self.url = urllib.parse.urlsplit(api_url)  # Адрес Bot API
+        self.connections = connections  # Наибольшее число соединений
+        self.slots = None  # Семафор соединений (создается в цикле событий)
+        self.idle = []  # Свободные постоянные соединения: (reader, writer)
 
-    # Бот будет работать до тех пор, пока не получит сигнал завершения
-    updater.idle()
+    async def call(self, method, payload, timeout=API_TIMEOUT):
+        # Вызов метода Bot API по постоянному соединению; соединение, закрытое сервером, открывается заново
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.connections)
+        async with self.slots:
+            for attempt in range(2):
+                reused = bool(self.idle)
+                reader, writer = self.idle.pop() if reused else await self.connect()
+                try:
+                    status, reply = await asyncio.wait_for(self.request(reader, writer, method, payload), timeout)
+                except (OSError, EOFError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    writer.close()
+                    if attempt or not reused:
+                        raise
+                    continue
+                self.idle.append((reader, writer))
+                if not reply.get('ok'):
+                    raise ApiError(status, reply)
+                return reply['result']
 
-#if name == 'main':
-    #main()
\ No newline at end of file
+    async def connect(self):
+        # Новое соединение с Bot API
+        https = self.url.scheme == 'https'
+        return await asyncio.open_connection(self.url.hostname, self.url.port or (443 if https else 80),
+                                             ssl=True if https else None)
+
+    async def request(self, reader, writer, method, payload):
+        # Запрос HTTP/1.1 с телом JSON: (код ответа, JSON ответа); Bot API всегда передает Content-Length
+        body = json.dumps(payload).encode()
+        head = (f"POST {self.url.path.rstrip('/')}/bot{self.token}/{method} HTTP/1.1\r\n"
+                f"Host: {self.url.netloc}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n")
+        writer.write(head.encode() + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise EOFError("Соединение закрыто сервером")
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return int(status_line.split()[1]), json.loads(await reader.readexactly(length) or b'{}')
+
+    async def send_message(self, chat_id, text, reply_to=None):
+        # Отправка сообщения; при 429 - повтор после паузы, которую указал Telegram
+        payload = {'chat_id': chat_id, 'text': text}
+        if reply_to is not None:
+            payload['reply_to_message_id'] = reply_to
+        for attempt in range(API_RETRIES + 1):
+            try:
+                return await self.call('sendMessage', payload)
+            except ApiError as error:
+                if error.status != 429 or attempt == API_RETRIES:
+                    raise
+                await asyncio.sleep(error.retry_after or 1)
+
+    def close(self):
+        # Закрытие свободных соединений
+        for reader, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+class TaskBoardBot:
+    def __init__(self, db_manager, api, db_workers=DB_WORKERS, max_updates=MAX_CONCURRENT_UPDATES):
+        self.db_manager = db_manager  # Менеджер базы данных приложения (та же схема, WAL)
+        self.api = api  # Клиент Bot API
+        self.executor = concurrent.futures.ThreadPoolExecutor(db_workers, 'taskboard-db')  # Потоки для базы
+        self.max_updates = max_updates  # Наибольшее число обновлений в обработке
+        self.running = False  # Идет ли опрос
+        self.commands = {
+            'start': self.start,
+            'projects': self.projects,
+            'due': self.due,
+            'done': self.done,
+        }  # Обработчики команд
+
+    async def run(self, poll_timeout=POLL_TIMEOUT):
+        # Долгий опрос getUpdates; каждое обновление обрабатывается отдельной задачей, не дожидаясь остальных
+        slots = asyncio.Semaphore(self.max_updates)  # Ограничение обновлений в обработке
+        tasks = set()
+        offset = 0
+        self.running = True
+        while self.running:
+            try:
+                updates = await self.api.call(
+                    'getUpdates', {'offset': offset, 'timeout': poll_timeout, 'allowed_updates': ['message']},
+                    poll_timeout + API_TIMEOUT)
+            except (OSError, EOFError, ValueError, ApiError, asyncio.IncompleteReadError, asyncio.TimeoutError) as error:
+                print(f"Ошибка опроса Bot API: {error}")
+                await asyncio.sleep(1)
+                continue
+            for update in updates:
+                offset = update['update_id'] + 1
+                await slots.acquire()
+                task = asyncio.ensure_future(self.handle(update))
+                tasks.add(task)
+                task.add_done_callback(lambda task: (tasks.discard(task), slots.release()))
+        await asyncio.gather(*tasks)
+
+    def stop(self):
+        # Завершение опроса после текущего запроса getUpdates
+        self.running = False
+
+    def close(self):
+        # Остановка потоков базы и закрытие соединений с Bot API
+        self.executor.shutdown()
+        self.api.close()
+
+    async def run_db(self, func, *args):
+        # Запрос к базе в потоке из ограниченного пула, без блокировки цикла событий
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def handle(self, update):
+        # Обработка одного обновления: разбор команды и ответ в тот же чат
+        message = update.get('message') or {}
+        text = message.get('text', '')
+        if not text.startswith('/'):
+            return
+        command, *args = text.split()
+        handler = self.commands.get(command[1:].split('@')[0], self.help)
+        chat_id = message['chat']['id']
+        try:
+            reply = await handler(chat_id, args)
+            await self.api.send_message(chat_id, reply, message.get('message_id'))
+        except Exception as error:
+            print(f"Ошибка обработки {command} в чате {chat_id}: {error}")
+
+    async def start(self, chat_id, args):
+        # Chat ID для привязки в окне "Уведомления в Telegram"
+        return (f"Ваш chat ID: {chat_id}\nВведите его в TaskBoard в окне \"Уведомления в Telegram\", "
+                f"чтобы получать сводки по срокам.")
+
+    async def help(self, chat_id, args):
+        # Ответ на неизвестную команду
+        return "Команды: /projects - незавершенные проекты, /due - ближайшие сроки, /done <id> - завершить проект"
+
+    async def not_linked(self, chat_id):
+        # Подсказка для чата, к которому не привязан ни один пользователь, или None
+        if not await self.run_db(self.db_manager.is_chat_linked, chat_id):
+            return "Чат не привязан к TaskBoard. Отправьте /start, чтобы узнать chat ID."
+        return None
+
+    async def projects(self, chat_id, args):
+        # Незавершенные проекты пользователей чата
+        rows = await self.run_db(self.db_manager.get_chat_projects, chat_id, PROJECTS_LIMIT + 1)
+        if not rows:
+            return await self.not_linked(chat_id) or "Незавершенных проектов нет"
+        lines = [f"{project_id}. {name}" +
+                 (f" (до {datetime.date.fromisoformat(deadline).strftime('%d.%m.%Y')})" if deadline else "") +
+                 f" - {username}"
+                 for project_id, name, deadline, username in rows[:PROJECTS_LIMIT]]
+        if len(rows) > PROJECTS_LIMIT:
+            lines.append(f"Показаны первые {PROJECTS_LIMIT}")
+        return "\n".join(lines)
+
+    async def due(self, chat_id, args):
+        # Сводка по срокам, как в ежедневной рассылке
+        rows = await self.run_db(self.db_manager.get_chat_due_projects, chat_id)
+        if not rows:
+            return await self.not_linked(chat_id) or "Ближайших сроков нет"
+        return taskboard.format_digest(rows)
+
+    async def done(self, chat_id, args):
+        # Отметка проекта завершенным по его номеру из /projects
+        if len(args) != 1 or not args[0].isdigit():
+            return "Укажите номер проекта: /done <id>"
+        if await self.run_db(self.db_manager.complete_chat_project, chat_id, int(args[0])):
+            return f"Проект {args[0]} завершен"
+        return await self.not_linked(chat_id) or f"Незавершенный проект {args[0]} не найден"
+
+
+async def main():
+    # Запуск бота на базе приложения: профиль balanced (WAL) позволяет читать одновременно с приложением
+    db_manager = taskboard.DatabaseManager('users.db', os.environ.get('TASKBOARD_DB_PROFILE', taskboard.DEFAULT_DB_PROFILE))
+    bot = TaskBoardBot(db_manager, BotApi(TELEGRAM_TOKEN))
+    try:
+        await bot.run()
+    finally:
+        bot.close()
+        db_manager.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
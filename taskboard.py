@@ -0,0 +1,1908 @@
+import sqlite3
+import time
+import datetime
+import threading
+import os
+import collections
+import queue
+import functools
+import re
+import sys
+import itertools
+
+# Профили производительности SQLite: PRAGMA, применяемые при открытии соединения
+DB_PROFILES = {
+    'safe': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    },
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    },
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    },
+}
+DEFAULT_DB_PROFILE = 'balanced'
+
+
+class ConnectionPool:
+    def __init__(self, db_path, pragmas=None):
+        self.db_path = db_path  # Путь к базе данных
+        self.pragmas = pragmas or {}  # PRAGMA для каждого нового соединения
+        self.local = threading.local()  # Соединение текущего потока
+        self.connections = []  # Все открытые пулом соединения
+        self.lock = threading.Lock()  # Защита списка соединений
+        self.is_open = False  # Состояние пула
+
+    def open(self):
+        # Открытие пула (соединения создаются лениво, по одному на поток)
+        with self.lock:
+            self.is_open = True
+
+    def get_connection(self):
+        # Получение долгоживущего соединения для текущего потока
+        if not self.is_open:
+            raise sqlite3.ProgrammingError("Пул соединений закрыт")
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            for name, value in self.pragmas.items():
+                conn.execute(f"PRAGMA {name}={value}")
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def release(self):
+        # Закрытие соединения текущего потока (для завершающихся рабочих потоков)
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            return
+        self.local.conn = None
+        with self.lock:
+            if conn in self.connections:
+                self.connections.remove(conn)
+        conn.close()
+
+    def close(self):
+        # Закрытие всех соединений пула
+        with self.lock:
+            self.is_open = False
+            connections, self.connections = self.connections, []
+        for conn in connections:
+            conn.close()
+        self.local = threading.local()
+
+
+DAYS_BEFORE = 2  # За сколько суток предупреждать о сроке сдачи
+
+
+def parse_date(text):
+    # Разбор даты "ДД.ММ.ГГГГ" (или "ГГГГ-ММ-ДД") в строку ISO-8601; None, если дата не распознана
+    text = (text or '').strip()
+    try:
+        if '.' in text:
+            day, month, year = text.split('.')
+            return datetime.date(int(year), int(month), int(day)).isoformat()
+        return datetime.date.fromisoformat(text).isoformat()
+    except ValueError:
+        return None
+
+
+def create_tables(conn):
+    # Создание таблицы пользователей, если она не существует
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password TEXT,
+            role TEXT DEFAULT 'user'
+        )''')
+    # Создание таблицы проектов, если она не существует
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            type TEXT,
+            start_date TEXT,
+            end_date TEXT,
+            completed INTEGER DEFAULT 0,
+            user_id INTEGER,
+            file_path TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )''')
+
+
+def add_missing_columns(conn):
+    # Добавление столбцов, которых нет в базах старых версий (например, Alpha-version.py)
+    users_columns = [row[1] for row in conn.execute("PRAGMA table_info(users)")]
+    if 'role' not in users_columns:
+        conn.execute("ALTER TABLE users ADD COLUMN role TEXT DEFAULT 'user'")
+    projects_columns = [row[1] for row in conn.execute("PRAGMA table_info(projects)")]
+    if 'file_path' not in projects_columns:
+        conn.execute("ALTER TABLE projects ADD COLUMN file_path TEXT")
+
+
+def create_project_indexes(conn):
+    # Покрывающий индекс для выборок проектов пользователя
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_projects_user
+        ON projects (user_id, completed, end_date)''')
+    # Частичный индекс по незавершенным проектам
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_projects_incomplete
+        ON projects (user_id, end_date) WHERE completed = 0''')
+
+
+def add_deadline_column(conn):
+    # Столбец deadline: дата окончания в формате ISO-8601 (YYYY-MM-DD), '' - дата не распознана
+    conn.execute("ALTER TABLE projects ADD COLUMN deadline TEXT")
+
+
+def backfill_deadlines(conn, after_id, batch_size):
+    # Заполнение deadline для существующих проектов порциями по возрастанию id
+    rows = conn.execute(
+        "SELECT id, end_date FROM projects WHERE id > ? AND deadline IS NULL ORDER BY id LIMIT ?",
+        (after_id, batch_size)
+    ).fetchall()
+    if not rows:
+        return None
+    conn.executemany("UPDATE projects SET deadline = ? WHERE id = ?",
+                     ((parse_date(end_date) or '', project_id) for project_id, end_date in rows))
+    return rows[-1][0]
+
+
+def create_deadline_index(conn):
+    # Частичный индекс по срокам незавершенных проектов вместо индекса по текстовой end_date
+    conn.execute("DROP INDEX IF EXISTS idx_projects_incomplete")
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_projects_deadline
+        ON projects (user_id, deadline) WHERE completed = 0''')
+
+
+def create_settings_table(conn):
+    # Таблица настроек приложения (например, откалиброванная стоимость хеширования паролей)
+    conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+
+
+def create_paging_index(conn):
+    # Индекс для постраничного вывода проектов пользователя в порядке id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_user_id ON projects (user_id, id)")
+
+
+def create_username_index(conn):
+    # Индекс по имени пользователя без учета регистра для поиска и постраничного вывода пользователей
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_username_nocase ON users (username COLLATE NOCASE)")
+
+
+PROJECTS_TABLE_COLUMNS = "id, name, type, start_date, end_date, completed, user_id, file_path, deadline"
+
+
+def add_cascade_foreign_key(conn):
+    # Пересоздание таблицы проектов с ON DELETE CASCADE (ALTER TABLE в SQLite не меняет ограничения)
+    if any(row[6] == 'CASCADE' for row in conn.execute("PRAGMA foreign_key_list(projects)")):
+        return
+    # Проекты пользователей, удаленных без каскада: при включенных внешних ключах их нельзя перенести
+    conn.execute("DELETE FROM projects WHERE user_id NOT IN (SELECT id FROM users)")
+    indexes = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'projects' AND sql IS NOT NULL")]
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'projects'").fetchone()
+    conn.execute('''
+        CREATE TABLE projects_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            type TEXT,
+            start_date TEXT,
+            end_date TEXT,
+            completed INTEGER DEFAULT 0,
+            user_id INTEGER,
+            file_path TEXT,
+            deadline TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )''')
+    conn.execute(f"INSERT INTO projects_new ({PROJECTS_TABLE_COLUMNS}) SELECT {PROJECTS_TABLE_COLUMNS} FROM projects")
+    conn.execute("DROP TABLE projects")
+    conn.execute("ALTER TABLE projects_new RENAME TO projects")
+    if sequence:
+        # Счетчик AUTOINCREMENT не должен вернуться к уже выданным id
+        conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'projects'", sequence)
+    for sql in indexes:
+        conn.execute(sql)
+
+
+PROJECTS_FTS_DEFERRED = 'projects_fts_deferred'  # Ключ settings: пока он есть, новые проекты не индексируются триггером
+PROJECTS_FTS_INSERT_TRIGGER = f'''
+    CREATE TRIGGER IF NOT EXISTS projects_fts_insert AFTER INSERT ON projects
+    WHEN NOT EXISTS (SELECT 1 FROM settings WHERE key = '{PROJECTS_FTS_DEFERRED}') BEGIN
+        INSERT INTO projects_fts (rowid, name, type, owner)
+        VALUES (new.id, new.name, new.type, 'u' || new.user_id);
+    END'''
+
+
+def create_project_search(conn):
+    # Полнотекстовый индекс FTS5 по названию и типу проекта; владелец - токен "u<id>" для отбора по пользователю
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+                name, type, owner,
+                content='projects_search', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6 7 8'
+            )''')
+    except sqlite3.OperationalError:
+        return  # SQLite собран без FTS5: поиск выполняется через LIKE
+    conn.execute('''
+        CREATE VIEW IF NOT EXISTS projects_search AS
+        SELECT id, name, type, 'u' || user_id AS owner FROM projects''')
+    # Синхронизация индекса; переключение завершенности индекс не затрагивает. Массовая вставка отключает
+    # триггер вставки флагом в settings, а не DROP TRIGGER: изменение схемы во время работы ломало каскадное
+    # удаление на других соединениях (SQLite 3.40: "no such table")
+    conn.execute(PROJECTS_FTS_INSERT_TRIGGER)
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS projects_fts_delete AFTER DELETE ON projects BEGIN
+            INSERT INTO projects_fts (projects_fts, rowid, name, type, owner)
+            VALUES ('delete', old.id, old.name, old.type, 'u' || old.user_id);
+        END''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS projects_fts_update AFTER UPDATE OF name, type, user_id ON projects BEGIN
+            INSERT INTO projects_fts (projects_fts, rowid, name, type, owner)
+            VALUES ('delete', old.id, old.name, old.type, 'u' || old.user_id);
+            INSERT INTO projects_fts (rowid, name, type, owner)
+            VALUES (new.id, new.name, new.type, 'u' || new.user_id);
+        END''')
+    conn.execute("INSERT INTO projects_fts (projects_fts) VALUES ('rebuild')")
+
+
+def create_attachments(conn):
+    # Таблица файлов хранилища вложений (по хешу содержимого) и ссылка на вложение у проекта
+    conn.execute("CREATE TABLE IF NOT EXISTS attachments (hash TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+    conn.execute("ALTER TABLE projects ADD COLUMN attachment TEXT REFERENCES attachments (hash)")
+    # Индекс для проверки, используется ли файл (сборка мусора и внешний ключ)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_attachment ON projects (attachment) WHERE attachment IS NOT NULL")
+
+
+def create_telegram_tables(conn):
+    # Привязка пользователей к чатам Telegram и отметки об отправленных сводках (для дедупликации)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS telegram_chats (
+            user_id INTEGER PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+            chat_id INTEGER NOT NULL
+        )''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_telegram_chats_chat ON telegram_chats (chat_id, user_id)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS telegram_sent (
+            chat_id INTEGER PRIMARY KEY,
+            digest_hash TEXT NOT NULL,
+            sent_on TEXT NOT NULL
+        )''')
+
+
+def drop_unused_project_index(conn):
+    # Индекс (user_id, completed, end_date) не выбирается ни одним запросом после появления индексов по срокам
+    # и для постраничного вывода, но обновляется при каждой вставке и переключении завершенности
+    conn.execute("DROP INDEX IF EXISTS idx_projects_user")
+
+
+# Упорядоченный список миграций: (описание, функция, пакетная ли миграция).
+# Номер версии схемы = позиция в списке; хранится в PRAGMA user_version.
+# Пакетная функция принимает (conn, after_id, batch_size), обрабатывает не более
+# batch_size необработанных строк с id > after_id и возвращает последний
+# обработанный id (None - миграция завершена).
+MIGRATIONS = [
+    ("создание таблиц", create_tables, False),
+    ("добавление столбцов role и file_path", add_missing_columns, False),
+    ("индексы по проектам", create_project_indexes, False),
+    ("добавление столбца deadline", add_deadline_column, False),
+    ("заполнение deadline по end_date", backfill_deadlines, True),
+    ("индекс по срокам проектов", create_deadline_index, False),
+    ("индекс для постраничного вывода проектов", create_paging_index, False),
+    ("таблица настроек", create_settings_table, False),
+    ("каскадное удаление проектов вместе с пользователем", add_cascade_foreign_key, False),
+    ("индекс по имени пользователя", create_username_index, False),
+    ("полнотекстовый поиск по проектам", create_project_search, False),
+    ("хранилище вложений", create_attachments, False),
+    ("уведомления в Telegram", create_telegram_tables, False),
+    ("удаление неиспользуемого индекса по проектам", drop_unused_project_index, False),
+]
+MIGRATION_BATCH_SIZE = 10000  # Размер порции пакетной миграции
+
+
+class DatabaseWorker:
+    def __init__(self, db_manager):
+        self.db_manager = db_manager  # Менеджер базы данных
+        self.requests = queue.Queue()  # Очередь запросов к базе
+        self.thread = threading.Thread(target=self.run, name="taskboard-db", daemon=True)
+        self.thread.start()
+
+    def submit(self, func, *args):
+        # Постановка операции в очередь; результат придет через Future
+        import concurrent.futures  # Импорт при первом обращении: командной строке рабочий поток не нужен
+        future = concurrent.futures.Future()
+        call_site = self.db_manager.caller_site() if self.db_manager.query_stats is not None else None
+        self.requests.put((future, func, args, call_site))
+        return future
+
+    def run(self):
+        # Последовательное выполнение операций в рабочем потоке
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            future, func, args, call_site = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            self.db_manager.call_context.site = call_site  # Статистика запросов относит их к месту постановки
+            try:
+                future.set_result(func(*args))
+            except Exception as error:
+                future.set_exception(error)
+            finally:
+                self.db_manager.call_context.site = None
+        self.db_manager.pool.release()
+
+    def stop(self):
+        # Завершение рабочего потока после выполнения уже поставленных операций
+        self.requests.put(None)
+        self.thread.join()
+
+
+SLOW_QUERY_THRESHOLD = 0.1  # Порог медленного запроса по умолчанию, с
+QUERY_STATS_SITES = 5  # Сколько самых частых мест вызова хранить в выгрузке для каждого запроса
+SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")  # Строковые и числовые литералы
+SQL_PARAMETER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")  # Списки IN (?, ?, ...) разной длины
+SQL_SPACES = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(query):
+    # Ключ статистики запроса: пробелы схлопнуты, литералы и списки параметров любой длины заменены на ?
+    query = SQL_LITERALS.sub('?', SQL_SPACES.sub(' ', query).strip())
+    return SQL_PARAMETER_LISTS.sub('(?, ...)', query)
+
+
+class QueryStats:
+    def __init__(self, slow_threshold=SLOW_QUERY_THRESHOLD, log=None):
+        self.slow_threshold = slow_threshold  # Порог медленного запроса, с
+        self.log = log  # Обработчик сообщений о медленных запросах
+        self.entries = {}  # Нормализованный SQL -> накопленная статистика
+        self.lock = threading.Lock()  # Запросы выполняются из потока окон и рабочих потоков
+        self.started = datetime.datetime.now()  # Начало сбора
+
+    def record(self, query, elapsed, rows, call_site):
+        # Учет выполненного запроса; True - запрос медленный и его план еще не записан
+        key = normalize_sql(query)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = {'calls': 0, 'total': 0.0, 'max': 0.0, 'rows': 0, 'slow': 0,
+                                             'sites': collections.Counter(), 'plan': None}
+            entry['calls'] += 1
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            entry['rows'] += rows
+            entry['sites'][call_site] += 1
+            if elapsed < self.slow_threshold:
+                return False
+            entry['slow'] += 1
+            return entry['plan'] is None
+
+    def record_plan(self, query, elapsed, call_site, plan):
+        # План медленного запроса (EXPLAIN QUERY PLAN) записывается один раз и передается в журнал
+        key = normalize_sql(query)
+        with self.lock:
+            self.entries[key]['plan'] = plan
+        if self.log:
+            self.log(f"Медленный запрос {elapsed * 1000:.0f} мс ({call_site}): {key}\n" +
+                     "\n".join(f"  {line}" for line in plan))
+
+    def snapshot(self):
+        # Статистика запросов по убыванию суммарного времени
+        with self.lock:
+            items = [(key, dict(entry, sites=entry['sites'].most_common(QUERY_STATS_SITES)))
+                     for key, entry in self.entries.items()]
+        items.sort(key=lambda item: item[1]['total'], reverse=True)
+        return [{
+            'query': key,
+            'calls': entry['calls'],
+            'total_ms': round(entry['total'] * 1000, 3),
+            'mean_ms': round(entry['total'] * 1000 / entry['calls'], 3),
+            'max_ms': round(entry['max'] * 1000, 3),
+            'rows': entry['rows'],
+            'slow': entry['slow'],
+            'call_sites': dict(entry['sites']),
+            'plan': entry['plan'],
+        } for key, entry in items]
+
+    def reset(self):
+        # Очистка накопленной статистики
+        with self.lock:
+            self.entries = {}
+            self.started = datetime.datetime.now()
+
+    def dump(self, file_path):
+        # Выгрузка статистики в JSON
+        import json
+        report = {
+            'started': self.started.isoformat(timespec='seconds'),
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'slow_threshold_ms': self.slow_threshold * 1000,
+            'statements': self.snapshot(),
+        }
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+def format_query_plan(rows):
+    # Строки EXPLAIN QUERY PLAN (id, parent, notused, detail) с отступами по вложенности
+    depth = {0: 0}
+    lines = []
+    for node_id, parent, unused, detail in rows:
+        depth[node_id] = depth.get(parent, 0) + 1
+        lines.append("  " * (depth[node_id] - 1) + detail)
+    return lines
+
+
+PROJECT_SEARCH_LIMIT = 200  # Максимум строк в результатах поиска проектов
+PROJECT_SEARCH_RANKED = 1000  # До скольких совпадений результаты сортируются по релевантности
+WRITE_DELAY = 0.05  # Окно группировки отложенных записей в одну транзакцию, с
+
+
+class DatabaseManager:
+    def __init__(self, db_path, profile=DEFAULT_DB_PROFILE, progress=None, write_delay=WRITE_DELAY):
+        if profile not in DB_PROFILES:
+            raise ValueError(f"Неизвестный профиль базы данных: {profile}")
+        self.db_path = db_path  # Путь к базе данных
+        self.profile = profile  # Профиль производительности
+        self.pool = ConnectionPool(db_path, DB_PROFILES[profile])  # Пул соединений
+        self.pool.open()
+        self.worker = None  # Рабочий поток для операций из окон (запускается при первом обращении)
+        self.worker_lock = threading.Lock()  # Защита запуска рабочего потока
+        self.write_delay = write_delay  # Окно группировки отложенных записей
+        self.pending_writes = []  # Отложенные записи: (запрос, параметры, Future, место вызова)
+        self.write_lock = threading.Lock()  # Защита очереди отложенных записей
+        self.write_timer = None  # Таймер сброса отложенных записей
+        self.write_commits = 0  # Количество зафиксированных групп записей
+        self.progress = progress  # Обработчик сообщений о ходе миграции
+        self.query_stats = None  # Статистика SQL-выражений (None - сбор выключен)
+        self.call_context = threading.local()  # Место постановки операции, выполняемой рабочим потоком
+        self.migrate()  # Приведение схемы к актуальной версии
+        self.project_search = self.has_project_search()  # Доступен ли полнотекстовый поиск по проектам
+        self.attachments = AttachmentStore(
+            self, os.path.join(os.path.dirname(os.path.abspath(db_path)), ATTACHMENTS_DIR))  # Хранилище вложений
+
+    def close(self):
+        # Закрытие соединений с базой данных; отложенные записи сначала фиксируются
+        pending = self.flush()
+        if pending:
+            import concurrent.futures
+            concurrent.futures.wait([pending])
+        if self.worker:
+            self.worker.stop()
+            self.worker = None
+        self.pool.close()
+
+    def submit(self, func, *args):
+        # Выполнение операции с базой в рабочем потоке, чтобы не блокировать интерфейс
+        with self.worker_lock:
+            if self.worker is None:
+                self.worker = DatabaseWorker(self)
+        return self.worker.submit(func, *args)
+
+    def write(self, query, params=()):
+        # Отложенная запись: изменения, пришедшие в течение write_delay секунд, фиксируются одной
+        # транзакцией в рабочем потоке. Future завершается после фиксации; до этого момента изменение
+        # видно только в интерфейсе и при аварийном завершении может быть потеряно. Закрытие окон и
+        # выход из приложения вызывают flush(), close() дожидается фиксации.
+        import concurrent.futures
+        future = concurrent.futures.Future()
+        call_site = self.caller_site() if self.query_stats is not None else None
+        with self.write_lock:
+            self.pending_writes.append((query, params, future, call_site))
+            if self.write_timer is None:
+                self.write_timer = threading.Timer(self.write_delay, self.flush)
+                self.write_timer.daemon = True
+                self.write_timer.start()
+        return future
+
+    def flush(self):
+        # Немедленная передача накопленных записей рабочему потоку; возвращает Future группы или None
+        with self.write_lock:
+            if self.write_timer is not None:
+                self.write_timer.cancel()
+                self.write_timer = None
+            batch, self.pending_writes = self.pending_writes, []
+        if not batch:
+            return None
+        return self.submit(self.commit_writes, batch)
+
+    def commit_writes(self, batch):
+        # Выполнение группы записей в одной транзакции: все или ничего
+        conn = self.pool.get_connection()
+        try:
+            with conn:
+                for query, params, future, call_site in batch:
+                    self.run_statement(conn, query, params, call_site=call_site)
+        except sqlite3.Error as error:
+            for query, params, future, call_site in batch:
+                future.set_exception(error)
+            raise
+        self.write_commits += 1
+        for query, params, future, call_site in batch:
+            future.set_result(None)
+
+    def add_project(self, user_id, name, project_type, start_date, end_date, deadline, attachment=None):
+        # Добавление проекта; вложение (хеш, размер, исходный путь) регистрируется в той же транзакции
+        file_name, digest = '', None
+        with self.pool.get_connection() as conn:
+            if attachment:
+                digest, size, source_path = attachment
+                file_name = os.path.basename(source_path)
+                self.attachments.register(conn, digest, size, source_path)
+            self.run_statement(
+                conn,
+                "INSERT INTO projects (name, type, start_date, end_date, deadline, file_path, attachment, user_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, project_type, start_date, end_date, deadline, file_name, digest, user_id))
+
+    def collect_attachment_garbage(self):
+        # Сборка мусора хранилища вложений в рабочем потоке: по одной порции за раз, между порциями
+        # выполняются операции окон
+        steps = self.attachments.collect_garbage()
+
+        def step():
+            if not self.pool.is_open:
+                return
+            try:
+                next(steps)
+            except StopIteration:
+                return
+            self.submit(step)
+
+        return self.submit(step)
+
+    def describe_profile(self):
+        # Описание активного профиля с фактическими значениями PRAGMA
+        conn = self.pool.get_connection()
+        values = ", ".join(f"{name}={conn.execute(f'PRAGMA {name}').fetchone()[0]}"
+                           for name in DB_PROFILES[self.profile])
+        return f"{self.profile} ({values})"
+
+    def migrate(self):
+        # Применение недостающих миграций; для актуальной базы - одно чтение PRAGMA user_version.
+        # Базу одновременно открывают окна, бот и командная строка: шаг выполняется под блокировкой
+        # записи и пропускается, если его уже применил другой процесс
+        conn = self.pool.get_connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, (description, migration, batched) in enumerate(MIGRATIONS[version:], start=version + 1):
+            if not self.begin_migration(conn, number):
+                continue
+            self.report_progress(f"Миграция {number}/{len(MIGRATIONS)}: {description}")
+            if batched:
+                # Пакетная миграция: каждая порция в своей транзакции, прерванный запуск продолжится с места остановки
+                last_id = migration(conn, 0, MIGRATION_BATCH_SIZE)
+                while last_id is not None:
+                    conn.commit()
+                    self.report_progress(f"Миграция {number}/{len(MIGRATIONS)}: обработаны строки до id {last_id}")
+                    if not self.begin_migration(conn, number):
+                        break  # Миграцию между порциями завершил другой процесс
+                    last_id = migration(conn, last_id, MIGRATION_BATCH_SIZE)
+                if last_id is not None:
+                    continue
+            else:
+                migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+
+    def begin_migration(self, conn, number):
+        # Начало транзакции шага миграции с блокировкой записи и повторным чтением версии схемы;
+        # False - шаг уже применен другим процессом
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("PRAGMA user_version").fetchone()[0] < number:
+            return True
+        conn.rollback()
+        return False
+
+    def report_progress(self, message):
+        # Сообщение о ходе миграции
+        if self.progress:
+            self.progress(message)
+
+    def execute_query(self, query, params=(), fetch=False):
+        # Выполнение SQL-запроса через соединение из пула
+        with self.pool.get_connection() as conn:
+            rows = self.run_statement(conn, query, params, fetch='all' if fetch else None)
+            if fetch:
+                return rows  # Возвращение результатов запроса
+            conn.commit()  # Сохранение изменений
+
+    def run_statement(self, conn, query, params=(), many=False, fetch=None, call_site=None):
+        # Единая точка выполнения SQL-выражений приложения (execute или executemany при many);
+        # fetch: None - курсор, 'all' - все строки, 'one' - первая строка. При включенной статистике - с замером
+        stats = self.query_stats
+        if stats is not None:
+            return self.run_measured_statement(stats, conn, query, params, many, fetch, call_site)
+        cursor = conn.executemany(query, params) if many else conn.execute(query, params)
+        if fetch is None:
+            return cursor
+        return cursor.fetchall() if fetch == 'all' else cursor.fetchone()
+
+    def run_measured_statement(self, stats, conn, query, params, many, fetch, call_site):
+        # run_statement с учетом времени, числа строк и места вызова; для медленного выражения - его план
+        if call_site is None:
+            call_site = self.caller_site()
+        if many:
+            params = list(params)  # Параметры нужны повторно для плана
+        start = time.perf_counter()
+        cursor = conn.executemany(query, params) if many else conn.execute(query, params)
+        if fetch is None:
+            result = cursor
+            rows = max(cursor.rowcount, 0)
+        elif fetch == 'all':
+            result = cursor.fetchall()
+            rows = len(result)
+        else:
+            result = cursor.fetchone()
+            rows = int(result is not None)
+        elapsed = time.perf_counter() - start
+        self.record_statement(stats, conn, query, (params[0] if params else ()) if many else params,
+                              elapsed, rows, call_site)
+        return result
+
+    def record_statement(self, stats, conn, query, params, elapsed, rows, call_site):
+        # Учет выполненного выражения; план медленного выражения строится на том же соединении
+        if stats.record(query, elapsed, rows, call_site):
+            try:
+                plan = format_query_plan(conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall())
+            except sqlite3.Error as error:
+                plan = [f"план недоступен: {error}"]
+            stats.record_plan(query, elapsed, call_site, plan)
+
+    def caller_site(self):
+        # Место вызова за пределами taskboard.py ("файл:строка функция"); в рабочем потоке - место постановки операции
+        site = getattr(self.call_context, 'site', None)
+        if site is not None:
+            return site
+        frame = sys._getframe(1)
+        while frame.f_back is not None and frame.f_globals.get('__name__') == __name__:
+            frame = frame.f_back
+        return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+    def enable_query_stats(self, slow_threshold=SLOW_QUERY_THRESHOLD, log=None):
+        # Включение статистики SQL-выражений; уже собранная статистика сохраняется, меняется только порог
+        if self.query_stats is None:
+            self.query_stats = QueryStats(slow_threshold, log)
+        else:
+            self.query_stats.slow_threshold = slow_threshold
+        return self.query_stats
+
+    def disable_query_stats(self):
+        # Выключение статистики: выражения снова выполняются без замеров; возвращается собранная статистика
+        stats, self.query_stats = self.query_stats, None
+        return stats
+
+    def iterate_query(self, query, params=(), chunk_size=1000):
+        # Чтение результатов запроса порциями, без загрузки всех строк в память; в статистику попадает
+        # время выполнения и выборки порций без времени их обработки вызывающим
+        stats = self.query_stats
+        call_site = self.caller_site() if stats is not None else None
+        conn = self.pool.get_connection()
+        start = time.perf_counter()
+        cursor = conn.execute(query, params)
+        elapsed, count = time.perf_counter() - start, 0
+        try:
+            while True:
+                start = time.perf_counter()
+                rows = cursor.fetchmany(chunk_size)
+                elapsed += time.perf_counter() - start
+                if not rows:
+                    break
+                count += len(rows)
+                yield rows
+        finally:
+            cursor.close()
+            if stats is not None:
+                self.record_statement(stats, conn, query, params, elapsed, count, call_site)
+
+    def has_project_search(self):
+        # Наличие полнотекстового индекса по проектам (его нет, если SQLite собран без FTS5)
+        return bool(self.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'projects_fts'", fetch=True))
+
+    def rebuild_project_search(self):
+        # Полное перестроение полнотекстового индекса (или его создание); False - SQLite собран без FTS5
+        exists = self.has_project_search()
+        conn = self.pool.get_connection()
+        conn.execute("BEGIN")
+        if exists:
+            conn.execute("INSERT INTO projects_fts (projects_fts) VALUES ('rebuild')")
+        else:
+            create_project_search(conn)
+        conn.commit()
+        self.project_search = self.has_project_search()
+        return self.project_search
+
+    def search_projects(self, user_id, text, limit=PROJECT_SEARCH_LIMIT):
+        # Поиск проектов пользователя по началу слов в названии и типе
+        words = re.findall(r'\w+', text)
+        if not words:
+            return []
+        if not self.project_search:
+            conditions = " AND ".join("(name LIKE ? OR type LIKE ?)" for word in words)
+            params = [pattern for word in words for pattern in (f"%{word}%",) * 2]
+            return self.execute_query(
+                f"SELECT {PROJECT_COLUMNS} FROM projects WHERE user_id = ? AND {conditions} ORDER BY id LIMIT ?",
+                [user_id] + params + [limit], fetch=True)
+        # Законченные слова ищутся целиком, последнее (набираемое) - по началу
+        terms = [f'"{word}"' for word in words]
+        if re.search(r'\w$', text):
+            terms[-1] += '*'
+        expression = f'owner : "u{int(user_id)}" AND {{name type}} : ({" ".join(terms)})'
+        columns = ", ".join(f"p.{column}" for column in PROJECT_COLUMNS.split(", "))
+        rows = self.execute_query(
+            f"SELECT {columns} FROM projects_fts f JOIN projects p ON p.id = f.rowid "
+            "WHERE projects_fts MATCH ? LIMIT ?",
+            (expression, PROJECT_SEARCH_RANKED + 1), fetch=True)
+        if len(rows) > PROJECT_SEARCH_RANKED:
+            return rows[:limit]  # Слишком общий запрос: первые совпадения по порядку добавления
+        # Сортировка по релевантности в Python: bm25 (ORDER BY rank) читает списки документов
+        # всех слов запроса целиком, что для частых слов занимает десятки миллисекунд
+        words = [word.casefold() for word in words]
+        rows.sort(key=lambda project: project_relevance(words, project))
+        return rows[:limit]
+
+    def get_telegram_chat(self, user_id):
+        # Чат Telegram, привязанный к пользователю, или None
+        rows = self.execute_query("SELECT chat_id FROM telegram_chats WHERE user_id=?", (user_id,), fetch=True)
+        return rows[0][0] if rows else None
+
+    def link_telegram_chat(self, user_id, chat_id):
+        # Привязка пользователя к чату Telegram (None - отвязка)
+        if chat_id is None:
+            self.execute_query("DELETE FROM telegram_chats WHERE user_id=?", (user_id,))
+        else:
+            self.execute_query("INSERT OR REPLACE INTO telegram_chats (user_id, chat_id) VALUES (?, ?)",
+                               (user_id, chat_id))
+
+    def iterate_due_digests(self, days_before=DAYS_BEFORE, chat_id=None):
+        # Проекты с подходящим сроком всех привязанных к Telegram пользователей (или одного чата) одним запросом,
+        # сгруппированные по чатам: (chat_id, [(имя пользователя, название, срок, состояние), ...])
+        today = datetime.date.today()
+        limit = today + datetime.timedelta(days=days_before)
+        rows = itertools.chain.from_iterable(self.iterate_query(
+            f"""SELECT c.chat_id, u.username, p.name, p.deadline,
+                       CASE WHEN p.deadline < :today THEN 'overdue'
+                            WHEN p.deadline = :today THEN 'today'
+                            ELSE 'soon' END
+                FROM telegram_chats c
+                JOIN users u ON u.id = c.user_id
+                JOIN projects p ON p.user_id = c.user_id AND p.completed = 0
+                               AND p.deadline > '' AND p.deadline < :limit
+                {'' if chat_id is None else 'WHERE c.chat_id = :chat_id'}
+                ORDER BY c.chat_id""",
+            {'today': today.isoformat(), 'limit': limit.isoformat(), 'chat_id': chat_id}, TELEGRAM_QUERY_CHUNK))
+        for chat_id, group in itertools.groupby(rows, key=lambda row: row[0]):
+            yield chat_id, sorted((row[1:] for row in group), key=lambda row: (row[2], row[0], row[1]))
+
+    def get_chat_due_projects(self, chat_id, days_before=DAYS_BEFORE):
+        # Проекты с подходящим сроком пользователей, привязанных к чату (для команды бота /due)
+        for _, rows in self.iterate_due_digests(days_before, chat_id):
+            return rows
+        return []
+
+    def get_chat_projects(self, chat_id, limit):
+        # Незавершенные проекты пользователей, привязанных к чату: ближайшие сроки первыми, без срока - в конце
+        return self.execute_query(
+            """SELECT p.id, p.name, p.deadline, u.username
+               FROM telegram_chats c
+               JOIN users u ON u.id = c.user_id
+               JOIN projects p ON p.user_id = c.user_id AND p.completed = 0
+               WHERE c.chat_id = ?
+               ORDER BY COALESCE(p.deadline, '') = '', p.deadline, p.id
+               LIMIT ?""",
+            (chat_id, limit), fetch=True)
+
+    def complete_chat_project(self, chat_id, project_id):
+        # Отметка проекта завершенным из чата: только проекты привязанных к чату пользователей; True, если изменен
+        with self.pool.get_connection() as conn:
+            return self.run_statement(
+                conn,
+                """UPDATE projects SET completed = 1
+                   WHERE id = ? AND completed = 0
+                     AND user_id IN (SELECT user_id FROM telegram_chats WHERE chat_id = ?)""",
+                (project_id, chat_id)).rowcount > 0
+
+    def is_chat_linked(self, chat_id):
+        # Привязан ли к чату хотя бы один пользователь
+        return bool(self.execute_query("SELECT 1 FROM telegram_chats WHERE chat_id = ? LIMIT 1", (chat_id,), fetch=True))
+
+    def list_projects(self, user_id, completed=None):
+        # Проекты пользователя по порядку добавления порциями (completed: None - все, 0 - открытые, 1 - завершенные)
+        condition = "" if completed is None else " AND completed = ?"
+        params = (user_id,) if completed is None else (user_id, completed)
+        for rows in self.iterate_query(
+                f"SELECT {PROJECT_COLUMNS} FROM projects WHERE user_id = ?{condition} ORDER BY id", params):
+            yield from rows
+
+    def set_projects_completed(self, user_id, project_ids, completed):
+        # Отметка проектов пользователя одной транзакцией; возвращает количество измененных проектов
+        with self.pool.get_connection() as conn:
+            return self.run_statement(
+                conn, "UPDATE projects SET completed = ? WHERE id = ? AND user_id = ?",
+                ((int(completed), project_id, user_id) for project_id in project_ids), many=True).rowcount
+
+    def delete_projects(self, user_id, project_ids):
+        # Удаление проектов пользователя одной транзакцией; возвращает количество удаленных проектов
+        with self.pool.get_connection() as conn:
+            return self.run_statement(
+                conn, "DELETE FROM projects WHERE id = ? AND user_id = ?",
+                ((project_id, user_id) for project_id in project_ids), many=True).rowcount
+
+    def get_due_projects(self, user_id, days_before=DAYS_BEFORE):
+        # Незавершенные проекты со сроком не позже чем через days_before суток (поиск по индексу)
+        today = datetime.date.today()
+        limit = today + datetime.timedelta(days=days_before)
+        return self.execute_query(
+            """SELECT id, name, deadline,
+                      CASE WHEN deadline < :today THEN 'overdue'
+                           WHEN deadline = :today THEN 'today'
+                           ELSE 'soon' END
+               FROM projects
+               WHERE user_id = :user_id AND completed = 0 AND deadline > '' AND deadline < :limit
+               ORDER BY deadline""",
+            {'user_id': user_id, 'today': today.isoformat(), 'limit': limit.isoformat()},
+            fetch=True
+        )
+
+
+USER_ROLES = ('admin', 'user')  # Допустимые роли пользователей
+
+
+class TaskBoardError(Exception):
+    # Ошибка операции, понятная пользователю: окна показывают ее в messagebox, командная строка - в stderr
+    pass
+
+
+PASSWORD_TARGET_TIME = 0.1  # Целевое время проверки пароля при входе, с
+PASSWORD_MIN_ITERATIONS = 100000  # Нижняя граница стоимости PBKDF2
+PASSWORD_SCHEME = 'pbkdf2_sha256'  # Префикс формата "схема$итерации$соль$хеш"
+
+
+def calibrate_password_iterations(target=PASSWORD_TARGET_TIME):
+    # Подбор числа итераций PBKDF2, при котором хеширование занимает около target секунд на этой машине
+    import hashlib  # Модуль хеширования (OpenSSL) загружается при первом хешировании, а не при запуске
+    iterations = 10000
+    while True:
+        start = time.perf_counter()
+        hashlib.pbkdf2_hmac('sha256', b'calibration', b'calibration-salt', iterations)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0.02:
+            return max(PASSWORD_MIN_ITERATIONS, int(iterations * target / elapsed))
+        iterations *= 2
+
+
+class AuthenticationManager(DatabaseManager):
+    def get_password_iterations(self):
+        # Стоимость хеширования: калибруется при первом запуске и хранится в таблице settings
+        iterations = getattr(self, 'password_iterations', None)
+        if iterations:
+            return iterations
+        row = self.execute_query("SELECT value FROM settings WHERE key='password_iterations'", fetch=True)
+        if not row:
+            self.execute_query("INSERT OR IGNORE INTO settings (key, value) VALUES ('password_iterations', ?)",
+                               (str(calibrate_password_iterations()),))
+            row = self.execute_query("SELECT value FROM settings WHERE key='password_iterations'", fetch=True)
+        self.password_iterations = int(row[0][0])
+        return self.password_iterations
+
+    def hash_password(self, password, iterations=None):
+        # Хеширование пароля PBKDF2-HMAC-SHA256 со случайной солью
+        import hashlib
+        iterations = iterations or self.get_password_iterations()
+        salt = os.urandom(16)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+        return f"{PASSWORD_SCHEME}${iterations}${salt.hex()}${digest.hex()}"
+
+    def verify_password(self, password, stored):
+        # Проверка пароля: (совпадает ли, нужно ли перехешировать с текущей стоимостью)
+        import hashlib
+        import hmac
+        if not stored:
+            return False, False
+        if not stored.startswith(PASSWORD_SCHEME + '$'):
+            # Устаревший формат: SHA-256 без соли
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, stored), True
+        scheme, iterations, salt, digest = stored.split('$')
+        candidate = hashlib.pbkdf2_hmac('sha256', password.encode(), bytes.fromhex(salt), int(iterations))
+        matches = hmac.compare_digest(candidate.hex(), digest)
+        return matches, int(iterations) < self.get_password_iterations()
+
+    def get_dummy_password_hash(self):
+        # Хеш для проверки пароля несуществующего пользователя с текущей стоимостью: по времени ответа
+        # нельзя узнать, существует ли логин
+        iterations = self.get_password_iterations()
+        dummy = getattr(self, 'dummy_password_hash', None)
+        if dummy is None or dummy[0] != iterations:
+            dummy = self.dummy_password_hash = (iterations, self.hash_password(os.urandom(16).hex(), iterations))
+        return dummy[1]
+
+    def create_user(self, username, password, role='user'):
+        # Создание пользователя (без сообщений, можно вызывать из рабочего потока); False - имя занято
+        hashed_password = self.hash_password(password)  # Хеширование пароля
+        try:
+            self.execute_query(
+                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                (username, hashed_password, role)
+            )
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def register_user(self, username, password, role='user'):
+        # Регистрация с проверкой данных; ошибка сообщается исключением TaskBoardError
+        if not username or not password:
+            raise TaskBoardError("Логин и пароль обязательны")
+        if role not in USER_ROLES:
+            raise TaskBoardError(f"Роль должна быть одной из: {', '.join(USER_ROLES)}")
+        if not self.create_user(username, password, role):
+            raise TaskBoardError("Пользователь с таким именем уже существует")
+
+    def find_user(self, username, password):
+        # Поиск пользователя по логину и паролю (без сообщений, можно вызывать из рабочего потока)
+        user = self.execute_query(
+            "SELECT id, username, role, password FROM users WHERE username=?",
+            (username,),
+            fetch=True
+        )
+        if not user:
+            self.verify_password(password, self.get_dummy_password_hash())  # Та же работа, что и для известного логина
+            return None
+        user_id, username, role, stored = user[0]
+        matches, needs_rehash = self.verify_password(password, stored)
+        if not matches:
+            return None
+        if needs_rehash:
+            # Прозрачное обновление хеша старого формата или устаревшей стоимости
+            self.execute_query("UPDATE users SET password=? WHERE id=?", (self.hash_password(password), user_id))
+        return user_id, username, role  # Возвращение данных пользователя
+
+    def authenticate(self, username, password):
+        # Вход по логину и паролю: (id, логин, роль); при неверных данных - исключение TaskBoardError
+        user = self.find_user(username, password)
+        if not user:
+            raise TaskBoardError("Неправильный логин или пароль")
+        return user
+
+    def get_user(self, username):
+        # Пользователь по логину без проверки пароля (для командной строки): (id, логин, роль) или None
+        rows = self.execute_query("SELECT id, username, role FROM users WHERE username=?", (username,), fetch=True)
+        return rows[0] if rows else None
+
+    def delete_user(self, user_id):
+        # Удаление пользователя и связанных проектов
+        self.delete_users([user_id])
+
+    def delete_users(self, user_ids):
+        # Удаление пользователей одной транзакцией; проекты удаляются каскадно по индексу user_id
+        with self.pool.get_connection() as conn:
+            self.run_statement(conn, "DELETE FROM users WHERE id=?", ((user_id,) for user_id in user_ids), many=True)
+
+
+PROJECT_COLUMNS = "id, name, type, start_date, end_date, completed, file_path"  # Столбцы строки списка проектов
+PROJECTS_PAGE_SIZE = 100  # Строк в одной странице выборки
+PROJECTS_CACHED_PAGES = 20  # Сколько страниц держать в памяти
+
+
+class ProjectPager:
+    def __init__(self, db_manager, user_id, page_size=PROJECTS_PAGE_SIZE):
+        self.db_manager = db_manager  # Менеджер базы данных
+        self.user_id = user_id  # Идентификатор пользователя
+        self.page_size = page_size  # Размер страницы
+        self.pages = collections.OrderedDict()  # Кэш страниц: номер -> строки (LRU)
+        self.changes = 0  # Счетчик изменений кэша: страница, загруженная до изменения, отбрасывается
+        self.count = db_manager.execute_query(
+            "SELECT COUNT(*) FROM projects WHERE user_id=?", (user_id,), fetch=True
+        )[0][0]  # Общее количество проектов
+
+    def get(self, index):
+        # Получение строки по ее номеру в списке (страница загружается при первом обращении)
+        number, position = divmod(index, self.page_size)
+        page = self.pages.get(number)
+        if page is None:
+            page = self.load_page(number)
+        else:
+            self.pages.move_to_end(number)
+        return page[position] if position < len(page) else None
+
+    def missing_page(self, index):
+        # Номер страницы строки, если ее еще нет в кэше (окно загружает ее в рабочем потоке), иначе None
+        number = index // self.page_size
+        return None if number in self.pages else number
+
+    def page_query(self, number):
+        # Запрос страницы: по ключу от предыдущей страницы, если она в кэше, иначе через OFFSET
+        previous = self.pages.get(number - 1)
+        if previous:
+            return (f"SELECT {PROJECT_COLUMNS} FROM projects WHERE user_id=? AND id > ? ORDER BY id LIMIT ?",
+                    (self.user_id, previous[-1][0], self.page_size))
+        return (f"SELECT {PROJECT_COLUMNS} FROM projects WHERE user_id=? ORDER BY id LIMIT ? OFFSET ?",
+                (self.user_id, self.page_size, number * self.page_size))
+
+    def load_page(self, number):
+        # Синхронная загрузка страницы в кэш
+        query, params = self.page_query(number)
+        return self.store_page(number, self.db_manager.execute_query(query, params, fetch=True))
+
+    def store_page(self, number, page):
+        # Добавление загруженной страницы в кэш с вытеснением давно не использованных
+        self.pages[number] = page
+        while len(self.pages) > PROJECTS_CACHED_PAGES:
+            self.pages.popitem(last=False)
+        return page
+
+    def find(self, project_id):
+        # Поиск строки проекта среди загруженных страниц: (номер страницы, позиция) или None
+        for number, page in self.pages.items():
+            for position, project in enumerate(page):
+                if project[0] == project_id:
+                    return number, position
+        return None
+
+    def update(self, project_id, completed):
+        # Изменение состояния проекта в кэше без повторного запроса; возвращает новую строку
+        found = self.find(project_id)
+        if found is None:
+            return None
+        number, position = found
+        self.changes += 1
+        project = self.pages[number][position]
+        project = project[:5] + (completed,) + project[6:]
+        self.pages[number][position] = project
+        return project
+
+    def remove(self, project_id):
+        # Удаление проекта из кэша: последующие загруженные страницы сдвигаются на одну строку
+        self.changes += 1
+        self.count -= 1
+        found = self.find(project_id)
+        if found is None:
+            self.pages.clear()
+            return
+        number, position = found
+        del self.pages[number][position]
+        while number + 1 in self.pages and self.pages[number + 1]:
+            self.pages[number].append(self.pages[number + 1].pop(0))
+            number += 1
+        # Неполные страницы (кроме последней) будут загружены заново при обращении
+        for number in list(self.pages):
+            if len(self.pages[number]) < min(self.page_size, self.count - number * self.page_size):
+                del self.pages[number]
+
+
+def project_relevance(words, project):
+    # Ключ сортировки результатов поиска: совпадения в названии важнее, чем в типе, целое слово - чем начало
+    name_words = re.findall(r'\w+', (project[1] or '').casefold())
+    type_words = re.findall(r'\w+', (project[2] or '').casefold())
+    score = 0
+    for word in words:
+        if word in name_words:
+            score += 3
+        elif any(name_word.startswith(word) for name_word in name_words):
+            score += 2
+        elif any(type_word.startswith(word) for type_word in type_words):
+            score += 1
+    return -score, len(project[1] or ''), project[0]
+
+
+class ProjectSearchPager:
+    def __init__(self, db_manager, user_id, text):
+        self.text = text  # Поисковый запрос
+        self.rows = db_manager.search_projects(user_id, text)  # Найденные проекты (в памяти, их немного)
+        self.count = len(self.rows)  # Количество найденных проектов
+
+    def get(self, index):
+        # Получение строки по ее номеру в результатах поиска
+        return self.rows[index] if index < self.count else None
+
+    def missing_page(self, index):
+        # Результаты поиска целиком в памяти: догружать нечего
+        return None
+
+    def update(self, project_id, completed):
+        # Изменение состояния проекта в результатах поиска; возвращает новую строку
+        for position, project in enumerate(self.rows):
+            if project[0] == project_id:
+                project = project[:5] + (completed,) + project[6:]
+                self.rows[position] = project
+                return project
+        return None
+
+    def remove(self, project_id):
+        # Удаление проекта из результатов поиска
+        self.rows = [project for project in self.rows if project[0] != project_id]
+        self.count = len(self.rows)
+
+
+USERS_PAGE_SIZE = 100  # Пользователей в одной странице выборки
+
+
+class UserPager:
+    def __init__(self, db_manager, prefix='', page_size=USERS_PAGE_SIZE):
+        self.db_manager = db_manager  # Менеджер базы данных
+        self.prefix = prefix  # Начало имени пользователя для поиска (без учета регистра)
+        self.page_size = page_size  # Размер страницы
+        self.last = (prefix, 0)  # Ключ последней загруженной строки: (имя пользователя, id)
+        self.exhausted = False  # Все подходящие пользователи загружены
+
+    def next_page(self):
+        # Следующая страница пользователей по ключу (имя без учета регистра, id) в порядке индекса
+        if self.exhausted:
+            return []
+        # Нижняя граница диапазона индекса - ключ последней строки (для первой страницы - начало имени)
+        query = ("SELECT id, username, role FROM users "
+                 "WHERE username >= :name COLLATE NOCASE AND (username > :name COLLATE NOCASE OR id > :id)")
+        if self.prefix:
+            # Верхняя граница поиска по началу имени: LIKE не использует индекс с COLLATE NOCASE
+            query += " AND username < :prefix || char(1114111) COLLATE NOCASE"
+        query += " ORDER BY username COLLATE NOCASE, id LIMIT :limit"
+        name, last_id = self.last
+        rows = self.db_manager.execute_query(
+            query, {'name': name, 'id': last_id, 'prefix': self.prefix, 'limit': self.page_size}, fetch=True)
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        if rows:
+            self.last = (rows[-1][1], rows[-1][0])
+        return rows
+
+
+ATTACHMENTS_DIR = 'attachments'  # Каталог хранилища вложений рядом с базой данных
+ATTACHMENT_CHUNK_SIZE = 1024 * 1024  # Размер порции чтения при хешировании и копировании, байт
+ATTACHMENT_GC_BATCH = 500  # Файлов хранилища в одной порции сборки мусора
+ATTACHMENT_GRACE = 3600  # Возраст файла без записи в базе, после которого он считается мусором, с
+
+
+class AttachmentStore:
+    def __init__(self, db_manager, root):
+        self.db_manager = db_manager  # Менеджер базы данных
+        self.root = root  # Каталог хранилища: <root>/<первые 2 символа хеша>/<хеш>
+
+    def path(self, digest):
+        # Путь к файлу с заданным хешем содержимого
+        return os.path.join(self.root, digest[:2], digest)
+
+    def store(self, source_path, progress=None, cancelled=None):
+        # Копирование файла в хранилище с вычислением SHA-256 за один проход; возвращает (хеш, размер)
+        # или None при отмене. Одинаковое содержимое хранится в одном файле.
+        import hashlib
+        import tempfile
+        os.makedirs(self.root, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix='tmp-', dir=self.root)
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with open(source_path, 'rb') as source, os.fdopen(fd, 'wb') as target:
+                for chunk in iter(functools.partial(source.read, ATTACHMENT_CHUNK_SIZE), b''):
+                    if cancelled is not None and cancelled.is_set():
+                        return None
+                    digest.update(chunk)
+                    target.write(chunk)
+                    size += len(chunk)
+                    if progress:
+                        progress(len(chunk))
+            digest = digest.hexdigest()
+            blob_path = self.path(digest)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(temp_path, blob_path)
+            return digest, size
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)  # Копия дубликата или прерванного копирования
+
+    def register(self, conn, digest, size, source_path):
+        # Регистрация файла в базе внутри транзакции вызывающего (после захвата блокировки записи
+        # сборщик мусора не может удалить файл)
+        self.db_manager.run_statement(conn, "INSERT OR IGNORE INTO attachments (hash, size) VALUES (?, ?)", (digest, size))
+        if not os.path.exists(self.path(digest)):
+            # Файл удален сборщиком мусора между копированием и регистрацией: копируем заново
+            stored = self.store(source_path)
+            if stored is None or stored[0] != digest:
+                raise OSError(f"Файл {source_path} изменился во время добавления")
+
+    def collect_garbage(self, batch_size=ATTACHMENT_GC_BATCH):
+        # Инкрементальная сборка мусора: генератор, каждый шаг которого - одна короткая транзакция
+        after = ''
+        while after is not None:
+            after = self.collect_batch(after, batch_size)
+            yield
+        if os.path.isdir(self.root):
+            for name in sorted(os.listdir(self.root)):
+                self.collect_directory(name)
+                yield
+
+    def collect_batch(self, after, batch_size):
+        # Удаление не используемых проектами файлов с хешем больше after; возвращает последний
+        # просмотренный хеш или None, если таблица просмотрена до конца
+        conn = self.db_manager.pool.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.db_manager.run_statement(
+                conn, "SELECT hash, EXISTS (SELECT 1 FROM projects WHERE attachment = attachments.hash) "
+                "FROM attachments WHERE hash > ? ORDER BY hash LIMIT ?", (after, batch_size), fetch='all')
+            garbage = [(digest,) for digest, used in rows if not used]
+            self.db_manager.run_statement(conn, "DELETE FROM attachments WHERE hash = ?", garbage, many=True)
+            # Файлы удаляются под блокировкой записи: регистрация того же файла дождется ее снятия
+            for digest, in garbage:
+                if os.path.exists(self.path(digest)):
+                    os.remove(self.path(digest))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return rows[-1][0] if len(rows) == batch_size else None
+
+    def collect_directory(self, name):
+        # Удаление файлов одного каталога хранилища, которых нет в базе (остались после сбоя),
+        # и брошенных временных файлов; свежие файлы не трогаются - они могут ждать регистрации
+        path = os.path.join(self.root, name)
+        expired = time.time() - ATTACHMENT_GRACE
+        if name.startswith('tmp-'):
+            if os.path.getmtime(path) < expired:
+                os.remove(path)
+            return
+        if not os.path.isdir(path):
+            return
+        conn = self.db_manager.pool.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            known = {digest for digest, in self.db_manager.run_statement(
+                conn, "SELECT hash FROM attachments WHERE hash >= ? AND hash < ?", (name, name + 'g'), fetch='all')}
+            for digest in os.listdir(path):
+                blob_path = os.path.join(path, digest)
+                if digest not in known and os.path.getmtime(blob_path) < expired:
+                    os.remove(blob_path)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+class AttachmentJob(threading.Thread):
+    def __init__(self, store, source_path):
+        super().__init__(daemon=True)
+        self.store = store  # Хранилище вложений
+        self.source_path = source_path  # Прикрепляемый файл
+        self.total = os.path.getsize(source_path)  # Размер файла в байтах
+        self.processed = 0  # Обработано байт
+        self.cancelled = threading.Event()  # Флаг отмены
+        self.error = None  # Ошибка, прервавшая копирование
+        self.result = None  # (хеш, размер) после успешного копирования
+        self.title = "Добавление файла"  # Заголовок окна хода выполнения
+
+    def run(self):
+        # Хеширование и копирование файла в хранилище в рабочем потоке
+        try:
+            self.result = self.store.store(self.source_path, self.advance, self.cancelled)
+        except OSError as error:
+            self.error = error
+
+    def advance(self, size):
+        # Учет обработанной порции
+        self.processed += size
+
+    def cancel(self):
+        # Запрос отмены копирования
+        self.cancelled.set()
+
+    def progress_text(self):
+        # Текст хода выполнения для окна прогресса
+        return f"Обработано {self.processed // 2 ** 20} из {self.total // 2 ** 20} МБ"
+
+    def result_message(self):
+        # Итоговое сообщение: (успех ли, текст); после успешного копирования сообщение не показывается
+        if self.error:
+            return False, f"Не удалось добавить файл: {self.error}"
+        if self.cancelled.is_set():
+            return True, "Добавление файла отменено"
+        return True, None
+
+
+EXPORT_COLUMNS = "name, type, start_date, end_date, completed, file_path"  # Столбцы проекта в CSV
+EXPORT_HEADER = ["Название", "Тип", "Дата начала", "Дата окончания", "Завершен", "Путь к файлу"]  # Заголовок CSV
+EXPORT_CHUNK_SIZE = 5000  # Строк в одной порции экспорта
+
+
+class CsvExportJob(threading.Thread):
+    def __init__(self, db_manager, user_id, file_path):
+        super().__init__(daemon=True)
+        self.db_manager = db_manager  # Менеджер базы данных
+        self.user_id = user_id  # Идентификатор пользователя
+        self.file_path = file_path  # Путь к файлу CSV
+        self.total = db_manager.execute_query(
+            "SELECT COUNT(*) FROM projects WHERE user_id=?", (user_id,), fetch=True
+        )[0][0]  # Всего строк для экспорта
+        self.processed = 0  # Записано строк
+        self.cancelled = threading.Event()  # Флаг отмены
+        self.error = None  # Ошибка, прервавшая экспорт
+        self.title = "Экспорт проектов"  # Заголовок окна хода выполнения
+
+    def run(self):
+        # Потоковая запись проектов порциями в рабочем потоке
+        import csv  # Модуль CSV нужен только экспорту и импорту
+        try:
+            with open(self.file_path, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(EXPORT_HEADER)
+                for rows in self.db_manager.iterate_query(
+                        f"SELECT {EXPORT_COLUMNS} FROM projects WHERE user_id=? ORDER BY id",
+                        (self.user_id,), EXPORT_CHUNK_SIZE):
+                    if self.cancelled.is_set():
+                        break
+                    writer.writerows(rows)
+                    self.processed += len(rows)
+            if self.cancelled.is_set():
+                os.remove(self.file_path)  # Недописанный файл не оставляем
+        except (OSError, sqlite3.Error) as error:
+            self.error = error
+        finally:
+            self.db_manager.pool.release()
+
+    def cancel(self):
+        # Запрос отмены экспорта
+        self.cancelled.set()
+
+    def progress_text(self):
+        # Текст хода выполнения для окна прогресса
+        return f"Экспортировано {self.processed} из {self.total}"
+
+    def result_message(self):
+        # Итоговое сообщение: (успех ли, текст)
+        if self.error:
+            return False, f"Не удалось экспортировать проекты: {self.error}"
+        if self.cancelled.is_set():
+            return True, "Экспорт отменен"
+        return True, f"Проекты успешно экспортированы в {self.file_path}"
+
+
+IMPORT_BATCH_SIZE = 10000  # Строк в одном executemany при импорте
+IMPORT_PARALLEL_THRESHOLD = 16 * 1024 * 1024  # Размер файла, начиная с которого разбор идет в нескольких процессах
+
+
+@functools.lru_cache(maxsize=65536)
+def normalize_date(text):
+    # Дата из CSV: ('ДД.ММ.ГГГГ', 'ГГГГ-ММ-ДД'), ('', '') для пустой или None, если не распознана.
+    # Даты в больших файлах сильно повторяются, поэтому результат кэшируется
+    if not text.strip():
+        return '', ''
+    iso = parse_date(text)
+    if iso is None:
+        return None
+    return f"{iso[8:10]}.{iso[5:7]}.{iso[0:4]}", iso
+
+
+def normalize_project_rows(rows):
+    # Проверка и нормализация строк CSV: (строки для вставки, [(строка, ошибка)])
+    # Функция уровня модуля, чтобы ее можно было выполнять в отдельных процессах
+    accepted = []
+    rejected = []
+    for row in rows:
+        if len(row) != len(EXPORT_HEADER):
+            rejected.append((row, f"ожидалось {len(EXPORT_HEADER)} столбцов"))
+            continue
+        if any('\ufffd' in field for field in row):
+            rejected.append((row, "строка содержит байты не в кодировке файла"))
+            continue
+        name, project_type, start_date, end_date, completed, file_path = row
+        if not name.strip():
+            rejected.append((row, "пустое название"))
+            continue
+        start = normalize_date(start_date)
+        end = normalize_date(end_date)
+        if start is None or end is None:
+            rejected.append((row, "дата не в формате ДД.ММ.ГГГГ"))
+            continue
+        if completed.strip() not in ('', '0', '1'):
+            rejected.append((row, "поле 'Завершен' должно быть 0 или 1"))
+            continue
+        accepted.append((name, project_type, start[0], end[0], end[1], int(completed.strip() or 0), file_path))
+    return accepted, rejected
+
+
+class CsvImportJob(threading.Thread):
+    def __init__(self, db_manager, user_id, file_path, reject_path=None, processes=None):
+        super().__init__(daemon=True)
+        self.db_manager = db_manager  # Менеджер базы данных
+        self.user_id = user_id  # Идентификатор пользователя
+        self.file_path = file_path  # Путь к файлу CSV
+        self.reject_path = reject_path or os.path.splitext(file_path)[0] + "_rejected.csv"  # Файл отклоненных строк
+        try:
+            self.total = os.path.getsize(file_path)  # Размер файла в байтах
+        except OSError as error:
+            raise TaskBoardError(f"Не удалось открыть файл {file_path}: {error.strerror}") from error
+        if processes is None:
+            processes = (os.cpu_count() or 1) if self.total >= IMPORT_PARALLEL_THRESHOLD else 1
+        self.processes = processes  # Количество процессов для разбора
+        self.processed = 0  # Прочитано байт
+        self.imported = 0  # Импортировано строк
+        self.rejected = 0  # Отклонено строк
+        self.cancelled = threading.Event()  # Флаг отмены
+        self.error = None  # Ошибка, прервавшая импорт
+        self.parse_errors = []  # Строки, которые не удалось разобрать как CSV: (строка, ошибка)
+        self.call_site = db_manager.caller_site()  # Место запуска импорта для статистики запросов
+        self.title = "Импорт проектов"  # Заголовок окна хода выполнения
+
+    def read_lines(self, file):
+        # Чтение строк файла с подсчетом прочитанных байт; недекодируемые байты заменяются на U+FFFD,
+        # такие строки отклоняет normalize_project_rows
+        import locale
+        encoding = locale.getpreferredencoding(False)  # Та же кодировка, что и при экспорте
+        for line in file:
+            self.processed += len(line)
+            yield line.decode(encoding, errors='replace')
+
+    def read_batches(self, file):
+        # Разбиение CSV на порции строк; заголовок экспорта пропускается
+        import csv
+        reader = csv.reader(self.read_lines(file))
+        batch = []
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                break
+            except csv.Error as error:
+                # Строка с ошибкой разбора (например, с нулевым байтом) отклоняется, чтение продолжается
+                self.parse_errors.append(([""] * len(EXPORT_HEADER), f"строка {reader.line_num}: {error}"))
+                continue
+            if reader.line_num == 1 and row == EXPORT_HEADER:
+                continue
+            batch.append(row)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def normalized_batches(self, batches):
+        # Нормализация порций: в этом потоке или в пуле процессов с ограниченным числом порций в работе
+        if self.processes <= 1:
+            for batch in batches:
+                yield normalize_project_rows(batch)
+            return
+        import concurrent.futures
+        import multiprocessing
+        # Процессы не наследуют копию приложения с Tk и фоновыми потоками (fork в таком процессе небезопасен)
+        context = multiprocessing.get_context(
+            'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+        with concurrent.futures.ProcessPoolExecutor(self.processes, mp_context=context) as executor:
+            pending = collections.deque()
+            for batch in batches:
+                pending.append(executor.submit(normalize_project_rows, batch))
+                if len(pending) >= self.processes * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def run(self):
+        # Потоковый импорт: все порции вставляются через executemany в одной транзакции
+        import csv
+        conn = self.db_manager.pool.get_connection()
+        run_statement = self.db_manager.run_statement
+        try:
+            with open(self.file_path, 'rb') as file, open(self.reject_path, 'w', newline='') as reject_file:
+                reject_writer = csv.writer(reject_file)
+                reject_writer.writerow(EXPORT_HEADER + ["Ошибка"])
+                conn.execute("BEGIN")
+                search = self.db_manager.project_search
+                if search:
+                    # Поисковый индекс пополняется одной вставкой после загрузки, а не триггером на каждую строку;
+                    # флаг виден только этой транзакции и исчезает при откате
+                    run_statement(conn, "INSERT OR REPLACE INTO settings (key, value) VALUES (?, '1')",
+                                  (PROJECTS_FTS_DEFERRED,), call_site=self.call_site)
+                    last_id = run_statement(conn, "SELECT COALESCE(MAX(id), 0) FROM projects",
+                                            fetch='one', call_site=self.call_site)[0]
+                for accepted, rejected in self.normalized_batches(self.read_batches(file)):
+                    if self.cancelled.is_set():
+                        break
+                    run_statement(
+                        conn,
+                        "INSERT INTO projects (name, type, start_date, end_date, deadline, completed, file_path, user_id) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (row + (self.user_id,) for row in accepted), many=True, call_site=self.call_site)
+                    rejected += self.parse_errors
+                    self.parse_errors = []
+                    reject_writer.writerows(row + [error] for row, error in rejected)
+                    self.imported += len(accepted)
+                    self.rejected += len(rejected)
+                if self.parse_errors:
+                    # Ошибки разбора после последней полной порции
+                    reject_writer.writerows(row + [error] for row, error in self.parse_errors)
+                    self.rejected += len(self.parse_errors)
+                    self.parse_errors = []
+            if self.cancelled.is_set():
+                conn.rollback()
+                self.imported = 0
+            else:
+                if search:
+                    run_statement(conn, "INSERT INTO projects_fts (rowid, name, type, owner) "
+                                  "SELECT id, name, type, 'u' || user_id FROM projects WHERE id > ?", (last_id,),
+                                  call_site=self.call_site)
+                    run_statement(conn, "DELETE FROM settings WHERE key = ?", (PROJECTS_FTS_DEFERRED,),
+                                  call_site=self.call_site)
+                conn.commit()
+            if not self.rejected:
+                os.remove(self.reject_path)  # Пустой файл отклоненных строк не оставляем
+        except Exception as error:
+            # Любая ошибка прерывает импорт целиком: транзакция откатывается, отклоненные строки теряют смысл
+            self.error = error
+            self.imported = 0
+            try:
+                os.remove(self.reject_path)
+            except OSError:
+                pass
+        finally:
+            self.db_manager.pool.release()  # Незафиксированная транзакция откатывается при закрытии
+
+    def cancel(self):
+        # Запрос отмены импорта (уже вставленные строки откатываются)
+        self.cancelled.set()
+
+    def progress_text(self):
+        # Текст хода выполнения для окна прогресса
+        return f"Импортировано {self.imported}, отклонено {self.rejected}"
+
+    def result_message(self):
+        # Итоговое сообщение: (успех ли, текст)
+        if self.error:
+            return False, f"Не удалось импортировать проекты: {self.error}"
+        if self.cancelled.is_set():
+            return True, "Импорт отменен"
+        message = f"Импортировано проектов: {self.imported}"
+        if self.rejected:
+            message += f"\nОтклонено строк: {self.rejected} (см. {self.reject_path})"
+        return True, message
+
+
+TELEGRAM_API_URL = 'https://api.telegram.org'  # Адрес Bot API (для проверки - локальный сервер)
+TELEGRAM_RATE = 30  # Не больше сообщений в секунду (ограничение Bot API на рассылку)
+TELEGRAM_SENDERS = 4  # Потоков отправки (каждый со своим соединением)
+TELEGRAM_MAX_RETRIES = 5  # Повторов отправки при временных ошибках
+TELEGRAM_RETRY_DELAY = 0.5  # Начальная пауза перед повтором, с (удваивается с каждой попыткой)
+TELEGRAM_TIMEOUT = 10  # Тайм-аут запроса к Bot API, с
+TELEGRAM_MESSAGE_LIMIT = 4096  # Максимальная длина сообщения Telegram
+TELEGRAM_QUERY_CHUNK = 1000  # Строк в одной порции чтения сводок
+DEADLINE_STATES = {'overdue': "Просрочено", 'today': "Сегодня", 'soon': "Скоро"}  # Заголовки разделов сводки
+
+
+def format_digest(rows):
+    # Текст сводки по срокам для одного чата; при превышении длины сообщения хвост сокращается
+    lines = ["TaskBoard: сроки проектов"]
+    for state, title in DEADLINE_STATES.items():
+        projects = [row for row in rows if row[3] == state]
+        if projects:
+            lines.append(f"\n{title}:")
+            lines.extend(f"- {name} ({datetime.date.fromisoformat(deadline).strftime('%d.%m.%Y')}, {username})"
+                         for username, name, deadline, _ in projects)
+    text = "\n".join(lines)
+    if len(text) > TELEGRAM_MESSAGE_LIMIT:
+        cut = text.rfind("\n", 0, TELEGRAM_MESSAGE_LIMIT - 40)
+        text = text[:cut] + f"\n... и еще {text.count(chr(10), cut + 1) + 1} строк"
+    return text
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate  # Пополнение, токенов в секунду
+        self.capacity = capacity or rate  # Наибольший всплеск
+        self.tokens = self.capacity  # Доступно токенов
+        self.updated = time.monotonic()  # Время последнего пополнения
+        self.lock = threading.Lock()  # Общий для всех потоков отправки
+
+    def take(self):
+        # Ожидание токена: в среднем не больше rate отправок в секунду
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        # Приостановка всех отправок (ответ 429 означает превышение общего ограничения)
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class TelegramDispatcher:
+    def __init__(self, db_manager, token, api_url=TELEGRAM_API_URL, rate=TELEGRAM_RATE, senders=TELEGRAM_SENDERS):
+        self.db_manager = db_manager  # Менеджер базы данных
+        self.token = token  # Токен бота
+        import urllib.parse  # Модули HTTP загружаются только для рассылки (быстрый запуск командной строки)
+        self.url = urllib.parse.urlsplit(api_url)  # Адрес Bot API
+        self.bucket = TokenBucket(rate)  # Ограничение скорости отправки
+        self.senders = senders  # Количество потоков отправки
+        self.stats = collections.Counter()  # Итоги рассылки: queued, sent, skipped, failed, retries
+        self.delivered = []  # Доставленные сводки: (chat_id, хеш, дата)
+        self.lock = threading.Lock()  # Защита итогов
+
+    def send_digests(self, days_before=DAYS_BEFORE):
+        # Рассылка сводок по срокам: одна на чат, повторно та же сводка в тот же день не отправляется
+        import hashlib
+        today = datetime.date.today().isoformat()
+        already_sent = dict(self.db_manager.execute_query(
+            "SELECT chat_id, digest_hash FROM telegram_sent WHERE sent_on = ?", (today,), fetch=True))
+        outbox = queue.Queue(maxsize=self.senders * 100)  # Ограниченная очередь: чтение базы не убегает вперед
+        threads = [threading.Thread(target=self.send_loop, args=(outbox,), daemon=True) for i in range(self.senders)]
+        for thread in threads:
+            thread.start()
+        try:
+            for chat_id, rows in self.db_manager.iterate_due_digests(days_before):
+                text = format_digest(rows)
+                digest_hash = hashlib.sha256(text.encode()).hexdigest()[:32]
+                with self.lock:
+                    self.stats['skipped' if already_sent.get(chat_id) == digest_hash else 'queued'] += 1
+                if already_sent.get(chat_id) == digest_hash:
+                    continue
+                outbox.put((chat_id, text, digest_hash))
+        finally:
+            for thread in threads:
+                outbox.put(None)
+            for thread in threads:
+                thread.join()
+        with self.db_manager.pool.get_connection() as conn:
+            self.db_manager.run_statement(
+                conn, "INSERT OR REPLACE INTO telegram_sent (chat_id, digest_hash, sent_on) VALUES (?, ?, ?)",
+                ((chat_id, digest_hash, today) for chat_id, digest_hash in self.delivered), many=True)
+        return dict(self.stats)
+
+    def send_loop(self, outbox):
+        # Поток отправки: свое соединение с Bot API, сообщения берутся из общей очереди
+        connection = None
+        try:
+            while True:
+                item = outbox.get()
+                if item is None:
+                    break
+                chat_id, text, digest_hash = item
+                connection, sent = self.deliver(connection, chat_id, text)
+                with self.lock:
+                    if sent:
+                        self.stats['sent'] += 1
+                        self.delivered.append((chat_id, digest_hash))
+                    else:
+                        self.stats['failed'] += 1
+        finally:
+            if connection:
+                connection.close()
+            self.db_manager.pool.release()
+
+    def deliver(self, connection, chat_id, text):
+        # Отправка с повторами: 429 - пауза retry_after для всех потоков, 5xx и сетевые ошибки -
+        # экспоненциальная пауза; прочие ошибки (например, бот заблокирован) не повторяются
+        import http.client
+        for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+            if attempt:
+                with self.lock:
+                    self.stats['retries'] += 1
+            self.bucket.take()
+            try:
+                if connection is None:
+                    connection_class = (http.client.HTTPSConnection if self.url.scheme == 'https'
+                                        else http.client.HTTPConnection)
+                    connection = connection_class(self.url.netloc, timeout=TELEGRAM_TIMEOUT)
+                status, reply = self.post(connection, 'sendMessage', {'chat_id': chat_id, 'text': text})
+            except (OSError, http.client.HTTPException, ValueError):
+                if connection:
+                    connection.close()
+                connection = None
+                time.sleep(TELEGRAM_RETRY_DELAY * 2 ** attempt)
+                continue
+            if reply.get('ok'):
+                return connection, True
+            if status == 429:
+                self.bucket.pause(reply.get('parameters', {}).get('retry_after', 1))
+            elif status >= 500:
+                time.sleep(TELEGRAM_RETRY_DELAY * 2 ** attempt)
+            else:
+                return connection, False
+        return connection, False
+
+    def post(self, connection, method, payload):
+        # Вызов метода Bot API через постоянное соединение: (код ответа, JSON ответа)
+        import json
+        body = json.dumps(payload).encode()
+        connection.request('POST', f"{self.url.path.rstrip('/')}/bot{self.token}/{method}", body,
+                           {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b'{}')
+
+
+def require_user(db_manager, username):
+    # Идентификатор пользователя по логину для команд с --user
+    user = db_manager.get_user(username)
+    if user is None:
+        raise TaskBoardError(f"Пользователь {username} не найден")
+    return user[0]
+
+
+def run_job(job):
+    # Выполнение экспорта или импорта в текущем потоке с выводом итогового сообщения
+    job.run()
+    success, message = job.result_message()
+    print(message, file=sys.stdout if success else sys.stderr)
+    return 0 if success else 1
+
+
+def command_add(db_manager, args):
+    # Добавление проекта; файл копируется в хранилище вложений
+    deadline = parse_date(args.end)
+    if args.end and deadline is None:
+        raise TaskBoardError("Дата окончания должна быть в формате ДД.ММ.ГГГГ")
+    user_id = require_user(db_manager, args.user)
+    attachment = None
+    if args.file:
+        try:
+            attachment = db_manager.attachments.store(args.file) + (args.file,)
+        except OSError as error:
+            raise TaskBoardError(f"Не удалось добавить файл {args.file}: {error.strerror or error}") from error
+    db_manager.add_project(user_id, args.name, args.type, args.start, args.end, deadline or '', attachment)
+
+
+def command_list(db_manager, args):
+    # Вывод проектов построчно через табуляцию: id, состояние, название, тип, даты, файл
+    user_id = require_user(db_manager, args.user)
+    if args.search:
+        projects = db_manager.search_projects(user_id, args.search)
+        if args.completed is not None:
+            projects = [project for project in projects if project[5] == args.completed]
+    else:
+        projects = db_manager.list_projects(user_id, args.completed)
+    for project_id, name, project_type, start_date, end_date, completed, file_path in projects:
+        print("\t".join((str(project_id), "x" if completed else "-", name or "", project_type or "",
+                         start_date or "", end_date or "", file_path or "")))
+
+
+def command_done(db_manager, args):
+    # Отметка проектов завершенными (или снова открытыми с --undo)
+    user_id = require_user(db_manager, args.user)
+    changed = db_manager.set_projects_completed(user_id, args.ids, not args.undo)
+    print(f"Изменено проектов: {changed}")
+    return 0 if changed == len(set(args.ids)) else 1
+
+
+def command_delete(db_manager, args):
+    # Удаление проектов
+    user_id = require_user(db_manager, args.user)
+    deleted = db_manager.delete_projects(user_id, args.ids)
+    print(f"Удалено проектов: {deleted}")
+    return 0 if deleted == len(set(args.ids)) else 1
+
+
+def command_export(db_manager, args):
+    # Экспорт проектов пользователя в CSV
+    return run_job(CsvExportJob(db_manager, require_user(db_manager, args.user), args.file))
+
+
+def command_import(db_manager, args):
+    # Импорт проектов пользователя из CSV (отклоненные строки - в файл рядом)
+    return run_job(CsvImportJob(db_manager, require_user(db_manager, args.user), args.file))
+
+
+def command_users(db_manager, args):
+    # Список пользователей, регистрация и удаление
+    if args.action == 'list':
+        pager = UserPager(db_manager, args.names[0] if args.names else '')
+        while not pager.exhausted:
+            for user_id, username, role in pager.next_page():
+                print(f"{user_id}\t{username}\t{role}")
+    elif args.action == 'add':
+        if len(args.names) != 1:
+            raise TaskBoardError("Укажите один логин: users add <логин>")
+        if args.password_stdin:
+            password = sys.stdin.readline().rstrip('\n')
+        else:
+            import getpass
+            password = getpass.getpass("Пароль: ")
+        db_manager.register_user(args.names[0], password, args.role)
+        print(f"Пользователь {args.names[0]} зарегистрирован")
+    else:
+        user_ids = [require_user(db_manager, username) for username in args.names]
+        db_manager.delete_users(user_ids)
+        print(f"Удалено пользователей: {len(user_ids)}")
+
+
+def build_parser():
+    # Разбор аргументов командной строки (argparse не загружается вместе с модулем для графического приложения)
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='taskboard', description="TaskBoard без графического интерфейса: проекты и пользователи в users.db")
+    parser.add_argument('--db', default='users.db', help="Путь к базе данных (по умолчанию users.db)")
+    parser.add_argument('--profile', choices=sorted(DB_PROFILES),
+                        default=os.environ.get('TASKBOARD_DB_PROFILE', DEFAULT_DB_PROFILE),
+                        help="Профиль производительности SQLite")
+    parser.add_argument('--query-stats', metavar='ФАЙЛ',
+                        help="Собрать статистику запросов execute_query и выгрузить ее в JSON по завершении")
+    parser.add_argument('--slow-query-ms', type=float, default=SLOW_QUERY_THRESHOLD * 1000,
+                        help="Порог медленного запроса, мс: для таких запросов в stderr выводится план")
+    commands = parser.add_subparsers(dest='command', metavar='команда')
+    commands.required = True
+
+    def command(name, handler, help_text, user=True):
+        sub = commands.add_parser(name, help=help_text, description=help_text)
+        sub.set_defaults(handler=handler)
+        if user:
+            sub.add_argument('--user', '-u', required=True, help="Логин владельца проектов")
+        return sub
+
+    sub = command('add', command_add, "Добавить проект")
+    sub.add_argument('name', help="Название проекта")
+    sub.add_argument('--type', default='', help="Тип работы")
+    sub.add_argument('--start', default='', help="Дата начала ДД.ММ.ГГГГ")
+    sub.add_argument('--end', default='', help="Дата окончания ДД.ММ.ГГГГ")
+    sub.add_argument('--file', help="Прикрепленный файл")
+
+    sub = command('list', command_list, "Вывести проекты")
+    sub.add_argument('--search', help="Поиск по названию и типу")
+    state = sub.add_mutually_exclusive_group()
+    state.add_argument('--open', dest='completed', action='store_const', const=0, help="Только незавершенные")
+    state.add_argument('--done', dest='completed', action='store_const', const=1, help="Только завершенные")
+
+    sub = command('done', command_done, "Отметить проекты завершенными")
+    sub.add_argument('ids', type=int, nargs='+', metavar='id', help="Номера проектов из list")
+    sub.add_argument('--undo', action='store_true', help="Снять отметку о завершении")
+
+    sub = command('delete', command_delete, "Удалить проекты")
+    sub.add_argument('ids', type=int, nargs='+', metavar='id', help="Номера проектов из list")
+
+    command('export', command_export, "Экспортировать проекты в CSV").add_argument('file', help="Файл CSV")
+    command('import', command_import, "Импортировать проекты из CSV").add_argument('file', help="Файл CSV")
+
+    sub = command('users', command_users, "Пользователи: list [префикс], add <логин>, delete <логин>...", user=False)
+    sub.add_argument('action', choices=('list', 'add', 'delete'))
+    sub.add_argument('names', nargs='*', metavar='логин')
+    sub.add_argument('--role', choices=USER_ROLES, default='user', help="Роль нового пользователя")
+    sub.add_argument('--password-stdin', action='store_true', help="Прочитать пароль из первой строки stdin")
+    return parser
+
+
+def main(argv=None):
+    # Точка входа командной строки: python taskboard.py [--db users.db] <команда> ...
+    args = build_parser().parse_args(argv)
+    db_manager = AuthenticationManager(args.db, args.profile)
+    if args.query_stats:
+        db_manager.enable_query_stats(args.slow_query_ms / 1000, functools.partial(print, file=sys.stderr))
+    try:
+        return args.handler(db_manager, args) or 0
+    except (TaskBoardError, OSError) as error:
+        # OSError - ошибки файлов, не перехваченные командой (например, недоступный каталог)
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if db_manager.query_stats is not None:
+            db_manager.query_stats.dump(args.query_stats)
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Каталог репозитория
+sys.path.insert(0, ROOT)
+
+import taskboard  # noqa: E402
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    # База во временном каталоге: пользователь user1 (id 1) с 10 проектами
+    db_manager = taskboard.AuthenticationManager(str(tmp_path / 'taskboard.db'))
+    with db_manager.pool.get_connection() as conn:
+        conn.execute("INSERT INTO users (id, username, password, role) VALUES (1, 'user1', 'x', 'user')")
+        conn.executemany("INSERT INTO projects (name, type, start_date, end_date, deadline, user_id) "
+                         "VALUES (?, 'Курсовая', '01.09.2024', '31.12.2099', '2099-12-31', 1)",
+                         ((f"Проект {i}",) for i in range(10)))
+    yield db_manager
+    db_manager.close()
+
+
+@pytest.fixture
+def application():
+    # Модуль Release-version.py (имя файла с дефисом нельзя импортировать напрямую); без дисплея тест пропускается
+    if not os.environ.get('DISPLAY'):
+        pytest.skip("нет дисплея, запустите под xvfb-run")
+    spec = importlib.util.spec_from_file_location('taskboard_release_version', os.path.join(ROOT, 'Release-version.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
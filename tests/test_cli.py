@@ -0,0 +1,36 @@
+import taskboard
+
+
+def run_cli(db_manager, *argv):
+    # Запуск командной строки на базе теста; возвращается код завершения
+    return taskboard.main(['--db', db_manager.db_path] + list(argv))
+
+
+def test_add_with_missing_file(db_manager, tmp_path, capsys):
+    # Отсутствующее вложение: сообщение об ошибке и код 1 вместо трассировки
+    missing = str(tmp_path / 'missing.txt')
+    assert run_cli(db_manager, 'add', '-u', 'user1', 'Проект', '--file', missing) == 1
+    error = capsys.readouterr().err
+    assert error.startswith("Ошибка: Не удалось добавить файл") and missing in error
+    assert db_manager.execute_query("SELECT COUNT(*) FROM projects WHERE name = 'Проект'", fetch=True)[0][0] == 0
+
+
+def test_add_with_file(db_manager, tmp_path, capsys):
+    # Существующее вложение копируется в хранилище, проект добавляется
+    attachment = tmp_path / 'notes.txt'
+    attachment.write_text("заметки", encoding='utf-8')
+    assert run_cli(db_manager, 'add', '-u', 'user1', 'Проект', '--file', str(attachment)) == 0
+    assert db_manager.execute_query("SELECT file_path FROM projects WHERE name = 'Проект'",
+                                    fetch=True) == [('notes.txt',)]
+
+
+def test_import_missing_file(db_manager, tmp_path, capsys):
+    # Отсутствующий файл импорта: сообщение об ошибке и код 1
+    assert run_cli(db_manager, 'import', '-u', 'user1', str(tmp_path / 'nope.csv')) == 1
+    assert capsys.readouterr().err.startswith("Ошибка: Не удалось открыть файл")
+
+
+def test_export_to_bad_path(db_manager, tmp_path, capsys):
+    # Экспорт в несуществующий каталог: сообщение об ошибке и код 1
+    assert run_cli(db_manager, 'export', '-u', 'user1', str(tmp_path / 'no_dir' / 'projects.csv')) == 1
+    assert capsys.readouterr().err.startswith("Не удалось экспортировать проекты")
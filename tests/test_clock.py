@@ -0,0 +1,49 @@
+import pytest
+
+
+def pending_callbacks(root):
+    # Запланированные через after обратные вызовы интерпретатора Tcl
+    return root.tk.splitlist(root.tk.call('after', 'info'))
+
+
+@pytest.fixture
+def app(application, db_manager):
+    # Корневое окно с открытым личным кабинетом пользователя с 10 проектами
+    root = application.Application(db_manager)
+    root.show_screen('main', 1, 'user1', 'user')
+    root.update()
+    yield application, root, db_manager
+    root.destroy()
+
+
+def test_windows_share_one_clock_job(app):
+    # Окна подписываются на общие часы: одно запланированное обновление, подписки снимаются при закрытии
+    module, root, db_manager = app
+    clock = module.ClockService.of(root)
+    labels = len(clock.labels)
+    for i in range(50):
+        projects_window = module.ProjectsWindow(db_manager, 1, root)
+        display_window = module.DisplayProjectsWindow(db_manager, 1, projects_window)
+        root.update()
+        assert module.ClockService.of(display_window) is clock
+        assert clock.job in pending_callbacks(root)
+        display_window.close_window()
+        projects_window.close_window()
+        root.update()
+        assert len(clock.labels) == labels
+    assert clock.job in pending_callbacks(root)
+
+
+def test_clock_sleeps_while_hidden(app):
+    # Без видимых меток часы не планируют обновлений и просыпаются при показе окна
+    module, root, db_manager = app
+    clock = module.ClockService.of(root)
+    root.withdraw()
+    root.update()
+    scheduled = clock.job
+    clock.tick()
+    assert clock.job is None
+    assert scheduled not in pending_callbacks(root)
+    root.deiconify()
+    root.update()
+    assert clock.job in pending_callbacks(root)
@@ -0,0 +1,57 @@
+import concurrent.futures
+import sqlite3
+
+import pytest
+
+import taskboard
+
+
+@pytest.fixture
+def worker(db_manager):
+    # Отдельный рабочий поток над базой с 10 проектами пользователя user1
+    worker = taskboard.DatabaseWorker(db_manager)
+    yield worker
+    worker.stop()
+
+
+def completed_states(db_manager):
+    # Состояние завершенности проектов пользователя по id
+    return {project[0]: project[5] for project in db_manager.list_projects(1)}
+
+
+def submit_batch(worker, db_manager, writes):
+    # Группа отложенных записей в формате очереди DatabaseManager; возвращает Future записей и Future группы
+    batch = [(query, params, concurrent.futures.Future(), None) for query, params in writes]
+    group = worker.submit(db_manager.commit_writes, batch)
+    concurrent.futures.wait([group])
+    return [future for query, params, future, call_site in batch], group
+
+
+def test_batch_committed_in_one_transaction(worker, db_manager):
+    # Все записи группы фиксируются одной транзакцией, Future записей завершаются успешно
+    project_ids = list(completed_states(db_manager))[:3]
+    commits = db_manager.write_commits
+    futures, group = submit_batch(worker, db_manager, [
+        ("UPDATE projects SET completed = ? WHERE id = ?", (1, project_id)) for project_id in project_ids])
+    assert group.exception() is None
+    assert all(future.result() is None for future in futures)
+    assert db_manager.write_commits == commits + 1
+    states = completed_states(db_manager)
+    assert all(states[project_id] == 1 for project_id in project_ids)
+
+
+def test_failed_batch_rolled_back_with_one_error(worker, db_manager):
+    # Сбой одной записи откатывает всю группу; все Future получают один и тот же объект ошибки,
+    # поэтому окно показывает сообщение один раз и возвращает строки в прежнее состояние (1 - completed)
+    project_ids = list(completed_states(db_manager))[:3]
+    before = completed_states(db_manager)
+    futures, group = submit_batch(worker, db_manager, [
+        ("UPDATE projects SET completed = ? WHERE id = ?", (1, project_ids[0])),
+        ("UPDATE projects SET completed = ? WHERE id = ?", (1, project_ids[1])),
+        ("UPDATE no_such_table SET completed = 1", ()),
+        ("UPDATE projects SET completed = ? WHERE id = ?", (1, project_ids[2])),
+    ])
+    errors = {id(future.exception()) for future in futures}
+    assert len(errors) == 1 and isinstance(futures[0].exception(), sqlite3.Error)
+    assert group.exception() is futures[0].exception()
+    assert completed_states(db_manager) == before
@@ -0,0 +1,102 @@
+import csv
+import locale
+import os
+
+import pytest
+
+import taskboard
+
+
+@pytest.fixture(autouse=True)
+def utf8_locale(monkeypatch):
+    # Импорт читает файл в кодировке локали; проверки не зависят от локали машины
+    monkeypatch.setattr(locale, 'getpreferredencoding', lambda do_setlocale=True: 'utf-8')
+
+
+def write_csv(path, rows, tail=b''):
+    # Файл в формате экспорта с заголовком; tail - сырые байты в конце файла
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(taskboard.EXPORT_HEADER)
+        writer.writerows(rows)
+    with open(path, 'ab') as file:
+        file.write(tail)
+
+
+def project_names(db_manager):
+    # Названия проектов второго пользователя (в него выполняется импорт)
+    return [row[0] for row in db_manager.execute_query(
+        "SELECT name FROM projects WHERE user_id = 2 ORDER BY id", fetch=True)]
+
+
+@pytest.fixture
+def importer(db_manager):
+    # Пустой пользователь user2 (id 2) для импорта
+    db_manager.execute_query("INSERT INTO users (id, username, password, role) VALUES (2, 'user2', 'x', 'user')")
+    return db_manager
+
+
+def test_rejected_rows_written_and_good_rows_committed(importer, tmp_path):
+    # Строки с ошибками (дата, столбцы, кодировка, разбор CSV) уходят в файл отклоненных, остальные фиксируются
+    file_path = str(tmp_path / 'projects.csv')
+    write_csv(file_path, [
+        ["Проект 1", "Курсовая", "01.09.2024", "31.12.2024", "0", ""],
+        ["Проект 2", "Диплом", "", "", "1", "file.txt"],
+        ["Плохая дата", "Курсовая", "32.13.2024", "", "0", ""],
+        ["Мало столбцов"],
+        ["Огромное поле " + "x" * (csv.field_size_limit() + 1), "", "", "", "0", ""],
+        ["Проект 3", "Курсовая", "", "", "", ""],
+    ], tail=b'\xff\xfe,\xd0\x9a,,,0,\r\n')
+    job = taskboard.CsvImportJob(importer, 2, file_path)
+    job.run()
+    assert job.error is None, job.error
+    assert (job.imported, job.rejected) == (3, 4)
+    assert project_names(importer) == ["Проект 1", "Проект 2", "Проект 3"]
+    assert importer.execute_query("SELECT deadline, completed FROM projects WHERE user_id = 2 AND name = 'Проект 1'",
+                                  fetch=True) == [('2024-12-31', 0)]
+    with open(job.reject_path, encoding='utf-8', newline='') as file:
+        rejects = list(csv.reader(file))
+    assert rejects[0] == taskboard.EXPORT_HEADER + ["Ошибка"]
+    errors = [row[-1] for row in rejects[1:]]
+    assert len(errors) == 4
+    assert "дата не в формате ДД.ММ.ГГГГ" in errors
+    assert any(error.startswith("ожидалось") for error in errors)
+    assert "строка содержит байты не в кодировке файла" in errors
+    assert any("field larger than field limit" in error for error in errors)
+
+
+def test_clean_import_leaves_no_reject_file(importer, tmp_path):
+    # Без отклоненных строк файл отклоненных не создается
+    file_path = str(tmp_path / 'projects.csv')
+    write_csv(file_path, [["Проект", "Курсовая", "01.09.2024", "31.12.2024", "0", ""]])
+    job = taskboard.CsvImportJob(importer, 2, file_path)
+    job.run()
+    assert (job.error, job.imported, job.rejected) == (None, 1, 0)
+    assert not os.path.exists(job.reject_path)
+
+
+def test_failing_batch_rolls_back_import(importer, tmp_path, monkeypatch):
+    # Ошибка базы во второй порции откатывает и уже вставленную первую, файл отклоненных удаляется
+    monkeypatch.setattr(taskboard, 'IMPORT_BATCH_SIZE', 2)
+    importer.execute_query("CREATE TRIGGER reject_import BEFORE INSERT ON projects WHEN new.name = 'Сбой' "
+                           "BEGIN SELECT RAISE(ABORT, 'вставка отклонена'); END")
+    file_path = str(tmp_path / 'projects.csv')
+    write_csv(file_path, [
+        ["Проект 1", "Курсовая", "", "", "0", ""],
+        ["Плохая дата", "Курсовая", "32.13.2024", "", "0", ""],
+        ["Проект 2", "Курсовая", "", "", "0", ""],
+        ["Сбой", "Курсовая", "", "", "0", ""],
+    ])
+    job = taskboard.CsvImportJob(importer, 2, file_path)
+    job.run()
+    assert "вставка отклонена" in str(job.error)
+    assert job.imported == 0
+    assert project_names(importer) == []
+    assert not os.path.exists(job.reject_path)
+    assert job.result_message()[0] is False
+
+
+def test_missing_file_reported(importer, tmp_path):
+    # Отсутствующий файл - понятная ошибка TaskBoardError, а не FileNotFoundError
+    with pytest.raises(taskboard.TaskBoardError, match="Не удалось открыть файл"):
+        taskboard.CsvImportJob(importer, 2, str(tmp_path / 'missing.csv'))
@@ -0,0 +1,52 @@
+import sqlite3
+
+import taskboard
+
+
+def create_old_database(db_path, version):
+    # База старой версии схемы: применены только первые version миграций
+    conn = sqlite3.connect(db_path)
+    for description, migration, batched in taskboard.MIGRATIONS[:version]:
+        migration(conn)
+    conn.execute("INSERT INTO users (id, username) VALUES (1, 'user1')")
+    conn.execute("INSERT INTO projects (name, end_date, user_id) VALUES ('Проект', '31.12.2024', 1)")
+    conn.execute(f"PRAGMA user_version = {version}")
+    conn.commit()
+    conn.close()
+
+
+def test_migration_applied_by_another_process_is_skipped(tmp_path):
+    # Два процесса прочитали старую версию; второй ждет блокировки записи, пока первый применяет все
+    # миграции, и затем пропускает их вместо повторного ALTER TABLE ("duplicate column name: deadline")
+    db_path = str(tmp_path / 'race.db')
+    create_old_database(db_path, 3)
+    opened = []
+
+    class RacingManager(taskboard.DatabaseManager):
+        def begin_migration(self, conn, number):
+            if not opened:
+                opened.append(taskboard.DatabaseManager(db_path))  # Другой процесс успел первым
+            return super().begin_migration(conn, number)
+
+    db_manager = RacingManager(db_path)
+    opened[0].close()
+    assert db_manager.execute_query("PRAGMA user_version", fetch=True)[0][0] == len(taskboard.MIGRATIONS)
+    assert db_manager.execute_query("SELECT deadline FROM projects", fetch=True) == [('2024-12-31',)]
+    db_manager.close()
+
+
+def test_project_queries_use_remaining_indexes(db_manager):
+    # После удаления idx_projects_user выборки проектов пользователя идут по индексам постраничного
+    # вывода и сроков, а не полным просмотром таблицы
+    indexes = {name for name, in db_manager.execute_query(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'projects'", fetch=True)}
+    assert 'idx_projects_user' not in indexes
+    queries = {
+        "SELECT COUNT(*) FROM projects WHERE user_id=?": (1,),
+        f"SELECT {taskboard.PROJECT_COLUMNS} FROM projects WHERE user_id=? AND id > ? ORDER BY id LIMIT ?": (1, 0, 100),
+        "DELETE FROM projects WHERE id = ? AND user_id = ?": (1, 1),
+        "SELECT id FROM projects WHERE user_id = ? AND completed = 0 AND deadline <= ?": (1, '2099-12-31'),
+    }
+    for query, params in queries.items():
+        plan = " ".join(row[3] for row in db_manager.execute_query("EXPLAIN QUERY PLAN " + query, params, fetch=True))
+        assert 'USING' in plan, (query, plan)
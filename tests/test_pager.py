@@ -0,0 +1,25 @@
+import taskboard
+
+
+def test_pages_loaded_outside_pager(db_manager):
+    # Окно загружает недостающие страницы запросом page_query в рабочем потоке и кладет их в кэш store_page
+    pager = taskboard.ProjectPager(db_manager, 1, page_size=4)
+    assert pager.count == 10
+    assert pager.missing_page(5) == 1
+    for number in (0, 1, 2):
+        query, params = pager.page_query(number)
+        pager.store_page(number, db_manager.execute_query(query, params, fetch=True))
+    assert pager.missing_page(5) is None
+    assert [pager.get(index)[1] for index in range(10)] == [f"Проект {i}" for i in range(10)]
+    assert pager.get(10) is None
+
+
+def test_changes_counted(db_manager):
+    # Изменение кэша во время загрузки страницы делает загруженную страницу устаревшей
+    pager = taskboard.ProjectPager(db_manager, 1)
+    project_id = pager.get(0)[0]
+    changes = pager.changes
+    pager.update(project_id, 1)
+    assert pager.changes == changes + 1
+    pager.remove(project_id)
+    assert pager.changes == changes + 2 and pager.count == 9
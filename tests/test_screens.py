@@ -0,0 +1,43 @@
+import gc
+import tracemalloc
+
+SCREEN_CYCLES = 1000  # Циклов входа и выхода в одном корневом окне
+SCREEN_MEMORY_GROWTH = 1024 * 1024  # Допустимый прирост памяти Python за все циклы, байт
+
+
+def count_widgets(widget):
+    # Количество виджетов в дереве
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def test_login_logout_cycles_do_not_leak(application, db_manager):
+    # Вход и выход переключают два постоянных экрана одного корневого окна: число виджетов и
+    # интерпретаторов Tcl не растет, память Python после 1000 циклов почти не меняется
+    root = application.Application(db_manager)
+    login = root.screens['login']
+
+    def cycle(i):
+        login.finish_login((1, 'user1', 'admin' if i % 2 else 'user'))
+        root.update()
+        root.screens['main'].logout()
+        root.update()
+
+    try:
+        for i in range(100):  # Прогрев: создание экранов и кэшей Tk
+            cycle(i)
+        gc.collect()
+        widgets = count_widgets(root)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for i in range(SCREEN_CYCLES):
+            cycle(i)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        growth = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        assert growth < SCREEN_MEMORY_GROWTH, after.compare_to(before, 'lineno')[:10]
+        assert count_widgets(root) == widgets
+        assert len(root.screens) == 2
+        assert sum(1 for obj in gc.get_objects() if isinstance(obj, application.tk.Tk)) == 1
+    finally:
+        root.destroy()
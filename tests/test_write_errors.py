@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def window(application, db_manager, monkeypatch):
+    # Окно списка проектов пользователя с 10 проектами; сообщения об ошибках собираются в список
+    errors = []
+    monkeypatch.setattr(application.messagebox, 'showerror', lambda title, message: errors.append(message))
+    root = application.tk.Tk()
+    root.withdraw()
+    window = application.DisplayProjectsWindow(db_manager, 1, root)
+    pump(window)  # Первая страница списка загружается в рабочем потоке
+    yield application, window, db_manager, errors
+    root.destroy()
+
+
+def pump(widget, seconds=0.5):
+    # Обработка событий Tk, пока окна дожидаются Future
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        widget.update()
+        time.sleep(0.01)
+
+
+def cached_completed(window, project_id):
+    # Состояние завершенности проекта в кэше страниц списка
+    number, position = window.project_list.pager.find(project_id)
+    return window.project_list.pager.pages[number][position][5]
+
+
+def test_failed_batch_reported_once_and_reverted(window):
+    # Сбой группы отложенных записей: одно сообщение на группу, строки возвращаются в прежнее состояние
+    module, window, db_manager, errors = window
+    with db_manager.pool.get_connection() as conn:
+        conn.execute("CREATE TRIGGER reject_update BEFORE UPDATE ON projects "
+                     "BEGIN SELECT RAISE(ABORT, 'запись отклонена'); END")
+    project_ids = [project[0] for project in db_manager.list_projects(1)][:3]
+    for project_id in project_ids:
+        window.toggle_project(project_id, module.tk.BooleanVar(value=True))
+    assert all(cached_completed(window, project_id) == 1 for project_id in project_ids)
+    db_manager.flush()
+    pump(window)
+    assert len(errors) == 1, errors
+    assert all(cached_completed(window, project_id) == 0 for project_id in project_ids)
+
+
+def test_repeated_delete_counted_once(window):
+    # Повторное нажатие "Удалить" до фиксации удаления не уменьшает счетчик строк второй раз
+    module, window, db_manager, errors = window
+    project_id = [project[0] for project in db_manager.list_projects(1)][0]
+    window.delete_project(project_id)
+    window.delete_project(project_id)
+    db_manager.flush()
+    pump(window)
+    assert not errors, errors
+    assert window.project_list.pager.count == 9
+    assert window.project_list.pager.find(project_id) is None
+    assert not window.pending_deletes